@@ -1,15 +1,22 @@
 from fastapi import Request
 from sqladmin import Admin, ModelView
 from sqladmin.authentication import AuthenticationBackend
+from sqlalchemy import Select, func, literal, or_
 
-from src.config import config, security
+from src.config import config, security, settings
 from src.database import async_session_maker, engine
 from src.enums import UserRoles
 from src.models.facilities import FacilitiesOrm
 from src.models.hotels import HotelsOrm
 from src.models.rooms import RoomsOrm
 from src.models.users import UsersOrm
+from src.repositories.base import estimate_rows
 from src.repositories.users import UsersRepository
+from src.services.facilities import FacilitiesService
+from src.services.hotels import HotelsService
+from src.services.rooms import RoomsService
+from src.services.users import UserService, user_principals
+from src.utils.token_revocation import token_revocation
 
 
 class AdminAuth(AuthenticationBackend):
@@ -33,8 +40,15 @@ class AdminAuth(AuthenticationBackend):
     async def authenticate(self, request: Request) -> bool:
         """Проверка, что пользователь - администратор"""
         # Проверяем, есть ли уже данные в сессии sqladmin
-        if request.session.get("token"):
-            return True
+        session_token = request.session.get("token")
+        if session_token:
+            try:
+                if not await token_revocation.is_revoked(security._decode_token(session_token)):
+                    return True
+            except Exception as err:
+                print("verify_access_token error:", repr(err))
+            # Токен сессии отозван или истёк — проверяем заново по куке
+            request.session.clear()
 
         # Если в сессии нет, проверяем JWT из куки
         access_token = request.cookies.get(config.JWT_ACCESS_COOKIE_NAME, None)
@@ -43,9 +57,11 @@ class AdminAuth(AuthenticationBackend):
 
         try:
             payload = security._decode_token(access_token)
+            if await token_revocation.is_revoked(payload):
+                return False
             user_id = int(payload.sub)
             async with async_session_maker() as session:
-                user = await UsersRepository(session).get_one_or_none(id=user_id)
+                user = await user_principals.get(user_id, UsersRepository(session).get_by_ids)
                 if user and user.role == UserRoles.admin:
                     # Сохраняем признак аутентификации в сессию для sqladmin
                     request.session.update({"token": access_token})
@@ -57,7 +73,55 @@ class AdminAuth(AuthenticationBackend):
         return False
 
 
-class UsersAdmin(ModelView, model=UsersOrm):
+INT4_MAX = 2**31 - 1
+
+
+class ScalableModelView(ModelView):
+    """Список, который не деградирует на больших таблицах.
+
+    - связи из column_list sqladmin сам подгружает через selectinload, без N+1;
+    - без поиска и фильтров количество берётся из pg_class.reltuples, если
+      таблица больше ADMIN_EXACT_COUNT_MAX_ROWS: оценка описывает всю таблицу,
+      а не отобранные строки;
+    - поиск идёт только по индексам: префикс lower(col) LIKE 'term%' по колонкам
+      column_searchable_list (для них есть индексы lower(col) text_pattern_ops),
+      а для числа ещё и точное совпадение с колонками search_id_columns.
+    """
+
+    search_id_columns: list = []
+
+    def search_query(self, stmt: Select, term: str) -> Select:
+        term = term.strip()
+        escaped = term.lower().replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+        # Образец подставляется литералом: с параметром планировщик не возьмёт индекс
+        pattern = literal(escaped + "%", literal_execute=True)
+        conditions = [
+            func.lower(column).like(pattern, escape="\\") for column in self.column_searchable_list
+        ]
+        # Только ASCII-цифры в пределах int4: isdigit() верен и для «²», на которой
+        # падает int(), а большое число не сравнить с integer-колонкой. Цифры ищутся
+        # и префиксом — email или название тоже могут начинаться с них
+        if term.isascii() and term.isdigit() and int(term) <= INT4_MAX:
+            conditions += [column == int(term) for column in self.search_id_columns]
+        return stmt.where(or_(*conditions))
+
+    def is_narrowed(self, request: Request) -> bool:
+        """Ограничен ли список поиском или фильтром из column_filters."""
+        params = request.query_params
+        return bool(params.get("search")) or any(
+            params.get(list_filter.parameter_name) for list_filter in self.get_filters()
+        )
+
+    async def count(self, request: Request, stmt: Select | None = None) -> int:
+        if not self.is_narrowed(request):
+            async with async_session_maker() as session:
+                estimate = await estimate_rows(session, self.model.__tablename__)
+            if estimate is not None and estimate >= settings.ADMIN_EXACT_COUNT_MAX_ROWS:
+                return estimate
+        return await super().count(request, stmt)
+
+
+class UsersAdmin(ScalableModelView, model=UsersOrm):
     name = "Пользователь"
     name_plural = "Пользователи"
     column_list = [
@@ -68,36 +132,68 @@ class UsersAdmin(ModelView, model=UsersOrm):
         UsersOrm.created_at,
     ]
     column_searchable_list = [UsersOrm.email]
+    search_id_columns = [UsersOrm.id]
 
+    # Правки из админки идут мимо UserService, поэтому кэши сбрасываются здесь:
+    # иначе смена роли или блокировка вступит в силу только по TTL кэша принципалов
+    async def after_model_change(self, data, model, is_created, request) -> None:
+        await UserService.invalidate_cache(model.id)
 
-class HotelsAdmin(ModelView, model=HotelsOrm):
+    async def after_model_delete(self, model, request) -> None:
+        await UserService.invalidate_cache(model.id)
+        await token_revocation.revoke_user(model.id)
+
+
+class HotelsAdmin(ScalableModelView, model=HotelsOrm):
     name = "Отель"
     name_plural = "Отели"
     column_list = [HotelsOrm.id, HotelsOrm.title, HotelsOrm.location]
     column_searchable_list = [HotelsOrm.title, HotelsOrm.location]
+    search_id_columns = [HotelsOrm.id]
+
+    # Как и у пользователей: без сброса поколений ETag каталога отдавал бы 304
+    # со старыми данными, пока в кэш не запишет кто-то через API
+    async def after_model_change(self, data, model, is_created, request) -> None:
+        await HotelsService.invalidate_cache(model.id)
+
+    async def after_model_delete(self, model, request) -> None:
+        await HotelsService.invalidate_cache(model.id)
 
 
-class RoomsAdmin(ModelView, model=RoomsOrm):
+class RoomsAdmin(ScalableModelView, model=RoomsOrm):
     name = "Комната"
     name_plural = "Комнаты"
-    # column_list = [
-    #     RoomsOrm.id,
-    #     RoomsOrm.title,
-    #     RoomsOrm.description,
-    #     RoomsOrm.price,
-    #     RoomsOrm.quantity,
-    #     RoomsOrm.hotel_id,
-    # ]
-    column_list = "__all__"
-    column_searchable_list = [RoomsOrm.title, RoomsOrm.price, RoomsOrm.quantity]
-
-
-class FacilitiesAdmin(ModelView, model=FacilitiesOrm):
+    column_list = [
+        RoomsOrm.id,
+        RoomsOrm.title,
+        RoomsOrm.price,
+        RoomsOrm.quantity,
+        RoomsOrm.hotel_id,
+        RoomsOrm.facilities,
+    ]
+    column_searchable_list = [RoomsOrm.title]
+    search_id_columns = [RoomsOrm.id, RoomsOrm.hotel_id]
+
+    async def after_model_change(self, data, model, is_created, request) -> None:
+        await RoomsService.invalidate_cache(model.id)
+
+    async def after_model_delete(self, model, request) -> None:
+        await RoomsService.invalidate_cache(model.id)
+
+
+class FacilitiesAdmin(ScalableModelView, model=FacilitiesOrm):
     name = "Предмет"
     name_plural = "Предметы"
-    # column_list = [FacilitiesOrm.id, FacilitiesOrm.title, FacilitiesOrm.rooms]
-    column_list = "__all__"
-    column_searchable_list = [FacilitiesOrm.title, FacilitiesOrm.rooms]
+    # Список номеров предмета может быть огромным — в списке его не показываем
+    column_list = [FacilitiesOrm.id, FacilitiesOrm.title]
+    column_searchable_list = [FacilitiesOrm.title]
+    search_id_columns = [FacilitiesOrm.id]
+
+    async def after_model_change(self, data, model, is_created, request) -> None:
+        await FacilitiesService.invalidate_cache(model.id)
+
+    async def after_model_delete(self, model, request) -> None:
+        await FacilitiesService.invalidate_cache(model.id)
 
 
 def setup_admin(app):
@@ -1,34 +1,68 @@
+import time
+from collections.abc import Callable
 from typing import Annotated
 
 from authx import TokenPayload
-from fastapi import Depends, HTTPException, Query, Request, status
+from fastapi import Depends, HTTPException, Query, Request, Response, status
 from pydantic import BaseModel
 from redis.asyncio import Redis
 
-from src.cache import get_redis
-from src.config import config as authx_config, security
-from src.database import async_session_maker
+from src.cache import get_redis, get_redis_binary
+from src.config import config as authx_config, security, settings
+from src.database import async_session_maker, async_session_maker_read_only
 from src.enums import ErrorCode, UserRoles
 from src.exceptions import ObjectNotFoundException
 from src.services.booking import BookingService
 from src.services.facilities import FacilitiesService
 from src.services.hotels import HotelsService
+from src.services.pricing import PricingService
 from src.services.rooms import RoomsService
+from src.services.users import UserService
 from src.utils.db_manager import DbManager
+from src.utils.pagination import decode_cursor
+from src.utils.replicas import replica_set
+from src.utils.token_revocation import token_revocation
 
 RedisDep = Annotated[Redis, Depends(get_redis)]
+RedisBinaryDep = Annotated[Redis, Depends(get_redis_binary)]
 
 
-async def get_db():
-    async with DbManager(session_factory=async_session_maker) as db:
+# Методы без побочных эффектов: их обработчики в базу не пишут
+READ_ONLY_METHODS = frozenset({"GET", "HEAD", "OPTIONS"})
+# До какого времени (unix) клиент читает с primary после своей записи
+READ_PRIMARY_COOKIE = "read_primary_until"
+
+
+def _reads_primary(request: Request) -> bool:
+    try:
+        return float(request.cookies.get(READ_PRIMARY_COOKIE, 0)) > time.time()
+    except ValueError:
+        return False
+
+
+async def get_db(request: Request, response: Response):
+    if request.method in READ_ONLY_METHODS:
+        manager = DbManager(
+            session_factory=async_session_maker_read_only,
+            read_only=True,
+            replicas=None if _reads_primary(request) else replica_set,
+        )
+    else:
+
+        def stick_to_primary():
+            ttl = settings.DB_READ_YOUR_WRITES_SECONDS
+            response.set_cookie(READ_PRIMARY_COOKIE, str(time.time() + ttl), max_age=ttl)
+
+        manager = DbManager(session_factory=async_session_maker, on_commit=stick_to_primary)
+    async with manager as db:
         yield db
 
 
 DBDep = Annotated[DbManager, Depends(get_db)]
 
 
-def get_hotels_service(db: DBDep, redis: RedisDep) -> HotelsService:
-    return HotelsService(db, redis)
+def get_hotels_service(db: DBDep, redis: RedisDep, redis_binary: RedisBinaryDep) -> HotelsService:
+    return HotelsService(db, redis, redis_binary)
 
 
 HotelsServiceDep = Annotated[HotelsService, Depends(get_hotels_service)]
@@ -55,17 +89,49 @@ def get_facilities_service(db: DBDep) -> FacilitiesService:
 FacilitiesServiceDep = Annotated[FacilitiesService, Depends(get_facilities_service)]
 
 
+def get_pricing_service(db: DBDep) -> PricingService:
+    return PricingService(db)
+
+
+PricingServiceDep = Annotated[PricingService, Depends(get_pricing_service)]
+
+
 class PaginationParams(BaseModel):
     page: Annotated[int, Query(ge=1, description="Страница")] = 1
     per_page: Annotated[
         int,
         Query(ge=1, le=100, description="Количество объектов на странице"),
     ] = 5
+    cursor: Annotated[
+        str | None,
+        Query(description="Курсор следующей страницы из заголовка X-Next-Cursor"),
+    ] = None
+    with_total: Annotated[
+        bool,
+        Query(description="Вернуть общее количество в заголовке X-Total-Count"),
+    ] = False
 
     @property
     def offset(self) -> int:
         return (self.page - 1) * self.per_page
 
+    def after(self, *parsers: Callable) -> tuple | None:
+        """Ключ сортировки, после которого начинается страница (режим курсора).
+
+        parsers приводят значения из курсора к типам колонок сортировки.
+        """
+        if self.cursor is None:
+            return None
+        try:
+            values = decode_cursor(self.cursor)
+            if len(values) != len(parsers):
+                raise ValueError("Некорректный курсор")
+            return tuple(parse(value) for parse, value in zip(parsers, values, strict=True))
+        except (ValueError, TypeError) as err:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST, detail="Некорректный курсор"
+            ) from err
+
 
 PaginationDep = Annotated[PaginationParams, Depends()]
 
@@ -78,8 +144,31 @@ def require_access_cookie(request: Request) -> None:
         )
 
 
+async def _ensure_not_revoked(payload: TokenPayload) -> TokenPayload:
+    if await token_revocation.is_revoked(payload):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail={"code": ErrorCode.TOKEN_REVOKED},
+        )
+    return payload
+
+
+async def access_token_required(
+    payload: TokenPayload = Depends(security.access_token_required),
+) -> TokenPayload:
+    """security.access_token_required с проверкой отзыва токена."""
+    return await _ensure_not_revoked(payload)
+
+
+async def refresh_token_required(
+    payload: TokenPayload = Depends(security.refresh_token_required),
+) -> TokenPayload:
+    """security.refresh_token_required с проверкой отзыва токена."""
+    return await _ensure_not_revoked(payload)
+
+
 async def get_current_user(
-    payload: TokenPayload = Depends(security.access_token_required), db: DBDep = None
+    payload: TokenPayload = Depends(access_token_required), db: DBDep = None
 ):
     try:
         user_id = int(payload.sub)
@@ -90,8 +179,8 @@ async def get_current_user(
         ) from err
 
     try:
-        db_user = await db.users.get_one_or_none(id=user_id)
-        if db_user is None:
+        user = await UserService.get_principal(db, user_id)
+        if user is None:
             raise ObjectNotFoundException
     except ObjectNotFoundException as err:
         raise HTTPException(
@@ -99,7 +188,7 @@ async def get_current_user(
             detail={"code": ErrorCode.USER_NOT_FOUND},
         ) from err
 
-    return db_user
+    return user
 
 
 async def is_admin_required(
@@ -1,17 +1,27 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from datetime import date
+
+from fastapi import APIRouter, Depends, HTTPException, Response, status
 
 from src.api.dependencies import (
     BookingServiceDep,
     PaginationDep,
     get_current_user,
+    is_admin_required,
     require_access_cookie,
 )
 from src.exceptions import (
+    BookingConflictsException,
     ObjectIsAlreadyExistsException,
     ObjectNotAllowedException,
     ObjectNotFoundException,
 )
-from src.schemas.booking import BookingCreateSchema, BookingReadSchema
+from src.schemas.booking import (
+    BookingBatchCreateSchema,
+    BookingCreateSchema,
+    BookingReadSchema,
+)
+from src.utils.availability_index import availability_index
+from src.utils.pagination import set_pagination_headers
 
 router = APIRouter(prefix="/bookings", tags=["Бронирование"])
 
@@ -25,14 +35,31 @@ router = APIRouter(prefix="/bookings", tags=["Бронирование"])
 async def get_my_bookings(
     service: BookingServiceDep,
     pagination: PaginationDep,
+    response: Response,
     current_user=Depends(get_current_user),
 ):
     """Возвращает список броней текущего авторизованного пользователя."""
-    return await service.get_user_bookings(
+    bookings = await service.get_user_bookings(
         user_id=current_user.id,
         limit=pagination.per_page,
         offset=pagination.offset,
+        after=pagination.after(date.fromisoformat, int),
+    )
+    total = await service.count_user_bookings(current_user.id) if pagination.with_total else None
+    set_pagination_headers(
+        response, bookings, pagination.per_page, sort_keys=("date_from", "id"), total=total
     )
+    return bookings
+
+
+@router.get(
+    "/availability-index",
+    summary="Состояние индекса занятости номеров",
+    dependencies=[Depends(is_admin_required)],
+)
+async def get_availability_index_stats():
+    """Размер индекса в памяти, его отставание от событий и признак актуальности."""
+    return availability_index.stats()
 
 
 @router.post(
@@ -60,6 +87,35 @@ async def add_booking(
         ) from err
 
 
+@router.post(
+    "/batch",
+    summary="Групповое бронирование",
+    response_model=list[BookingReadSchema],
+    dependencies=[Depends(require_access_cookie)],
+)
+async def add_bookings_batch(
+    batch: BookingBatchCreateSchema,
+    service: BookingServiceDep,
+    current_user=Depends(get_current_user),
+):
+    """Бронирует несколько номеров разом. Если хотя бы один недоступен — не бронируется ничего."""
+    try:
+        return await service.add_bookings(batch.bookings, current_user)
+    except BookingConflictsException as err:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail={
+                "message": err.detail,
+                "conflicts": [conflict.model_dump(mode="json") for conflict in err.conflicts],
+            },
+        ) from err
+    except ObjectIsAlreadyExistsException as err:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Не удалось забронировать номера, попробуйте ещё раз.",
+        ) from err
+
+
 @router.delete(
     "/{booking_id}",
     dependencies=[Depends(require_access_cookie)],
@@ -0,0 +1,46 @@
+from datetime import date
+
+from fastapi import APIRouter, Depends, Query
+from fastapi.responses import StreamingResponse
+
+from src.api.dependencies import is_admin_required
+from src.database import async_session_maker_read_only
+from src.enums import ExportFormat
+from src.services.export import ExportService
+from src.utils.export import MEDIA_TYPES
+
+router = APIRouter(
+    prefix="/admin/export",
+    tags=["Выгрузки"],
+    dependencies=[Depends(is_admin_required)],
+)
+
+
+def export_response(rows, fmt: ExportFormat, name: str) -> StreamingResponse:
+    return StreamingResponse(
+        rows,
+        media_type=MEDIA_TYPES[fmt],
+        headers={"Content-Disposition": f'attachment; filename="{name}.{fmt}"'},
+    )
+
+
+@router.get("/bookings", summary="Выгрузка броней")
+async def export_bookings(
+    fmt: ExportFormat = Query(default=ExportFormat.ndjson, alias="format"),
+    user_id: int | None = None,
+    room_id: int | None = None,
+    date_from: date | None = Query(default=None, description="Заезд не раньше"),
+    date_to: date | None = Query(default=None, description="Выезд не позже"),
+):
+    """Потоковая выгрузка броней в NDJSON или CSV с постоянным расходом памяти."""
+    rows = ExportService(async_session_maker_read_only).stream_bookings(
+        fmt, user_id=user_id, room_id=room_id, date_from=date_from, date_to=date_to
+    )
+    return export_response(rows, fmt, "bookings")
+
+
+@router.get("/users", summary="Выгрузка пользователей")
+async def export_users(fmt: ExportFormat = Query(default=ExportFormat.ndjson, alias="format")):
+    """Потоковая выгрузка пользователей в NDJSON или CSV без хешей паролей."""
+    rows = ExportService(async_session_maker_read_only).stream_users(fmt)
+    return export_response(rows, fmt, "users")
@@ -1,15 +1,21 @@
-from fastapi import APIRouter, HTTPException, status
+from fastapi import APIRouter, HTTPException, Request, Response, status
 
 from src.api.dependencies import FacilitiesServiceDep
 from src.exceptions import ObjectIsAlreadyExistsException, ObjectNotFoundException
 from src.schemas.facilities import FacilitiesReadSchema, FatilitiesAddSchema
+from src.utils.http_cache import catalog_etag, is_not_modified, not_modified, set_cache_headers
 
 router = APIRouter(prefix="/facilities", tags=["Предметы в номерах"])
 
 
 @router.get("", summary="Получение списка предметов", response_model=list[FacilitiesReadSchema])
-async def get_facilities(service: FacilitiesServiceDep):
-    return await service.get_all()
+async def get_facilities(service: FacilitiesServiceDep, request: Request, response: Response):
+    etag = await catalog_etag(request, "facilities", "rooms")
+    if is_not_modified(request, etag):
+        return not_modified(etag)
+    facilities = await service.get_all()
+    set_cache_headers(response, etag)
+    return facilities
 
 
 @router.get(
@@ -1,4 +1,4 @@
-from fastapi import APIRouter, HTTPException, status
+from fastapi import APIRouter, HTTPException, Request, Response, status
 from fastapi.params import Depends
 
 from src.api.dependencies import (
@@ -8,6 +8,8 @@ from src.api.dependencies import (
 )
 from src.exceptions import ObjectIsAlreadyExistsException, ObjectNotFoundException
 from src.schemas.hotels import ChangeHotelSchema, HotelsReadSchema, HotelsSchema
+from src.utils.http_cache import catalog_etag, is_not_modified, not_modified, set_cache_headers
+from src.utils.pagination import TOTAL_COUNT_HEADER
 
 router = APIRouter(prefix="/hotels", tags=["Отели"])
 
@@ -17,21 +19,37 @@ router = APIRouter(prefix="/hotels", tags=["Отели"])
     summary="Получение списка отелей",
     response_model=list[HotelsReadSchema],
 )
-async def get_hotels(pagination: PaginationDep, service: HotelsServiceDep):
-    return await service.get_all(pagination)
+async def get_hotels(pagination: PaginationDep, service: HotelsServiceDep, request: Request):
+    etag = await catalog_etag(request, "hotels")
+    if is_not_modified(request, etag):
+        return not_modified(etag)
+    after = pagination.after(int)
+    page = await service.get_all(pagination, after_id=after[0] if after else None)
+    headers = dict(page.headers)
+    if pagination.with_total:
+        headers[TOTAL_COUNT_HEADER] = str(await service.estimate_count())
+    # Тело уже сериализовано при записи в кэш — отдаём байты без повторной валидации
+    response = Response(content=page.body, media_type="application/json", headers=headers)
+    set_cache_headers(response, etag)
+    return response
 
 
 @router.get(
     "/{hotel_id}",
     summary="Получение отеля по id",
 )
-async def get_hotel(hotel_id: int, service: HotelsServiceDep):
+async def get_hotel(hotel_id: int, service: HotelsServiceDep, request: Request, response: Response):
+    etag = await catalog_etag(request, f"hotel:{hotel_id}")
+    if is_not_modified(request, etag):
+        return not_modified(etag)
     try:
-        return await service.get_by_id(hotel_id)
+        hotel = await service.get_by_id(hotel_id)
     except ObjectNotFoundException as err:
         raise HTTPException(
             status_code=404, detail=f"Отеля с id: {hotel_id} не существует"
         ) from err
+    set_cache_headers(response, etag)
+    return hotel
 
 
 @router.post("/add_hotel", summary="Добавление отеля", dependencies=[Depends(is_admin_required)])
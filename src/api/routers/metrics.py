@@ -0,0 +1,45 @@
+from fastapi import APIRouter, Depends
+
+from src.api.dependencies import is_admin_required
+from src.cache import get_cache_stats
+from src.utils.password_hasher import password_hasher
+from src.utils.pool_metrics import get_pool_stats
+from src.utils.rate_limit import rate_limiter
+from src.utils.replicas import replica_set
+from src.utils.token_revocation import token_revocation
+
+router = APIRouter(
+    prefix="/metrics",
+    tags=["Метрики"],
+    dependencies=[Depends(is_admin_required)],
+)
+
+
+@router.get("/cache", summary="Попадания и промахи кэша по уровням")
+async def cache_metrics():
+    return get_cache_stats()
+
+
+@router.get("/password-hashing", summary="Очередь и время хеширования паролей")
+async def password_hashing_metrics():
+    return password_hasher.stats()
+
+
+@router.get("/rate-limit", summary="Решения и накладные расходы rate limiter")
+async def rate_limit_metrics():
+    return rate_limiter.stats()
+
+
+@router.get("/token-revocation", summary="Фильтр отозванных токенов")
+async def token_revocation_metrics():
+    return token_revocation.stats()
+
+
+@router.get("/replicas", summary="Состояние и отставание реплик")
+async def replica_metrics():
+    return replica_set.stats()
+
+
+@router.get("/db-pools", summary="Пулы соединений с базой")
+async def db_pool_metrics():
+    return get_pool_stats()
@@ -1,16 +1,123 @@
-from fastapi import APIRouter, HTTPException, status
+from datetime import date
+
+from fastapi import APIRouter, HTTPException, Query, Request, Response, status
 from fastapi.params import Depends
 
-from src.api.dependencies import RoomsServiceDep, is_admin_required
+from src.api.dependencies import PricingServiceDep, RoomsServiceDep, is_admin_required
 from src.exceptions import ObjectIsAlreadyExistsException, ObjectNotFoundException
-from src.schemas.rooms import AddRoomSchema, ChangeRoomSchema, RoomSchema
+from src.schemas.pricing import (
+    PriceRuleAddSchema,
+    PriceRuleSchema,
+    RoomQuoteSchema,
+    check_quote_dates,
+)
+from src.schemas.rooms import (
+    AddRoomSchema,
+    ChangeRoomSchema,
+    RoomAvailableSchema,
+    RoomSchema,
+)
+from src.utils.http_cache import catalog_etag, is_not_modified, not_modified, set_cache_headers
 
 router = APIRouter(prefix="/rooms", tags=["Отельные номера"])
 
 
 @router.get("", summary="Список номеров", response_model=list[RoomSchema])
-async def get_rooms(service: RoomsServiceDep):
-    return await service.get_all()
+async def get_rooms(service: RoomsServiceDep, request: Request, response: Response):
+    etag = await catalog_etag(request, "rooms")
+    if is_not_modified(request, etag):
+        return not_modified(etag)
+    rooms = await service.get_all()
+    set_cache_headers(response, etag)
+    return rooms
+
+
+@router.get(
+    "/available",
+    summary="Свободные номера на даты",
+    response_model=list[RoomAvailableSchema],
+)
+async def get_available_rooms(
+    service: RoomsServiceDep,
+    date_from: date = Query(description="Дата заезда"),
+    date_to: date = Query(description="Дата выезда"),
+    hotel_id: int | None = Query(default=None, gt=0),
+    location: str | None = Query(default=None, max_length=50),
+):
+    """Свободные номера отеля или города с количеством доступных единиц."""
+    if date_from >= date_to:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="date_from должен быть раньше date_to",
+        )
+    if hotel_id is None and location is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Укажите hotel_id или location",
+        )
+    return await service.get_available(
+        date_from=date_from, date_to=date_to, hotel_id=hotel_id, location=location
+    )
+
+
+@router.get(
+    "/quote",
+    summary="Стоимость проживания в номерах",
+    response_model=list[RoomQuoteSchema],
+)
+async def quote_rooms(
+    service: PricingServiceDep,
+    room_ids: list[int] = Query(min_length=1, max_length=100),
+    date_from: date = Query(description="Дата заезда"),
+    date_to: date = Query(description="Дата выезда"),
+):
+    """Цена проживания за период сразу для нескольких номеров с учётом правил цен."""
+    try:
+        check_quote_dates(date_from, date_to)
+    except ValueError as err:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(err)) from err
+    return await service.quote(room_ids, date_from, date_to)
+
+
+@router.get(
+    "/{room_id}/price-rules",
+    summary="Правила цен номера",
+    response_model=list[PriceRuleSchema],
+)
+async def get_price_rules(room_id: int, service: PricingServiceDep):
+    return await service.get_rules(room_id)
+
+
+@router.post(
+    "/{room_id}/price-rules",
+    summary="Добавление правила цены",
+    response_model=PriceRuleSchema,
+    dependencies=[Depends(is_admin_required)],
+)
+async def add_price_rule(room_id: int, rule: PriceRuleAddSchema, service: PricingServiceDep):
+    try:
+        return await service.add_rule(room_id, rule)
+    except ObjectNotFoundException as err:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Комнаты с таким номером не найдено",
+        ) from err
+
+
+@router.delete(
+    "/price-rules/{rule_id}",
+    summary="Удаление правила цены",
+    dependencies=[Depends(is_admin_required)],
+    status_code=status.HTTP_204_NO_CONTENT,
+)
+async def delete_price_rule(rule_id: int, service: PricingServiceDep):
+    try:
+        await service.delete_rule(rule_id)
+    except ObjectNotFoundException as err:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Правило с таким id не найдено",
+        ) from err
 
 
 @router.get("/{room_id}", summary="Получение номера", response_model=RoomSchema)
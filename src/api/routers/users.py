@@ -1,14 +1,15 @@
 from authx import TokenPayload
-from fastapi import APIRouter, Depends, HTTPException, Response, status
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
 
 from src.api.dependencies import (
     DBDep,
     PaginationDep,
     get_current_user,
     is_admin_required,
+    refresh_token_required,
     require_access_cookie,
 )
-from src.config import config as authx_config, security
+from src.config import config as authx_config, security, settings
 from src.enums import ErrorCode
 from src.exceptions import (
     ObjectIsAlreadyExistsException,
@@ -24,9 +25,37 @@ from src.schemas.users import (
 )
 from src.services.auth import AuthService
 from src.services.users import UserService
+from src.utils.pagination import set_pagination_headers
+from src.utils.rate_limit import RateLimit, by_ip, enforce_rate_limit, rate_limit
+from src.utils.token_revocation import token_revocation, token_timestamp
 
 router = APIRouter(prefix="/users", tags=["Пользователи"])
 
+login_limits = [
+    Depends(
+        rate_limit(
+            "login",
+            RateLimit(settings.RATE_LIMIT_LOGIN_CAPACITY, settings.RATE_LIMIT_LOGIN_PER_SECOND),
+        )
+    ),
+]
+# Подбор пароля к одному аккаунту. Корзина — на пару (аккаунт, IP): общую на аккаунт
+# исчерпал бы любой, кто знает email, и настоящий владелец не смог бы войти. Общей
+# корзины на весь эндпоинт нет по той же причине
+login_account_limit = RateLimit(
+    settings.RATE_LIMIT_LOGIN_ACCOUNT_CAPACITY, settings.RATE_LIMIT_LOGIN_ACCOUNT_PER_SECOND
+)
+register_limits = [
+    Depends(
+        rate_limit(
+            "register",
+            RateLimit(
+                settings.RATE_LIMIT_REGISTER_CAPACITY, settings.RATE_LIMIT_REGISTER_PER_SECOND
+            ),
+        )
+    ),
+]
+
 
 @router.get(
     "",
@@ -36,12 +65,17 @@ router = APIRouter(prefix="/users", tags=["Пользователи"])
         Depends(is_admin_required),
     ],
 )
-async def get_users(db: DBDep, pagination: PaginationDep):
-    return await UserService.get_all(
+async def get_users(db: DBDep, pagination: PaginationDep, response: Response):
+    after = pagination.after(int)
+    users = await UserService.get_all(
         db,
         limit=pagination.per_page,
         offset=pagination.offset,
+        after_id=after[0] if after else None,
     )
+    total = await UserService.estimate_count(db) if pagination.with_total else None
+    set_pagination_headers(response, users, pagination.per_page, total=total)
+    return users
 
 
 @router.get(
@@ -80,6 +114,7 @@ async def get_user(user_id: int, db: DBDep):
     summary="Создание пользователя",
     response_model=UserReadSchema,
     status_code=status.HTTP_201_CREATED,
+    dependencies=register_limits,
 )
 async def register_user(user: UserCreateSchema, db: DBDep):
     if user.password != user.confirm_password:
@@ -125,8 +160,10 @@ async def user_change_password(
     response: Response,
     current_user=Depends(get_current_user),
 ):
-    if not AuthService().verify_password(
-        credentials.current_password, current_user.hashed_password
+    # В кэшированном пользователе хеша нет — читаем его из базы
+    db_user = await UserService.get_me(db, current_user.id)
+    if db_user is None or not await AuthService().verify_password(
+        credentials.current_password, db_user.hashed_password
     ):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -142,8 +179,11 @@ async def user_change_password(
 
 
 # Вход пользователя в аккаунт
-@router.post("/login", summary="Вход пользователя")
-async def user_login(user_in: UserLoginSchema, response: Response, db: DBDep):
+@router.post("/login", summary="Вход пользователя", dependencies=login_limits)
+async def user_login(user_in: UserLoginSchema, request: Request, response: Response, db: DBDep):
+    await enforce_rate_limit(
+        f"login:account:{user_in.email.lower()}:{by_ip(request)}", login_account_limit
+    )
     try:
         db_user = await AuthService().login(db, user_in.email, user_in.password)
     except ObjectNotValidException as err:
@@ -163,7 +203,18 @@ async def user_login(user_in: UserLoginSchema, response: Response, db: DBDep):
 
 # Выход пользователя из аккаунта
 @router.post("/logout", summary="Выход пользователя")
-async def user_logout(response: Response):
+async def user_logout(request: Request, response: Response):
+    # Отзываем сами токены: удаление cookie не мешает использовать их копии
+    for cookie_name in (authx_config.JWT_ACCESS_COOKIE_NAME, authx_config.JWT_REFRESH_COOKIE_NAME):
+        token = request.cookies.get(cookie_name)
+        if token is None:
+            continue
+        try:
+            payload = security._decode_token(token)
+        except Exception:
+            continue
+        if payload.jti and payload.exp is not None:
+            await token_revocation.revoke_token(payload.jti, token_timestamp(payload.exp))
     response.delete_cookie(authx_config.JWT_ACCESS_COOKIE_NAME)
     response.delete_cookie(authx_config.JWT_REFRESH_COOKIE_NAME)
     return {"logout": True}
@@ -187,9 +238,7 @@ async def delete_user(user_id: int, db: DBDep):
 
 
 @router.post("/refresh")
-async def refresh(
-    response: Response, payload: TokenPayload = Depends(security.refresh_token_required)
-):
+async def refresh(response: Response, payload: TokenPayload = Depends(refresh_token_required)):
     new_access = AuthService.refresh_access_token(payload.sub)
     security.set_access_cookies(new_access, response=response)
     return {"message": "refreshed token"}
@@ -1,27 +1,596 @@
+import asyncio
+import functools
+import inspect
+import json
+import math
+import random
+import struct
+import time
+import uuid
+from collections import OrderedDict
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+
+from pydantic import BaseModel, TypeAdapter
 from redis.asyncio import Redis
 
+from src.config import settings
+
+# zstd необязателен: stdlib с Python 3.14, иначе пакет zstandard, если установлен
+try:
+    from compression.zstd import (
+        ZstdError,
+        compress as zstd_compress,
+        decompress as zstd_decompress,
+    )
+except ImportError:
+    try:
+        import zstandard
+    except ImportError:
+        zstd_compress = zstd_decompress = None
+        ZstdError = ValueError
+    else:
+        zstd_compress = zstandard.ZstdCompressor().compress
+        zstd_decompress = zstandard.ZstdDecompressor().decompress
+        ZstdError = zstandard.ZstdError
+
+# Канал, по которому воркеры сообщают друг другу об инвалидации
+INVALIDATION_CHANNEL = "cache:invalidate"
+
 # Глобальный экземпляр — создаётся один раз при старте приложения
 redis_client: Redis | None = None
+# Клиент без декодирования ответов — для готовых байтов ответа
+redis_binary_client: Redis | None = None
+_invalidation_listener: asyncio.Task | None = None
+# Выставлен, пока считается значение для общего кэша. Такое значение переживёт
+# запрос и попадёт под новое поколение, поэтому DbManager читает его с primary,
+# а не с реплики, которая может ещё не видеть последнюю запись
+filling_cache: ContextVar[bool] = ContextVar("filling_cache", default=False)
+
+
+class LocalCache:
+    """Ограниченный по размеру LRU-кэш с TTL в памяти процесса.
+
+    invalidations растёт при каждом сбросе. Значение, прочитанное из Redis до
+    сброса, а записываемое после, передаётся в set с since — счётчиком на момент
+    начала чтения — и отбрасывается, если сброс успел случиться.
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: float) -> None:
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self._data: OrderedDict[str, tuple[float, object]] = OrderedDict()
+
+    def get(self, key: str):
+        entry = self._data.get(key)
+        if entry is None or entry[0] < time.monotonic():
+            if entry is not None:
+                del self._data[key]
+            self.misses += 1
+            return None
+        self._data.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+
+    def set(
+        self, key: str, value, ttl_seconds: float | None = None, since: int | None = None
+    ) -> None:
+        if since is not None and since != self.invalidations:
+            return
+        ttl = self.ttl_seconds if ttl_seconds is None else min(ttl_seconds, self.ttl_seconds)
+        self._data[key] = (time.monotonic() + ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.max_entries:
+            self._data.popitem(last=False)
+
+    def delete_prefix(self, prefix: str) -> None:
+        self.invalidations += 1
+        for key in [key for key in self._data if key.startswith(prefix)]:
+            del self._data[key]
+
+    def clear(self) -> None:
+        self.invalidations += 1
+        self._data.clear()
+
+    def stats(self) -> dict:
+        return {"hits": self.hits, "misses": self.misses, "size": len(self._data)}
+
+
+local_cache = LocalCache(
+    max_entries=settings.LOCAL_CACHE_MAX_ENTRIES,
+    ttl_seconds=settings.LOCAL_CACHE_TTL_SECONDS,
+)
+redis_cache_stats = {"hits": 0, "misses": 0}
+# Попадания и промахи по каждой функции под @cached
+function_cache_stats: dict[str, dict[str, int]] = {}
 
 
 async def init_redis(url: str) -> None:
     """Вызывается при старте приложения."""
-    global redis_client
+    global redis_client, redis_binary_client, _invalidation_listener
     redis_client = Redis.from_url(
         url,
         encoding="utf-8",
         decode_responses=True,  # автоматически декодировать bytes -> str
     )
+    redis_binary_client = Redis.from_url(url, decode_responses=False)
+    _invalidation_listener = asyncio.create_task(_listen_invalidations(redis_client))
 
 
 async def close_redis() -> None:
     """Вызывается при остановке приложения."""
-    global redis_client
+    if _invalidation_listener:
+        _invalidation_listener.cancel()
     if redis_client:
         await redis_client.aclose()
+    if redis_binary_client:
+        await redis_binary_client.aclose()
 
 
 def get_redis() -> Redis:
     """Dependency для FastAPI."""
     assert redis_client is not None, "Redis не инициализирован"
     return redis_client
+
+
+def get_redis_binary() -> Redis:
+    """Dependency для FastAPI: клиент, возвращающий bytes."""
+    assert redis_binary_client is not None, "Redis не инициализирован"
+    return redis_binary_client
+
+
+async def _listen_invalidations(redis: Redis) -> None:
+    """Сбрасывает локальный кэш по сообщениям других воркеров."""
+    while True:
+        try:
+            async with redis.pubsub() as pubsub:
+                await pubsub.subscribe(INVALIDATION_CHANNEL)
+                async for message in pubsub.listen():
+                    if message["type"] == "message":
+                        local_cache.delete_prefix(message["data"])
+        except asyncio.CancelledError:
+            raise
+        except Exception as err:
+            # Пока подписки нет, сообщения теряются — локальному кэшу верить нельзя
+            print("cache invalidation listener error:", repr(err))
+            local_cache.clear()
+            await asyncio.sleep(1)
+
+
+def get_cache_stats() -> dict:
+    functions = {
+        name: {**stats, "hit_ratio": stats["hits"] / max(stats["hits"] + stats["misses"], 1)}
+        for name, stats in function_cache_stats.items()
+    }
+    return {"local": local_cache.stats(), "redis": dict(redis_cache_stats), "functions": functions}
+
+
+# Снимает лок, только если он всё ещё наш
+RELEASE_LOCK_SCRIPT = """
+if redis.call("get", KEYS[1]) == ARGV[1] then
+    return redis.call("del", KEYS[1])
+end
+return 0
+"""
+
+# Пересчёты, идущие прямо сейчас в этом процессе: ключ -> задача
+_inflight: dict[str, asyncio.Task] = {}
+
+
+def _should_refresh_early(envelope: dict, beta: float) -> bool:
+    """Вероятностное раннее обновление (XFetch).
+
+    Чем ближе истечение и дольше пересчёт, тем выше шанс, что этот запрос
+    обновит ключ заранее, пока остальные ещё читают старое значение.
+    """
+    # 1 - random() лежит в (0, 1], логарифм определён
+    jitter = -envelope["delta"] * beta * math.log(1.0 - random.random())
+    return time.time() + jitter >= envelope["exp"]
+
+
+class TwoTierCache:
+    """Локальный LRU+TTL перед Redis. В Redis лежит JSON, локально — готовые объекты.
+
+    В Redis значение хранится в конверте {"v", "exp", "delta"}: логическое время
+    истечения и длительность пересчёта. Сам ключ живёт дольше на CACHE_STALE_SECONDS,
+    чтобы во время пересчёта остальным можно было отдать устаревшее значение.
+    """
+
+    def __init__(self, redis: Redis, local: LocalCache = local_cache) -> None:
+        self.redis = redis
+        self.local = local
+
+    async def _get_envelope(self, key: str) -> dict | None:
+        cached = await self.redis.get(key)
+        return json.loads(cached) if cached is not None else None
+
+    async def _set_envelope(self, key: str, value, ex: int, delta: float) -> None:
+        envelope = {"v": value, "exp": time.time() + ex, "delta": delta}
+        await self.redis.set(key, json.dumps(envelope), ex=ex + settings.CACHE_STALE_SECONDS)
+        self.local.set(key, value, ttl_seconds=ex)
+
+    async def get_json(self, key: str):
+        value = self.local.get(key)
+        if value is not None:
+            return value
+
+        envelope = await self._get_envelope(key)
+        if envelope is None or envelope["exp"] < time.time():
+            redis_cache_stats["misses"] += 1
+            return None
+        redis_cache_stats["hits"] += 1
+        self.local.set(key, envelope["v"], ttl_seconds=envelope["exp"] - time.time())
+        return envelope["v"]
+
+    async def set_json(self, key: str, value, ex: int) -> None:
+        await self._set_envelope(key, value, ex, delta=0.0)
+
+    async def get_or_compute(self, key: str, compute, ex: int, beta: float = 1.0):
+        """Значение из кэша или пересчитанное ровно одним вызывающим.
+
+        compute — корутинная функция без аргументов, возвращающая JSON-совместимое значение.
+        Она замыкает сессию вызывающего, поэтому общий пересчёт живёт не дольше него:
+        отмена вызывающего отменяет пересчёт, а присоединившиеся к нему начинают заново.
+        """
+        value = self.local.get(key)
+        if value is not None:
+            return value
+
+        envelope = await self._get_envelope(key)
+        if envelope is not None and not _should_refresh_early(envelope, beta):
+            redis_cache_stats["hits"] += 1
+            self.local.set(key, envelope["v"], ttl_seconds=max(envelope["exp"] - time.time(), 0))
+            return envelope["v"]
+        redis_cache_stats["misses"] += 1
+
+        while (task := _inflight.get(key)) is not None:
+            if envelope is not None:
+                return envelope["v"]
+            try:
+                return await asyncio.shield(task)
+            except asyncio.CancelledError:
+                # Отменили нас самих, а не пересчёт, начатый другим запросом
+                if not task.cancelled() or asyncio.current_task().cancelling():
+                    raise
+                if _inflight.get(key) is task:
+                    del _inflight[key]
+
+        task = asyncio.ensure_future(self._recompute(key, compute, ex, envelope))
+        _inflight[key] = task
+        task.add_done_callback(lambda _: _inflight.pop(key, None))
+        try:
+            return await asyncio.shield(task)
+        except asyncio.CancelledError:
+            # Сессия в compute закроется вместе с вызывающим: пересчёт не должен её пережить
+            task.cancel()
+            await asyncio.wait([task])
+            raise
+
+    async def _recompute(self, key: str, compute, ex: int, envelope: dict | None):
+        lock_key = f"{key}:lock"
+        token = uuid.uuid4().hex
+        lock_ms = settings.CACHE_RECOMPUTE_LOCK_MS
+        acquired = await self.redis.set(lock_key, token, nx=True, px=lock_ms)
+        if not acquired:
+            # Ключ пересчитывает другой воркер: отдаём старое значение или ждём новое
+            if envelope is not None:
+                return envelope["v"]
+            deadline = time.monotonic() + lock_ms / 1000
+            while time.monotonic() < deadline:
+                await asyncio.sleep(0.05)
+                fresh = await self._get_envelope(key)
+                if fresh is not None:
+                    return fresh["v"]
+            # Владелец лока не успел — считаем сами
+
+        try:
+            started = time.monotonic()
+            filling_cache.set(True)  # _recompute идёт отдельной задачей со своим контекстом
+            value = await compute()
+            await self._set_envelope(key, value, ex, delta=time.monotonic() - started)
+            return value
+        finally:
+            if acquired:
+                await self.redis.eval(RELEASE_LOCK_SCRIPT, 1, lock_key, token)
+
+
+@dataclass(frozen=True, slots=True)
+class CachedResponse:
+    """Готовое тело JSON-ответа и его заголовки."""
+
+    body: bytes
+    headers: dict[str, str] = field(default_factory=dict)
+
+
+class BinaryTwoTierCache(TwoTierCache):
+    """Двухуровневый кэш готовых ответов в бинарном виде.
+
+    В Redis лежит заголовок (exp, delta, флаги, длина метаданных), JSON с
+    заголовками ответа и само тело. Тела больше CACHE_COMPRESS_MIN_BYTES
+    сжимаются zstd, если он доступен. При попадании тело отдаётся как есть,
+    без json.loads, валидации Pydantic и повторной сериализации.
+    Нужен клиент с decode_responses=False.
+
+    Запись, которую этот процесс не может разобрать (чужой формат или сжатие
+    zstd там, где его нет), считается промахом и перезаписывается.
+    """
+
+    HEADER = struct.Struct("!ddBI")
+    FLAG_ZSTD = 1
+
+    async def _get_envelope(self, key: str) -> dict | None:
+        blob = await self.redis.get(key)
+        if blob is None:
+            return None
+        try:
+            exp, delta, flags, meta_len = self.HEADER.unpack_from(blob)
+            offset = self.HEADER.size
+            headers = json.loads(blob[offset : offset + meta_len])
+            body = blob[offset + meta_len :]
+            if flags & self.FLAG_ZSTD:
+                if zstd_decompress is None:
+                    return None
+                body = zstd_decompress(body)
+        except (struct.error, ValueError, ZstdError):
+            return None
+        return {"v": CachedResponse(body, headers), "exp": exp, "delta": delta}
+
+    async def _set_envelope(self, key: str, value: CachedResponse, ex: int, delta: float):
+        body, flags = value.body, 0
+        if zstd_compress is not None and len(body) >= settings.CACHE_COMPRESS_MIN_BYTES:
+            body, flags = zstd_compress(body), self.FLAG_ZSTD
+        meta = json.dumps(value.headers).encode()
+        header = self.HEADER.pack(time.time() + ex, delta, flags, len(meta))
+        await self.redis.set(key, header + meta + body, ex=ex + settings.CACHE_STALE_SECONDS)
+        self.local.set(key, value, ttl_seconds=ex)
+
+
+class CacheNamespace:
+    """Пространство ключей кэша с номером поколения.
+
+    Поколение зашито в каждый ключ, поэтому инвалидация — один атомарный INCR
+    вместо KEYS + DEL. Старые ключи больше никто не читает, и они истекают по TTL.
+    Значение, посчитанное до инвалидации, запишется под старым поколением
+    и тоже не будет прочитано. Поколение кэшируется локально, а инвалидация
+    рассылается остальным воркерам через pub/sub.
+    """
+
+    def __init__(self, redis: Redis, name: str, local: LocalCache = local_cache) -> None:
+        self.redis = redis
+        self.name = name
+        self.local = local
+
+    @property
+    def generation_key(self) -> str:
+        return f"{self.name}:generation"
+
+    async def key(self, suffix: str) -> str:
+        generation = self.local.get(self.generation_key)
+        if generation is None:
+            since = self.local.invalidations
+            generation = await self.redis.get(self.generation_key) or 0
+            self.local.set(self.generation_key, generation, since=since)
+        return f"{self.name}:g{generation}:{suffix}"
+
+    async def invalidate(self) -> int:
+        generation = await self.redis.incr(self.generation_key)
+        self.local.delete_prefix(self.name)
+        await self.redis.publish(INVALIDATION_CHANNEL, self.name)
+        return generation
+
+
+# Маркер «объекта нет» для негативного кэширования
+NOT_FOUND = "__not_found__"
+# Маркер «только что изменён»: ключ занят, но значения в нём нет
+TOMBSTONE = "__tombstone__"
+
+
+class EntityCache:
+    """Read-through кэш сущностей по первичному ключу.
+
+    Отсутствующие id тоже кэшируются (маркер NOT_FOUND) на короткий
+    negative_ttl (ENTITY_CACHE_NEGATIVE_TTL_SECONDS), чтобы перебор несуществующих id
+    не превращался в запрос к Postgres на каждый вызов. Несколько id
+    читаются одним MGET, промахи дочитываются одним запросом через loader.
+
+    Инвалидация не удаляет ключ, а ставит на ENTITY_CACHE_TOMBSTONE_SECONDS маркер
+    TOMBSTONE, а заполнение пишет только SET NX. Читатель, загрузивший сущность
+    до коммита изменения, не вернёт её старую версию в кэш после инвалидации:
+    ключ занят маркером, и такое чтение просто идёт в базу.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        schema,
+        ttl: int | None = None,
+        negative_ttl: int | None = None,
+        tombstone_ttl: int | None = None,
+        local: LocalCache = local_cache,
+    ) -> None:
+        self.name = name
+        self.adapter = TypeAdapter(schema)
+        self.ttl = settings.ENTITY_CACHE_TTL_SECONDS if ttl is None else ttl
+        self.negative_ttl = (
+            settings.ENTITY_CACHE_NEGATIVE_TTL_SECONDS if negative_ttl is None else negative_ttl
+        )
+        self.tombstone_ttl = (
+            settings.ENTITY_CACHE_TOMBSTONE_SECONDS if tombstone_ttl is None else tombstone_ttl
+        )
+        self.local = local
+
+    def key(self, entity_id: int) -> str:
+        return f"entity:{self.name}:{entity_id}"
+
+    @staticmethod
+    async def _fill(loader, ids: list[int]) -> list:
+        filling = filling_cache.set(True)
+        try:
+            return await loader(ids)
+        finally:
+            filling_cache.reset(filling)
+
+    async def _store(self, values: dict, since: int) -> None:
+        ttls = {}
+        async with redis_client.pipeline(transaction=False) as pipe:
+            for entity_id, value in values.items():
+                if value == NOT_FOUND:
+                    ttls[entity_id] = self.negative_ttl
+                    pipe.set(self.key(entity_id), NOT_FOUND, ex=self.negative_ttl, nx=True)
+                else:
+                    ttls[entity_id] = self.ttl
+                    pipe.set(self.key(entity_id), json.dumps(value), ex=self.ttl, nx=True)
+            stored = await pipe.execute()
+        # Локально запоминается только то, что легло в Redis: занятый ключ — это
+        # маркер инвалидации или более свежее значение соседнего воркера
+        for (entity_id, value), was_stored in zip(values.items(), stored, strict=True):
+            if was_stored:
+                self.local.set(self.key(entity_id), value, ttl_seconds=ttls[entity_id], since=since)
+
+    async def get_many(self, ids: list[int], loader) -> dict:
+        """Сущности по id; для отсутствующих в базе — None.
+
+        loader — корутинная функция, принимающая список id и возвращающая найденные сущности.
+        Она вызывается с выставленным filling_cache, поэтому репозиторий DbManager
+        нужно брать внутри неё, а не передавать готовый bound-метод.
+        """
+        ids = list(dict.fromkeys(ids))
+        if redis_client is None:
+            found = {entity.id: entity for entity in await loader(ids)}
+            return {entity_id: found.get(entity_id) for entity_id in ids}
+
+        raw: dict[int, object] = {}
+        for entity_id in ids:
+            value = self.local.get(self.key(entity_id))
+            if value is not None:
+                raw[entity_id] = value
+        missing = [entity_id for entity_id in ids if entity_id not in raw]
+        since = self.local.invalidations
+        if missing:
+            values = await redis_client.mget([self.key(entity_id) for entity_id in missing])
+            for entity_id, value in zip(missing, values, strict=True):
+                if value is None or value == TOMBSTONE:
+                    continue
+                raw[entity_id] = value if value == NOT_FOUND else json.loads(value)
+                self.local.set(self.key(entity_id), raw[entity_id], since=since)
+                redis_cache_stats["hits"] += 1
+
+        missing = [entity_id for entity_id in ids if entity_id not in raw]
+        if missing:
+            redis_cache_stats["misses"] += len(missing)
+            # Сериализуются только поля schema: лишние поля сущности в кэш не попадают
+            loaded = {
+                entity.id: self.adapter.dump_python(entity, mode="json")
+                for entity in await self._fill(loader, missing)
+            }
+            for entity_id in missing:
+                raw[entity_id] = loaded.get(entity_id, NOT_FOUND)
+            await self._store({entity_id: raw[entity_id] for entity_id in missing}, since)
+
+        return {
+            entity_id: None if value == NOT_FOUND else self.adapter.validate_python(value)
+            for entity_id, value in ((entity_id, raw[entity_id]) for entity_id in ids)
+        }
+
+    async def get(self, entity_id: int, loader):
+        return (await self.get_many([entity_id], loader))[entity_id]
+
+    async def invalidate(self, *ids: int) -> None:
+        if redis_client is None or not ids:
+            return
+        keys = [self.key(entity_id) for entity_id in ids]
+        async with redis_client.pipeline(transaction=False) as pipe:
+            for key in keys:
+                pipe.set(key, TOMBSTONE, ex=self.tombstone_ttl)
+                pipe.publish(INVALIDATION_CHANNEL, key)
+            await pipe.execute()
+        # Сброс по префиксу заденет и соседние id (1 -> 12), это лишь лишний промах
+        for key in keys:
+            self.local.delete_prefix(key)
+
+
+def _tag_generation_key(tag: str) -> str:
+    return f"tag:{tag}:generation"
+
+
+async def tag_generations(redis: Redis, tags: list[str]) -> list[int]:
+    """Поколения тегов: из локального кэша, недостающие — одним MGET."""
+    keys = [_tag_generation_key(tag) for tag in tags]
+    generations = [local_cache.get(key) for key in keys]
+    missing = [i for i, generation in enumerate(generations) if generation is None]
+    if missing:
+        since = local_cache.invalidations
+        values = await redis.mget([keys[i] for i in missing])
+        for i, value in zip(missing, values, strict=True):
+            generations[i] = int(value or 0)
+            local_cache.set(keys[i], generations[i], since=since)
+    return generations
+
+
+async def invalidate_tags(*tags: str) -> None:
+    """Инвалидирует всё, что закэшировано с любым из тегов: INCR поколения тега."""
+    if redis_client is None or not tags:
+        return
+    keys = [_tag_generation_key(tag) for tag in tags]
+    async with redis_client.pipeline(transaction=False) as pipe:
+        for key in keys:
+            pipe.incr(key)
+            pipe.publish(INVALIDATION_CHANNEL, key)
+        await pipe.execute()
+    for key in keys:
+        local_cache.delete_prefix(key)
+
+
+def _key_part(value) -> str:
+    if isinstance(value, BaseModel):
+        return value.model_dump_json()
+    return str(value)
+
+
+def cached(schema, ex: int = 300, tags: tuple[str, ...] = ()):
+    """Кэширует результат метода сервиса в двухуровневом кэше.
+
+    Ключ строится из аргументов (кроме self и db), результат сериализуется
+    через schema. tags — шаблоны вроде "hotel:{hotel_id}", подставляются
+    аргументы вызова; invalidate_tags сбрасывает все ключи с этим тегом.
+    """
+    adapter = TypeAdapter(schema)
+
+    def decorator(func):
+        signature = inspect.signature(func)
+        name = func.__qualname__
+        stats = function_cache_stats.setdefault(name, {"hits": 0, "misses": 0})
+
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            if redis_client is None:
+                return await func(*args, **kwargs)
+
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            params = {k: v for k, v in bound.arguments.items() if k not in ("self", "db")}
+            tag_names = [tag.format(**params) for tag in tags]
+            generations = await tag_generations(redis_client, tag_names)
+            args_key = ":".join(f"{k}={_key_part(v)}" for k, v in params.items())
+            key = f"cache:{name}:{args_key}:g{'.'.join(map(str, generations))}"
+
+            computed = False
+
+            async def compute():
+                nonlocal computed
+                computed = True
+                result = await func(*args, **kwargs)
+                return adapter.dump_python(
+                    adapter.validate_python(result, from_attributes=True), mode="json"
+                )
+
+            value = await TwoTierCache(redis_client).get_or_compute(key, compute, ex=ex)
+            stats["misses" if computed else "hits"] += 1
+            return adapter.validate_python(value)
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,49 @@
+"""Обслуживание календаря room_inventory.
+
+python -m src.commands.inventory backfill  — пересобрать календарь по bookings
+python -m src.commands.inventory check     — сверить календарь с bookings
+"""
+
+import argparse
+import asyncio
+import sys
+
+from src.database import async_session_maker, async_session_maker_read_only
+from src.utils.db_manager import DbManager
+
+
+async def backfill() -> int:
+    async with DbManager(session_factory=async_session_maker) as db:
+        await db.inventory.backfill()
+        await db.commit()
+    print("Календарь room_inventory пересобран")
+    return 0
+
+
+async def check() -> int:
+    async with DbManager(session_factory=async_session_maker_read_only, read_only=True) as db:
+        mismatches = await db.inventory.find_mismatches()
+
+    for item in mismatches:
+        print(
+            f"room_id={item.room_id} day={item.day}: "
+            f"ожидалось {item.expected_units}, в календаре {item.actual_units}"
+        )
+    if mismatches:
+        print(f"Найдено расхождений: {len(mismatches)}")
+        return 1
+    print("Календарь совпадает с bookings")
+    return 0
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Календарь занятости номеров")
+    parser.add_argument("command", choices=["backfill", "check"])
+    args = parser.parse_args()
+
+    commands = {"backfill": backfill, "check": check}
+    sys.exit(asyncio.run(commands[args.command]()))
+
+
+if __name__ == "__main__":
+    main()
@@ -12,11 +12,75 @@ class Settings(BaseSettings):
     DB_PASS: str
     DB_HOST: str
 
+    # Реплики для чтения: postgresql+asyncpg://... ; пусто — всё идёт на primary
+    DB_REPLICA_URLS: list[str] = []
+    DB_REPLICA_MAX_LAG_SECONDS: float = 5.0
+    DB_REPLICA_CHECK_SECONDS: float = 2.0
+    # Сколько после записи клиент читает с primary, чтобы видеть свои изменения
+    DB_READ_YOUR_WRITES_SECONDS: int = 5
+
+    # Пул соединений на воркер (для primary и каждой реплики)
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: float = 30.0
+    DB_POOL_RECYCLE: int = 1800
+    DB_POOL_PRE_PING: bool = True
+    DB_STATEMENT_CACHE_SIZE: int = 100
+    # За PgBouncer в transaction-режиме подготовленные запросы не переживают смену соединения
+    DB_PGBOUNCER: bool = False
+
     REDIS_HOST: str = "localhost"
     REDIS_PORT: int = 6379
 
+    LOCAL_CACHE_MAX_ENTRIES: int = 1024
+    LOCAL_CACHE_TTL_SECONDS: float = 30.0
+    CACHE_STALE_SECONDS: int = 60
+    CACHE_RECOMPUTE_LOCK_MS: int = 5000
+    ENTITY_CACHE_TTL_SECONDS: int = 300
+    ENTITY_CACHE_NEGATIVE_TTL_SECONDS: int = 30
+    ENTITY_CACHE_TOMBSTONE_SECONDS: int = 10
+    CACHE_COMPRESS_MIN_BYTES: int = 16384
+    HTTP_CACHE_MAX_AGE_SECONDS: int = 30
+    PRINCIPAL_CACHE_TTL_SECONDS: int = 60
+
+    # 0 — по числу ядер, но не больше 4
+    PASSWORD_HASH_MAX_CONCURRENCY: int = 0
+
+    # Начиная с этого числа строк админка показывает оценку вместо COUNT(*)
+    ADMIN_EXACT_COUNT_MAX_ROWS: int = 10000
+
+    # Token bucket: ёмкость и пополнение в секунду
+    RATE_LIMIT_ENABLED: bool = True
+    RATE_LIMIT_DEFAULT_CAPACITY: int = 120
+    RATE_LIMIT_DEFAULT_PER_SECOND: float = 20.0
+    RATE_LIMIT_LOGIN_CAPACITY: int = 5
+    RATE_LIMIT_LOGIN_PER_SECOND: float = 5 / 60
+    RATE_LIMIT_LOGIN_ACCOUNT_CAPACITY: int = 10
+    RATE_LIMIT_LOGIN_ACCOUNT_PER_SECOND: float = 10 / 600
+    RATE_LIMIT_REGISTER_CAPACITY: int = 3
+    RATE_LIMIT_REGISTER_PER_SECOND: float = 3 / 600
+
+    AUTH_REVOCATION_SYNC_SECONDS: float = 5.0
+    AUTH_REVOCATION_REBUILD_SECONDS: float = 300.0
+    AUTH_REVOCATION_BLOOM_CAPACITY: int = 100000
+    AUTH_REVOCATION_BLOOM_ERROR_RATE: float = 0.01
+
     JWT_SECRET_KEY: str
 
+    BOOKING_LOCK_TIMEOUT_MS: int = 2000
+    BOOKING_ADMISSION_RETRIES: int = 3
+    BOOKING_MAX_NIGHTS: int = 365
+
+    AVAILABILITY_INDEX_ENABLED: bool = False
+    AVAILABILITY_INDEX_MAX_LAG_SECONDS: float = 5.0
+    # Без событий дольше этого индекс считается устаревшим (консьюмер мог остановиться)
+    AVAILABILITY_INDEX_MAX_IDLE_SECONDS: float = 300.0
+
+    PRICING_HORIZON_DAYS: int = 730
+    PRICING_CACHE_TTL_SECONDS: int = 60
+    # Таблиц в кэше воркера; одна — около 6 КБ на PRICING_HORIZON_DAYS = 730
+    PRICING_CACHE_MAX_ROOMS: int = 2000
+
     @property
     def REDIS_URL(self) -> str:
         return f"redis://{self.REDIS_HOST}:{self.REDIS_PORT}"
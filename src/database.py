@@ -1,15 +1,57 @@
 from typing import Annotated
+from uuid import uuid4
 
 from fastapi import Depends
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import DeclarativeBase
 
 from src.config import settings
+from src.utils.pool_metrics import InstrumentedQueuePool, instrument_pool
 
-engine = create_async_engine(settings.DB_URL)
+
+def create_engine(url: str, name: str):
+    """Движок с пулом из настроек и метриками пула под именем name."""
+    connect_args = {}
+    statement_cache_size = settings.DB_STATEMENT_CACHE_SIZE
+    if settings.DB_PGBOUNCER:
+        statement_cache_size = 0
+        # Уникальные имена, чтобы не столкнуться с чужими statement на том же сервере
+        connect_args["prepared_statement_name_func"] = lambda: f"__asyncpg_{uuid4()}__"
+    connect_args["statement_cache_size"] = statement_cache_size
+    # Кэш подготовленных запросов на стороне адаптера SQLAlchemy
+    connect_args["prepared_statement_cache_size"] = statement_cache_size
+
+    new_engine = create_async_engine(
+        url,
+        poolclass=InstrumentedQueuePool,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+        pool_pre_ping=settings.DB_POOL_PRE_PING,
+        connect_args=connect_args,
+    )
+    instrument_pool(new_engine, name)
+    return new_engine
+
+
+engine = create_engine(settings.DB_URL, "primary")
 
 async_session_maker = async_sessionmaker(bind=engine, expire_on_commit=False)
 
+# Тот же пул, но каждая транзакция открывается как BEGIN READ ONLY
+read_only_engine = engine.execution_options(postgresql_readonly=True)
+async_session_maker_read_only = async_sessionmaker(bind=read_only_engine, expire_on_commit=False)
+
+replica_engines = [
+    create_engine(url, f"replica-{i}").execution_options(postgresql_readonly=True)
+    for i, url in enumerate(settings.DB_REPLICA_URLS, start=1)
+]
+replica_session_makers = [
+    async_sessionmaker(bind=replica_engine, expire_on_commit=False)
+    for replica_engine in replica_engines
+]
+
 
 class Base(DeclarativeBase):
     pass
@@ -8,7 +8,14 @@ class ErrorCode(StrEnum):
     EMAIL_ALREADY_EXISTS = "email_already_exists"
     INVALID_CREDENTIALS = "invalid_credentials"
     TOKEN_EXPIRED = "token_expired"
+    TOKEN_REVOKED = "token_revoked"
     FORBIDDEN = "forbidden"
+    TOO_MANY_REQUESTS = "too_many_requests"
+
+
+class ExportFormat(StrEnum):
+    ndjson = "ndjson"
+    csv = "csv"
 
 
 class BookingEnums(StrEnum):
@@ -18,3 +25,14 @@ class BookingEnums(StrEnum):
 class UserRoles(BookingEnums):
     admin = "Admin"
     user = "User"
+
+
+class BookingConflictReason(BookingEnums):
+    room_not_found = "room_not_found"
+    no_free_units = "no_free_units"
+
+
+class PriceRuleKind(BookingEnums):
+    season = "season"
+    weekday = "weekday"
+    length_of_stay = "length_of_stay"
@@ -19,3 +19,11 @@ class ObjectNotFoundException(BookingException):
 
 class ObjectNotAllowedException(BookingException):
     detail = "Доступ к объекту запрещен"
+
+
+class BookingConflictsException(ObjectIsAlreadyExistsException):
+    detail = "Часть номеров недоступна для бронирования"
+
+    def __init__(self, conflicts: list):
+        super().__init__()
+        self.conflicts = conflicts
@@ -1,13 +1,27 @@
 from faststream.kafka import KafkaRouter
 
+from src.config import settings
+from src.utils.availability_index import availability_index
+
 router = KafkaRouter()
 
 
 @router.subscriber("booking.delete")
 async def handle_booking_delete(data: dict):
     print(f"Получено удаление брони: {data}")
+    if settings.AVAILABILITY_INDEX_ENABLED:
+        availability_index.on_deleted(data)
 
 
 @router.subscriber("booking.created")
 async def handle_booking_created(data: dict):
     print(f"Новая бронь: {data}")
+    if settings.AVAILABILITY_INDEX_ENABLED:
+        availability_index.on_created(data)
+
+
+@router.subscriber("booking.batch_created")
+async def handle_booking_batch_created(data: dict):
+    print(f"Групповая бронь: {data}")
+    if settings.AVAILABILITY_INDEX_ENABLED:
+        availability_index.on_created(data)
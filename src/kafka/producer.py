@@ -4,3 +4,4 @@ broker = KafkaBroker("localhost:9094")
 
 booking_delete_publisher = broker.publisher("booking.delete")
 booking_created_publisher = broker.publisher("booking.created")
+booking_batch_created_publisher = broker.publisher("booking.batch_created")
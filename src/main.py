@@ -1,43 +1,77 @@
 import sys
 from contextlib import asynccontextmanager
+from datetime import date
 from pathlib import Path
 
 sys.path.append(str(Path(__file__).parent.parent))
 
 import uvicorn
-from fastapi import FastAPI
+from fastapi import Depends, FastAPI
 from starlette.middleware.sessions import SessionMiddleware
 
 from src.admin import setup_admin
 from src.api.routers.bookings import router as booking_router
+from src.api.routers.export import router as export_router
 from src.api.routers.facilities import (
     router as facilities_router,
 )
 from src.api.routers.hotels import router as hotels_router
+from src.api.routers.metrics import router as metrics_router
 from src.api.routers.rooms import router as rooms_router
 from src.api.routers.users import router as users_router
 from src.cache import close_redis, init_redis
 from src.config import config, settings
+from src.database import async_session_maker_read_only
 from src.kafka.consumer import router as kafka_router
 from src.kafka.producer import broker
+from src.utils.availability_index import availability_index
+from src.utils.db_manager import DbManager
+from src.utils.password_hasher import password_hasher
+from src.utils.rate_limit import RateLimit, rate_limit
+from src.utils.replicas import replica_set
+from src.utils.token_revocation import token_revocation
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     await init_redis(settings.REDIS_URL)  # Запускаем redis
+    token_revocation.start()  # Синхронизация фильтра отозванных токенов
+    replica_set.start()  # Проверка отставания реплик
 
     broker.include_router(kafka_router)  # Подключаем Kafka-router
+    if settings.AVAILABILITY_INDEX_ENABLED:
+        # События, пришедшие во время загрузки снимка, применятся после неё
+        availability_index.begin_load()
     await broker.start()  # запускаем брокер
+
+    if settings.AVAILABILITY_INDEX_ENABLED:  # Прогреваем индекс занятости номеров
+        async with DbManager(session_factory=async_session_maker_read_only, read_only=True) as db:
+            availability_index.load(await db.booking.get_active_intervals(date.today()))
     yield
     await broker.close()  # останавливаем при завершении
+    token_revocation.stop()
+    replica_set.stop()
     await close_redis()
+    password_hasher.shutdown()
+
 
+# Общий лимит на IP для всех маршрутов; у логина и регистрации — свои, строже.
+# IP берётся из request.client.host: за обратным прокси это адрес прокси, и все
+# клиенты делят одну корзину, пока uvicorn не запущен с --proxy-headers
+# и --forwarded-allow-ips, указывающим на прокси
+default_rate_limit = rate_limit(
+    "default",
+    RateLimit(settings.RATE_LIMIT_DEFAULT_CAPACITY, settings.RATE_LIMIT_DEFAULT_PER_SECOND),
+)
 
-app = FastAPI(lifespan=lifespan)
+app = FastAPI(lifespan=lifespan, dependencies=[Depends(default_rate_limit)])
 
 # Добавляем SessionMiddleware, необходимый для sqladmin
 app.add_middleware(SessionMiddleware, secret_key=config.JWT_SECRET_KEY)
 
+# Выгрузки живут под /admin, поэтому подключаются раньше смонтированной админки
+app.include_router(export_router)
+
 # Подключаем админку
 setup_admin(app)
 
@@ -58,6 +92,7 @@ app.include_router(hotels_router)
 app.include_router(rooms_router)
 app.include_router(facilities_router)
 app.include_router(booking_router)
+app.include_router(metrics_router)
 
 
 if __name__ == "__main__":
@@ -8,6 +8,8 @@ from src.database import Base
 from src.models.bookings import BookingOrm
 from src.models.facilities import FacilitiesOrm, RoomsFacilitiesOrm
 from src.models.hotels import HotelsOrm
+from src.models.inventory import RoomInventoryOrm
+from src.models.pricing import RoomPriceRuleOrm
 from src.models.rooms import RoomsOrm
 from src.models.users import UsersOrm
 
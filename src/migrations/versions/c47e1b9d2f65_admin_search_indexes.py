@@ -0,0 +1,45 @@
+"""admin_search_indexes
+
+Revision ID: c47e1b9d2f65
+Revises: 8a4c6f1d93b2
+Create Date: 2026-10-17 15:12:44.208391
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "c47e1b9d2f65"
+down_revision: Union[str, Sequence[str], None] = "8a4c6f1d93b2"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (индекс, таблица, колонка) для поиска по префиксу lower(col) LIKE 'term%'
+LOWER_PREFIX_INDEXES = [
+    ("ix_users_email_lower", "users", "email"),
+    ("ix_hotels_title_lower", "hotels", "title"),
+    ("ix_hotels_location_lower", "hotels", "location"),
+    ("ix_rooms_title_lower", "rooms", "title"),
+    ("ix_facilities_title_lower", "facilities", "title"),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for name, table, column in LOWER_PREFIX_INDEXES:
+        op.create_index(
+            name,
+            table,
+            [sa.text(f"lower({column}) text_pattern_ops")],
+            unique=False,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for name, table, _ in reversed(LOWER_PREFIX_INDEXES):
+        op.drop_index(name, table_name=table)
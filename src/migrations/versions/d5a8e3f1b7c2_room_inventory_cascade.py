@@ -0,0 +1,41 @@
+"""room_inventory_cascade
+
+Revision ID: d5a8e3f1b7c2
+Revises: c47e1b9d2f65
+Create Date: 2026-10-18 10:04:12.518204
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "d5a8e3f1b7c2"
+down_revision: Union[str, Sequence[str], None] = "c47e1b9d2f65"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Календарь занятости — производные данные номера: удаляется вместе с ним
+    op.drop_constraint("room_inventory_room_id_fkey", "room_inventory", type_="foreignkey")
+    op.create_foreign_key(
+        "room_inventory_room_id_fkey",
+        "room_inventory",
+        "rooms",
+        ["room_id"],
+        ["id"],
+        ondelete="CASCADE",
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_constraint("room_inventory_room_id_fkey", "room_inventory", type_="foreignkey")
+    op.create_foreign_key(
+        "room_inventory_room_id_fkey", "room_inventory", "rooms", ["room_id"], ["id"]
+    )
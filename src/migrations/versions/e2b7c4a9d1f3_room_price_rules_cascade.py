@@ -0,0 +1,41 @@
+"""room_price_rules_cascade
+
+Revision ID: e2b7c4a9d1f3
+Revises: d5a8e3f1b7c2
+Create Date: 2026-10-18 11:21:47.093615
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "e2b7c4a9d1f3"
+down_revision: Union[str, Sequence[str], None] = "d5a8e3f1b7c2"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Правила цен не имеют смысла без номера: удаляются вместе с ним
+    op.drop_constraint("room_price_rules_room_id_fkey", "room_price_rules", type_="foreignkey")
+    op.create_foreign_key(
+        "room_price_rules_room_id_fkey",
+        "room_price_rules",
+        "rooms",
+        ["room_id"],
+        ["id"],
+        ondelete="CASCADE",
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_constraint("room_price_rules_room_id_fkey", "room_price_rules", type_="foreignkey")
+    op.create_foreign_key(
+        "room_price_rules_room_id_fkey", "room_price_rules", "rooms", ["room_id"], ["id"]
+    )
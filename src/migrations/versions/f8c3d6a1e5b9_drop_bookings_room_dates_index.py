@@ -0,0 +1,35 @@
+"""drop_bookings_room_dates_index
+
+Revision ID: f8c3d6a1e5b9
+Revises: e2b7c4a9d1f3
+Create Date: 2026-10-18 14:52:06.418273
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "f8c3d6a1e5b9"
+down_revision: Union[str, Sequence[str], None] = "e2b7c4a9d1f3"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Занятость номеров читается из room_inventory; пересечения по bookings больше не ищутся
+    op.drop_index("ix_bookings_room_id_dates", table_name="bookings")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.create_index(
+        "ix_bookings_room_id_dates",
+        "bookings",
+        ["room_id", "date_from", "date_to"],
+        unique=False,
+    )
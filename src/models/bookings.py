@@ -1,6 +1,6 @@
 from datetime import date
 
-from sqlalchemy import ForeignKey
+from sqlalchemy import ForeignKey, Index
 from sqlalchemy.orm import Mapped, mapped_column
 
 from src.database import Base
@@ -8,6 +8,10 @@ from src.database import Base
 
 class BookingOrm(Base):
     __tablename__ = "bookings"
+    __table_args__ = (
+        # Брони пользователя по дате заезда (DESC читается обратным проходом)
+        Index("ix_bookings_user_id_date_from", "user_id", "date_from"),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True)
     user_id: Mapped[int] = mapped_column(ForeignKey("users.id"))
@@ -1,4 +1,4 @@
-from sqlalchemy import ForeignKey, String
+from sqlalchemy import ForeignKey, Index, String, func
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from src.database import Base
@@ -16,9 +16,17 @@ class FacilitiesOrm(Base):
     )
 
 
+# Поиск по префиксу без учёта регистра в админке: lower(col) LIKE 'term%'
+Index(
+    "ix_facilities_title_lower",
+    func.lower(FacilitiesOrm.title).label("title_lower"),
+    postgresql_ops={"title_lower": "text_pattern_ops"},
+)
+
+
 class RoomsFacilitiesOrm(Base):
     __tablename__ = "room_facilities"
 
     id: Mapped[int] = mapped_column(primary_key=True)
-    room_id: Mapped[int] = mapped_column(ForeignKey("rooms.id"))
-    facilities_id: Mapped[int] = mapped_column(ForeignKey("facilities.id"))
+    room_id: Mapped[int] = mapped_column(ForeignKey("rooms.id"), index=True)
+    facilities_id: Mapped[int] = mapped_column(ForeignKey("facilities.id"), index=True)
@@ -1,4 +1,4 @@
-from sqlalchemy import String
+from sqlalchemy import Index, String, func
 from sqlalchemy.orm import Mapped, mapped_column
 
 from src.database import Base
@@ -10,3 +10,16 @@ class HotelsOrm(Base):
     id: Mapped[int] = mapped_column(primary_key=True)
     title: Mapped[str] = mapped_column(String(100))
     location: Mapped[str] = mapped_column(String(50))
+
+
+# Поиск по префиксу без учёта регистра в админке: lower(col) LIKE 'term%'
+Index(
+    "ix_hotels_title_lower",
+    func.lower(HotelsOrm.title).label("title_lower"),
+    postgresql_ops={"title_lower": "text_pattern_ops"},
+)
+Index(
+    "ix_hotels_location_lower",
+    func.lower(HotelsOrm.location).label("location_lower"),
+    postgresql_ops={"location_lower": "text_pattern_ops"},
+)
@@ -0,0 +1,16 @@
+from datetime import date
+
+from sqlalchemy import ForeignKey
+from sqlalchemy.orm import Mapped, mapped_column
+
+from src.database import Base
+
+
+class RoomInventoryOrm(Base):
+    __tablename__ = "room_inventory"
+
+    room_id: Mapped[int] = mapped_column(
+        ForeignKey("rooms.id", ondelete="CASCADE"), primary_key=True
+    )
+    day: Mapped[date] = mapped_column(primary_key=True)
+    booked_units: Mapped[int] = mapped_column(default=0, server_default="0")
@@ -0,0 +1,20 @@
+from datetime import date
+
+from sqlalchemy import ForeignKey, String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from src.database import Base
+
+
+class RoomPriceRuleOrm(Base):
+    __tablename__ = "room_price_rules"
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    room_id: Mapped[int] = mapped_column(ForeignKey("rooms.id", ondelete="CASCADE"), index=True)
+    kind: Mapped[str] = mapped_column(String(20))
+    multiplier: Mapped[float]
+
+    date_from: Mapped[date | None]
+    date_to: Mapped[date | None]
+    weekday: Mapped[int | None]
+    min_nights: Mapped[int | None]
@@ -1,4 +1,4 @@
-from sqlalchemy import ForeignKey, String
+from sqlalchemy import ForeignKey, Index, String, func
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from src.database import Base
@@ -13,9 +13,17 @@ class RoomsOrm(Base):
     price: Mapped[float]
     quantity: Mapped[int]
 
-    hotel_id: Mapped[int] = mapped_column(ForeignKey("hotels.id"))
+    hotel_id: Mapped[int] = mapped_column(ForeignKey("hotels.id"), index=True)
 
     facilities: Mapped[list["FacilitiesOrm"]] = relationship(
         secondary="room_facilities",
         back_populates="rooms",
     )
+
+
+# Поиск по префиксу без учёта регистра в админке: lower(col) LIKE 'term%'
+Index(
+    "ix_rooms_title_lower",
+    func.lower(RoomsOrm.title).label("title_lower"),
+    postgresql_ops={"title_lower": "text_pattern_ops"},
+)
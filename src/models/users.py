@@ -1,6 +1,6 @@
 from datetime import datetime
 
-from sqlalchemy import String
+from sqlalchemy import Index, String, func
 from sqlalchemy.orm import Mapped, mapped_column
 
 from src.database import Base
@@ -18,3 +18,11 @@ class UsersOrm(Base):
     created_at: Mapped[str] = mapped_column(
         default=lambda: datetime.now().isoformat(), nullable=False
     )
+
+
+# Поиск по префиксу без учёта регистра в админке: lower(col) LIKE 'term%'
+Index(
+    "ix_users_email_lower",
+    func.lower(UsersOrm.email).label("email_lower"),
+    postgresql_ops={"email_lower": "text_pattern_ops"},
+)
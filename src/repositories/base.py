@@ -1,10 +1,24 @@
 from pydantic import BaseModel
-from sqlalchemy import insert, select
+from sqlalchemy import column, delete, func, insert, select, table, update
 from sqlalchemy.exc import IntegrityError
 
 from src.exceptions import ObjectIsAlreadyExistsException, ObjectNotFoundException
 from src.repositories.mappers.base import DataMapper
 
+FOREIGN_KEY_VIOLATION = "23503"
+
+
+async def estimate_rows(session, table_name: str) -> int | None:
+    """Оценка числа строк по статистике планировщика; None, если статистики ещё нет."""
+    pg_class = table("pg_class", column("relname"), column("reltuples"))
+    query = select(pg_class.c.reltuples).where(pg_class.c.relname == table_name)
+    result = await session.execute(query)
+    reltuples = result.scalar_one_or_none()
+    # -1: таблицу ещё не анализировали
+    if reltuples is None or reltuples < 0:
+        return None
+    return int(reltuples)
+
 
 class BaseRepository:
     model = None
@@ -13,14 +27,43 @@ class BaseRepository:
     def __init__(self, session):
         self.session = session
 
-    async def get_all(self, limit=10, offset=0, **filter_by):
-        query = select(self.model)
+    async def get_all(self, limit=10, offset=0, after_id: int | None = None, **filter_by):
+        """Страница по id: LIMIT/OFFSET или, если передан after_id, поиск по ключу."""
+        query = select(self.model).order_by(self.model.id)
         if filter_by:
             query = query.filter_by(**filter_by)
-        query = query.limit(limit).offset(offset)
+        if after_id is not None:
+            query = query.where(self.model.id > after_id).limit(limit)
+        else:
+            query = query.limit(limit).offset(offset)
         result = await self.session.execute(query)
         return [self.mapper.map_to_domain_entity_pyd(model) for model in result.scalars().all()]
 
+    async def stream(self, columns, *where_clauses, batch_size: int = 1000):
+        """Построчное чтение серверным курсором пачками, без ORM-объектов и Pydantic."""
+        query = (
+            select(*columns)
+            .where(*where_clauses)
+            .order_by(self.model.id)
+            .execution_options(yield_per=batch_size)
+        )
+        result = await self.session.stream(query)
+        async for rows in result.mappings().partitions():
+            yield rows
+
+    async def count(self, **filter_by) -> int:
+        query = select(func.count()).select_from(self.model)
+        if filter_by:
+            query = query.filter_by(**filter_by)
+        result = await self.session.execute(query)
+        return result.scalar_one()
+
+    async def estimate_count(self) -> int:
+        """Оценка числа строк по статистике планировщика вместо COUNT(*)."""
+        estimate = await estimate_rows(self.session, self.model.__tablename__)
+        # Статистики нет — считаем честно
+        return await self.count() if estimate is None else estimate
+
     async def get_one_or_none(self, **filter_by):
         query = select(self.model).filter_by(**filter_by)
         result = await self.session.execute(query)
@@ -31,6 +74,11 @@ class BaseRepository:
 
         return self.mapper.map_to_domain_entity_pyd(model)
 
+    async def get_by_ids(self, ids: list[int]):
+        query = select(self.model).where(self.model.id.in_(ids))
+        result = await self.session.execute(query)
+        return [self.mapper.map_to_domain_entity_pyd(model) for model in result.scalars().all()]
+
     async def add(self, data: BaseModel | dict):
         payload = data.model_dump() if isinstance(data, BaseModel) else data
         try:
@@ -40,60 +88,50 @@ class BaseRepository:
         except IntegrityError as err:
             raise ObjectIsAlreadyExistsException from err
 
-    async def add_bulk(self, data: list[BaseModel]):
-        add_data_stmt = insert(self.model).values([d.model_dump() for d in data])
-        await self.session.execute(add_data_stmt)
+    async def add_bulk(self, data: list[BaseModel | dict]):
+        payload = [d.model_dump() if isinstance(d, BaseModel) else d for d in data]
+        try:
+            query = insert(self.model).values(payload).returning(self.model)
+            result = await self.session.execute(query)
+            return [self.mapper.map_to_domain_entity_pyd(model) for model in result.scalars().all()]
+        except IntegrityError as err:
+            raise ObjectIsAlreadyExistsException from err
 
-    async def edit(self, new_model: BaseModel, **filter_by):
-        query = select(self.model).filter_by(**filter_by)
-        result = await self.session.execute(query)
+    async def _update_returning(self, values: dict, **filter_by):
+        """UPDATE ... RETURNING одним запросом, без предварительного SELECT.
 
-        model = result.scalar_one_or_none()
+        Ссылка на несуществующую запись (например, чужой hotel_id) приходит
+        нарушением внешнего ключа и тоже превращается в ObjectNotFoundException.
+        """
+        query = update(self.model).filter_by(**filter_by).values(**values).returning(self.model)
+        try:
+            result = await self.session.execute(query)
+        except IntegrityError as err:
+            if getattr(err.orig, "sqlstate", None) == FOREIGN_KEY_VIOLATION:
+                raise ObjectNotFoundException from err
+            raise ObjectIsAlreadyExistsException from err
+        model = result.scalars().one_or_none()
         if model is None:
             raise ObjectNotFoundException
-
-        for key, value in new_model.model_dump().items():
-            setattr(model, key, value)
-
         return self.mapper.map_to_domain_entity_pyd(model)
 
+    async def edit(self, new_model: BaseModel, **filter_by):
+        return await self._update_returning(new_model.model_dump(), **filter_by)
+
     async def delete(self, **filter_by):
-        query = select(self.model).filter_by(**filter_by)
+        query = delete(self.model).filter_by(**filter_by).returning(self.model.id)
         result = await self.session.execute(query)
-
-        model = result.scalar_one_or_none()
-        if model is None:
+        if not result.scalars().all():
             raise ObjectNotFoundException
 
-        await self.session.delete(model)
-
     async def patch_partial(self, data: BaseModel, **filter_by):
         fields = data.model_dump(exclude_unset=True)
         if not fields:
             return await self.get_one_or_none(**filter_by)
-
-        query = select(self.model).filter_by(**filter_by)
-        result = await self.session.execute(query)
-        model = result.scalar_one_or_none()
-        if model is None:
-            raise ObjectNotFoundException
-
-        for key, value in fields.items():
-            setattr(model, key, value)
-
-        return self.mapper.map_to_domain_entity_pyd(model)
+        return await self._update_returning(fields, **filter_by)
 
     async def patch(self, column_name: str, new_value: str, **filter_by):
-        query = select(self.model).filter_by(**filter_by)
-        result = await self.session.execute(query)
-
-        model = result.scalar_one_or_none()
-        if model is None:
-            raise ObjectNotFoundException
-
-        setattr(model, column_name, new_value)
-
-        return self.mapper.map_to_domain_entity_pyd(model)
+        return await self._update_returning({column_name: new_value}, **filter_by)
 
     async def exists(self, *where_clauses, **filter_by) -> bool:
         query = select(self.model.id).limit(1)
@@ -1,4 +1,6 @@
-from sqlalchemy import select
+from datetime import date
+
+from sqlalchemy import select, tuple_
 
 from src.models.bookings import BookingOrm
 from src.repositories.base import BaseRepository
@@ -14,14 +16,30 @@ class BookingsRepository(BaseRepository):
         user_id: int,
         limit: int = 10,
         offset: int = 0,
+        after: tuple[date, int] | None = None,
     ) -> list:
-        """Возвращает брони конкретного пользователя, отсортированные по дате заезда."""
+        """Возвращает брони конкретного пользователя, отсортированные по дате заезда.
+
+        Если передан after = (date_from, id) последней брони предыдущей страницы,
+        страница выбирается поиском по ключу вместо OFFSET.
+        """
         query = (
             select(self.model)
             .filter_by(user_id=user_id)
-            .order_by(self.model.date_from.desc())
+            .order_by(self.model.date_from.desc(), self.model.id.desc())
             .limit(limit)
-            .offset(offset)
         )
+        if after is not None:
+            query = query.where(tuple_(self.model.date_from, self.model.id) < tuple_(*after))
+        else:
+            query = query.offset(offset)
         result = await self.session.execute(query)
         return [self.mapper.map_to_domain_entity_pyd(model) for model in result.scalars().all()]
+
+    async def get_active_intervals(self, since: date) -> list[tuple]:
+        """(id, room_id, date_from, date_to) броней, не закончившихся к дате since."""
+        query = select(
+            self.model.id, self.model.room_id, self.model.date_from, self.model.date_to
+        ).where(self.model.date_to > since)
+        result = await self.session.execute(query)
+        return [tuple(row) for row in result.all()]
@@ -0,0 +1,186 @@
+from collections import Counter
+from collections.abc import Iterable
+from datetime import date, timedelta
+
+from sqlalchemy import (
+    Date,
+    Integer,
+    and_,
+    cast,
+    delete,
+    func,
+    insert,
+    literal,
+    literal_column,
+    select,
+    text,
+    update,
+)
+from sqlalchemy.dialects.postgresql import ARRAY, array, insert as pg_insert
+
+from src.models.bookings import BookingOrm
+from src.models.inventory import RoomInventoryOrm
+from src.repositories.base import BaseRepository
+from src.schemas.inventory import RoomInventoryMismatchSchema
+
+# Пространство ключей advisory-локов, чтобы не пересекаться с другими локами по id
+ROOM_LOCK_NAMESPACE = 1001
+
+
+def stay_days(date_from: date, date_to: date) -> list[date]:
+    """Ночи проживания: с даты заезда включительно по дату выезда не включительно."""
+    return [date_from + timedelta(days=i) for i in range((date_to - date_from).days)]
+
+
+def array_param(values: list, item_type):
+    """Список одним параметром-массивом: число bind-параметров не растёт с его длиной."""
+    return literal(values, ARRAY(item_type))
+
+
+class RoomInventoryRepository(BaseRepository):
+    model = RoomInventoryOrm
+
+    async def lock_rooms(self, room_ids: Iterable[int], timeout_ms: int) -> None:
+        """Берёт advisory-локи номеров до конца транзакции одним запросом.
+
+        Сериализуются только брони одних и тех же номеров, остальные идут
+        параллельно. Локи берутся по возрастанию id, чтобы не ловить дедлоки.
+        """
+        await self.session.execute(text(f"SET LOCAL lock_timeout = {int(timeout_ms)}"))
+        ids = func.unnest(array(sorted(set(room_ids)))).table_valued("room_id").render_derived()
+        await self.session.execute(
+            select(func.pg_advisory_xact_lock(ROOM_LOCK_NAMESPACE, ids.c.room_id)).select_from(ids)
+        )
+
+    async def get_max_booked_units(self, room_id: int, date_from: date, date_to: date) -> int:
+        """Максимальная занятость номера по дням периода (индексный поиск по PK)."""
+        query = select(func.coalesce(func.max(self.model.booked_units), 0)).where(
+            self.model.room_id == room_id,
+            self.model.day >= date_from,
+            self.model.day < date_to,
+        )
+        result = await self.session.execute(query)
+        return result.scalar_one()
+
+    async def get_booked_units(self, bookings: Iterable) -> dict[tuple[int, date], int]:
+        """Занятость по (room_id, day) для всех ночей переданных броней одним запросом."""
+        keys = {
+            (booking.room_id, day)
+            for booking in bookings
+            for day in stay_days(booking.date_from, booking.date_to)
+        }
+        if not keys:
+            return {}
+
+        # Ключи — два массива через unnest, а не IN по парам: два параметра на весь запрос
+        room_ids, days = zip(*keys, strict=True)
+        wanted = (
+            func.unnest(array_param(list(room_ids), Integer), array_param(list(days), Date))
+            .table_valued("room_id", "day")
+            .render_derived()
+        )
+        query = select(self.model.room_id, self.model.day, self.model.booked_units).join(
+            wanted,
+            and_(self.model.room_id == wanted.c.room_id, self.model.day == wanted.c.day),
+        )
+        result = await self.session.execute(query)
+        return {(room_id, day): units for room_id, day, units in result.all()}
+
+    async def reserve(self, bookings: Iterable) -> None:
+        """Занимает по одной единице номера на каждую ночь каждой брони."""
+        units = Counter(
+            (booking.room_id, day)
+            for booking in bookings
+            for day in stay_days(booking.date_from, booking.date_to)
+        )
+        # Строки передаются тремя массивами через unnest, а не VALUES на каждую ночь:
+        # иначе длинные брони упираются в лимит asyncpg в 32767 параметров
+        rows = (
+            func.unnest(
+                array_param([room_id for room_id, _ in units], Integer),
+                array_param([day for _, day in units], Date),
+                array_param(list(units.values()), Integer),
+            )
+            .table_valued("room_id", "day", "booked_units")
+            .render_derived()
+        )
+        stmt = pg_insert(self.model).from_select(
+            ["room_id", "day", "booked_units"],
+            select(rows.c.room_id, rows.c.day, rows.c.booked_units),
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[self.model.room_id, self.model.day],
+            set_={"booked_units": self.model.booked_units + stmt.excluded.booked_units},
+        )
+        await self.session.execute(stmt)
+
+    async def release(self, room_id: int, date_from: date, date_to: date) -> None:
+        """Освобождает одну единицу номера на каждую ночь периода."""
+        stmt = (
+            update(self.model)
+            .where(
+                self.model.room_id == room_id,
+                self.model.day >= date_from,
+                self.model.day < date_to,
+            )
+            .values(booked_units=self.model.booked_units - 1)
+        )
+        await self.session.execute(stmt)
+
+    @staticmethod
+    def _expected_units_query():
+        """Занятость по дням, посчитанная заново по таблице bookings."""
+        booking_days = select(
+            BookingOrm.room_id.label("room_id"),
+            cast(
+                func.generate_series(
+                    BookingOrm.date_from,
+                    BookingOrm.date_to - 1,
+                    literal_column("interval '1 day'"),
+                ),
+                Date,
+            ).label("day"),
+        ).subquery()
+        return select(
+            booking_days.c.room_id,
+            booking_days.c.day,
+            func.count().label("booked_units"),
+        ).group_by(booking_days.c.room_id, booking_days.c.day)
+
+    async def backfill(self) -> None:
+        """Пересобирает календарь целиком по существующим броням."""
+        await self.session.execute(delete(self.model))
+        await self.session.execute(
+            insert(self.model).from_select(
+                ["room_id", "day", "booked_units"], self._expected_units_query()
+            )
+        )
+
+    async def find_mismatches(self) -> list[RoomInventoryMismatchSchema]:
+        """Сравнивает календарь с bookings и возвращает расходящиеся дни."""
+        expected = self._expected_units_query().subquery()
+        expected_units = func.coalesce(expected.c.booked_units, 0)
+        actual_units = func.coalesce(self.model.booked_units, 0)
+
+        query = (
+            select(
+                func.coalesce(expected.c.room_id, self.model.room_id).label("room_id"),
+                func.coalesce(expected.c.day, self.model.day).label("day"),
+                expected_units.label("expected_units"),
+                actual_units.label("actual_units"),
+            )
+            .select_from(
+                expected.outerjoin(
+                    self.model,
+                    and_(
+                        self.model.room_id == expected.c.room_id,
+                        self.model.day == expected.c.day,
+                    ),
+                    full=True,
+                )
+            )
+            .where(expected_units != actual_units)
+            .order_by("room_id", "day")
+        )
+        result = await self.session.execute(query)
+        return [RoomInventoryMismatchSchema.model_validate(dict(row)) for row in result.mappings()]
@@ -1,10 +1,12 @@
 from src.models.bookings import BookingOrm
 from src.models.hotels import HotelsOrm
+from src.models.pricing import RoomPriceRuleOrm
 from src.models.rooms import RoomsOrm
 from src.models.users import UsersOrm
 from src.repositories.mappers.base import DataMapper
 from src.schemas.booking import BookingReadSchema
 from src.schemas.hotels import HotelsReadSchema
+from src.schemas.pricing import PriceRuleSchema
 from src.schemas.rooms import RoomSchema
 from src.schemas.users import UserInternalSchema
 
@@ -27,3 +29,8 @@ class RoomDataMapper(DataMapper):
 class BookingDataMapper(DataMapper):
     db_model = BookingOrm
     schema = BookingReadSchema
+
+
+class PriceRuleDataMapper(DataMapper):
+    db_model = RoomPriceRuleOrm
+    schema = PriceRuleSchema
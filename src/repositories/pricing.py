@@ -0,0 +1,15 @@
+from sqlalchemy import select
+
+from src.models.pricing import RoomPriceRuleOrm
+from src.repositories.base import BaseRepository
+from src.repositories.mappers.mappers import PriceRuleDataMapper
+
+
+class RoomPriceRulesRepository(BaseRepository):
+    model = RoomPriceRuleOrm
+    mapper = PriceRuleDataMapper
+
+    async def get_for_rooms(self, room_ids: list[int]):
+        query = select(self.model).where(self.model.room_id.in_(room_ids)).order_by(self.model.id)
+        result = await self.session.execute(query)
+        return [self.mapper.map_to_domain_entity_pyd(model) for model in result.scalars().all()]
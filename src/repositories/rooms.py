@@ -1,12 +1,17 @@
+from datetime import date
+
 from pydantic import BaseModel
-from sqlalchemy import insert, select
+from sqlalchemy import delete, func, insert, select, true
 from sqlalchemy.exc import IntegrityError
 
 from src.exceptions import ObjectIsAlreadyExistsException, ObjectNotFoundException
+from src.models.facilities import RoomsFacilitiesOrm
 from src.models.hotels import HotelsOrm
+from src.models.inventory import RoomInventoryOrm
 from src.models.rooms import RoomsOrm
-from src.repositories.base import BaseRepository
+from src.repositories.base import FOREIGN_KEY_VIOLATION, BaseRepository
 from src.repositories.mappers.mappers import RoomDataMapper
+from src.schemas.rooms import RoomAvailableSchema
 
 
 class RoomsRepository(BaseRepository):
@@ -14,13 +19,70 @@ class RoomsRepository(BaseRepository):
     mapper = RoomDataMapper
 
     async def add(self, data: BaseModel):
-        hotel_query = select(HotelsOrm).filter_by(id=data.hotel_id)
-        hotel_result = await self.session.execute(hotel_query)
-        if hotel_result.scalars().one_or_none() is None:
-            raise ObjectNotFoundException
+        # Отель не ищем заранее: его отсутствие ловим по нарушению внешнего ключа
         try:
             query = insert(self.model).values(**data.model_dump()).returning(self.model)
             model = await self.session.execute(query)
             return model.scalars().one()
         except IntegrityError as err:
+            if getattr(err.orig, "sqlstate", None) == FOREIGN_KEY_VIOLATION:
+                raise ObjectNotFoundException from err
             raise ObjectIsAlreadyExistsException from err
+
+    async def delete(self, **filter_by):
+        # session.delete убирал связи с удобствами сам; массовый DELETE — нет
+        room_ids = select(self.model.id).filter_by(**filter_by).scalar_subquery()
+        await self.session.execute(
+            delete(RoomsFacilitiesOrm).where(RoomsFacilitiesOrm.room_id.in_(room_ids))
+        )
+        await super().delete(**filter_by)
+
+    async def get_available(
+        self,
+        date_from: date,
+        date_to: date,
+        hotel_id: int | None = None,
+        location: str | None = None,
+    ) -> list[RoomAvailableSchema]:
+        """Номера со свободными единицами на период одним агрегирующим запросом.
+
+        Занятость берётся из календаря room_inventory: свободно
+        quantity - максимальное число занятых единиц по ночам периода.
+        """
+        # LATERAL: календарь читается по первичному ключу (room_id, day) только
+        # для отобранных номеров, а не целиком за период по всему каталогу
+        booked = (
+            select(func.max(RoomInventoryOrm.booked_units).label("booked_units"))
+            .where(
+                RoomInventoryOrm.room_id == self.model.id,
+                RoomInventoryOrm.day >= date_from,
+                RoomInventoryOrm.day < date_to,
+            )
+            .lateral("booked")
+        )
+        free_units = self.model.quantity - func.coalesce(booked.c.booked_units, 0)
+
+        query = (
+            select(
+                self.model.id,
+                self.model.title,
+                self.model.description,
+                self.model.price,
+                self.model.quantity,
+                self.model.hotel_id,
+                free_units.label("free_units"),
+            )
+            # Агрегат без GROUP BY всегда возвращает строку, внешнее соединение не нужно
+            .join(booked, true())
+            .where(free_units > 0)
+            .order_by(self.model.id)
+        )
+        if hotel_id is not None:
+            query = query.where(self.model.hotel_id == hotel_id)
+        if location is not None:
+            query = query.join(HotelsOrm, HotelsOrm.id == self.model.hotel_id).where(
+                HotelsOrm.location.ilike(f"%{location}%")
+            )
+
+        result = await self.session.execute(query)
+        return [RoomAvailableSchema.model_validate(dict(row)) for row in result.mappings().all()]
@@ -2,6 +2,11 @@ from datetime import date
 
 from pydantic import BaseModel, Field, model_validator
 
+from src.config import settings
+from src.enums import BookingConflictReason
+
+BOOKING_BATCH_MAX_SIZE = 50
+
 
 class BookingReadSchema(BaseModel):
     id: int
@@ -21,4 +26,16 @@ class BookingCreateSchema(BaseModel):
     def check_dates(self) -> "BookingCreateSchema":
         if self.date_from >= self.date_to:
             raise ValueError("date_from должен быть раньше date_to")
+        if (self.date_to - self.date_from).days > settings.BOOKING_MAX_NIGHTS:
+            raise ValueError(f"Бронь не может быть длиннее {settings.BOOKING_MAX_NIGHTS} ночей")
         return self
+
+
+class BookingBatchCreateSchema(BaseModel):
+    bookings: list[BookingCreateSchema] = Field(min_length=1, max_length=BOOKING_BATCH_MAX_SIZE)
+
+
+class BookingConflictSchema(BaseModel):
+    index: int
+    room_id: int
+    reason: BookingConflictReason
@@ -0,0 +1,10 @@
+from datetime import date
+
+from pydantic import BaseModel
+
+
+class RoomInventoryMismatchSchema(BaseModel):
+    room_id: int
+    day: date
+    expected_units: int
+    actual_units: int
@@ -0,0 +1,60 @@
+from datetime import date, timedelta
+
+from pydantic import BaseModel, ConfigDict, Field, model_validator
+
+from src.config import settings
+from src.enums import PriceRuleKind
+
+
+def check_quote_dates(date_from: date, date_to: date) -> None:
+    """Проверяет период расчёта цены; ValueError с текстом для клиента.
+
+    Заезд не раньше сегодняшнего дня, выезд не дальше горизонта цен
+    PRICING_HORIZON_DAYS, длина не больше BOOKING_MAX_NIGHTS ночей.
+    """
+    if date_from >= date_to:
+        raise ValueError("date_from должен быть раньше date_to")
+    today = date.today()
+    if date_from < today:
+        raise ValueError("date_from не может быть в прошлом")
+    if date_to > today + timedelta(days=settings.PRICING_HORIZON_DAYS):
+        raise ValueError(
+            f"Цены рассчитываются не дальше чем на {settings.PRICING_HORIZON_DAYS} дней вперёд"
+        )
+    if (date_to - date_from).days > settings.BOOKING_MAX_NIGHTS:
+        raise ValueError(f"Бронь не может быть длиннее {settings.BOOKING_MAX_NIGHTS} ночей")
+
+
+class PriceRuleAddSchema(BaseModel):
+    kind: PriceRuleKind
+    multiplier: float = Field(gt=0, description="Множитель к базовой цене номера")
+
+    date_from: date | None = Field(default=None, description="Начало сезона")
+    date_to: date | None = Field(default=None, description="Конец сезона, не включительно")
+    weekday: int | None = Field(default=None, ge=0, le=6, description="0 — понедельник")
+    min_nights: int | None = Field(default=None, ge=1, description="Минимум ночей для скидки")
+
+    @model_validator(mode="after")
+    def check_kind_fields(self) -> "PriceRuleAddSchema":
+        if self.kind == PriceRuleKind.season and (
+            self.date_from is None or self.date_to is None or self.date_from >= self.date_to
+        ):
+            raise ValueError("Для сезона нужны date_from < date_to")
+        if self.kind == PriceRuleKind.weekday and self.weekday is None:
+            raise ValueError("Для дня недели нужен weekday")
+        if self.kind == PriceRuleKind.length_of_stay and self.min_nights is None:
+            raise ValueError("Для длительности проживания нужен min_nights")
+        return self
+
+
+class PriceRuleSchema(PriceRuleAddSchema):
+    id: int
+    room_id: int
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class RoomQuoteSchema(BaseModel):
+    room_id: int
+    nights: int
+    price: float
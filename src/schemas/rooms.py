@@ -23,3 +23,7 @@ class AddRoomSchema(BaseModel):
 
 class ChangeRoomSchema(AddRoomSchema):
     pass
+
+
+class RoomAvailableSchema(RoomSchema):
+    free_units: int
@@ -1,22 +1,21 @@
-from pwdlib import PasswordHash
-
 from src.config import security
 from src.exceptions import ObjectNotValidException
+from src.utils.password_hasher import PasswordHasher, password_hasher
 
 
 class AuthService:
-    def __init__(self, password_hash: PasswordHash = PasswordHash.recommended()) -> None:
-        self.password_hash = password_hash
+    def __init__(self, hasher: PasswordHasher = password_hasher) -> None:
+        self.hasher = hasher
 
-    def verify_password(self, plain_password, hashed_password) -> bool:
-        return self.password_hash.verify(plain_password, hashed_password)
+    async def verify_password(self, plain_password, hashed_password) -> bool:
+        return await self.hasher.verify(plain_password, hashed_password)
 
-    def get_password_hash(self, password) -> str:
-        return self.password_hash.hash(password)
+    async def get_password_hash(self, password) -> str:
+        return await self.hasher.hash(password)
 
     async def login(self, db, email: str, password: str):
         db_user = await db.users.get_one_or_none(email=email)
-        if db_user is None or not self.verify_password(password, db_user.hashed_password):
+        if db_user is None or not await self.verify_password(password, db_user.hashed_password):
             raise ObjectNotValidException
         return db_user
 
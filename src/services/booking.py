@@ -1,21 +1,47 @@
+import asyncio
+import time
+
+from sqlalchemy.exc import DBAPIError
+
+from src.config import settings
+from src.enums import BookingConflictReason
 from src.exceptions import (
+    BookingConflictsException,
     ObjectIsAlreadyExistsException,
     ObjectNotAllowedException,
     ObjectNotFoundException,
 )
-from src.kafka.producer import booking_created_publisher, booking_delete_publisher
+from src.kafka.producer import (
+    booking_batch_created_publisher,
+    booking_created_publisher,
+    booking_delete_publisher,
+)
+from src.repositories.inventory import stay_days
+from src.schemas.booking import BookingConflictSchema
+from src.utils.availability_index import availability_index
+from src.utils.pricing import pricing_engine
 from src.validators.booking import BookingValidator
 
+# lock_not_available, deadlock_detected, serialization_failure
+RETRYABLE_SQLSTATES = {"55P03", "40P01", "40001"}
+
+
+def is_retryable_conflict(err: DBAPIError) -> bool:
+    return getattr(err.orig, "sqlstate", None) in RETRYABLE_SQLSTATES
+
 
 class BookingService:
     def __init__(self, session):
         self.session = session
 
-    async def get_user_bookings(self, user_id: int, limit: int, offset: int):
+    async def get_user_bookings(self, user_id: int, limit: int, offset: int, after=None):
         return await self.session.booking.get_user_bookings(
-            user_id=user_id, limit=limit, offset=offset
+            user_id=user_id, limit=limit, offset=offset, after=after
         )
 
+    async def count_user_bookings(self, user_id: int) -> int:
+        return await self.session.booking.count(user_id=user_id)
+
     async def delete_booking(self, booking_id: int, user_id: int):
         booking = await self.session.booking.get_one_or_none(id=booking_id)
         if booking is None:
@@ -24,39 +50,169 @@ class BookingService:
             raise ObjectNotAllowedException
 
         await self.session.booking.delete(id=booking_id)
+        await self.session.inventory.release(booking.room_id, booking.date_from, booking.date_to)
         await self.session.commit()
+        availability_index.remove(booking_id)
 
         await booking_delete_publisher.publish(
             {
                 "booking_id": booking_id,
+                "room_id": booking.room_id,
                 "message": "Бронь успешно отменена",
+                "emitted_at": time.time(),
             },
         )
 
     async def add_booking(self, booking, current_user):
-        if await BookingValidator.has_overlapping_booking(booking, self.session):
-            raise ObjectIsAlreadyExistsException
-
         room_data = await self.session.rooms.get_one_or_none(id=booking.room_id)
         if room_data is None:
             raise ObjectNotFoundException
 
-        new_booking = {
-            "user_id": current_user.id,
-            **booking.model_dump(),
-            "price": room_data.price,
-        }
+        # Быстрый отказ по индексу в памяти, без локов; окончательная проверка — под локом
+        if await BookingValidator.get_max_booked_units(booking, self.session) >= room_data.quantity:
+            raise ObjectIsAlreadyExistsException
 
-        created_booking = await self.session.booking.add(new_booking)
-        await self.session.commit()
+        [price] = await pricing_engine.price_stays(
+            self.session, [(room_data, booking.date_from, booking.date_to)]
+        )
+        created_booking = await self._run_admission(
+            self._admit_booking, booking, room_data, price, current_user
+        )
+        if availability_index.loaded:
+            availability_index.add(
+                created_booking.id, booking.room_id, booking.date_from, booking.date_to
+            )
 
         await booking_created_publisher.publish(
             {
                 "booking_id": created_booking.id,
                 "user_id": current_user.id,
                 "room_id": booking.room_id,
+                "date_from": booking.date_from.isoformat(),
+                "date_to": booking.date_to.isoformat(),
                 "message": "Номер успешно забронирован",
+                "emitted_at": time.time(),
             },
         )
 
         return created_booking
+
+    async def add_bookings(self, bookings: list, current_user):
+        """Групповое бронирование: либо создаются все брони, либо ни одной."""
+        room_ids = sorted({booking.room_id for booking in bookings})
+        rooms = {room.id: room for room in await self.session.rooms.get_by_ids(room_ids)}
+
+        missing = [
+            BookingConflictSchema(
+                index=index, room_id=booking.room_id, reason=BookingConflictReason.room_not_found
+            )
+            for index, booking in enumerate(bookings)
+            if booking.room_id not in rooms
+        ]
+        if missing:
+            raise BookingConflictsException(missing)
+
+        prices = await pricing_engine.price_stays(
+            self.session,
+            [(rooms[booking.room_id], booking.date_from, booking.date_to) for booking in bookings],
+        )
+        created_bookings = await self._run_admission(
+            self._admit_bookings, bookings, rooms, prices, current_user
+        )
+        if availability_index.loaded:
+            for created in created_bookings:
+                availability_index.add(
+                    created.id, created.room_id, created.date_from, created.date_to
+                )
+
+        await booking_batch_created_publisher.publish(
+            {
+                "booking_ids": [created.id for created in created_bookings],
+                "user_id": current_user.id,
+                "room_ids": room_ids,
+                "bookings": [
+                    {
+                        "booking_id": created.id,
+                        "room_id": created.room_id,
+                        "date_from": created.date_from.isoformat(),
+                        "date_to": created.date_to.isoformat(),
+                    }
+                    for created in created_bookings
+                ],
+                "message": "Номера успешно забронированы",
+                "emitted_at": time.time(),
+            },
+        )
+
+        return created_bookings
+
+    async def _run_admission(self, admit, *args):
+        """Повторяет admit при конфликте локов, после исчерпания попыток — 409."""
+        for attempt in range(settings.BOOKING_ADMISSION_RETRIES):
+            try:
+                return await admit(*args)
+            except DBAPIError as err:
+                await self.session.rollback()
+                if not is_retryable_conflict(err):
+                    raise
+                await asyncio.sleep(0.05 * (attempt + 1))
+        # Номер так и не удалось заблокировать — отвечаем как на занятый
+        raise ObjectIsAlreadyExistsException
+
+    async def _admit_bookings(self, bookings: list, rooms: dict, prices: list, current_user):
+        """Проверка занятости всех номеров одним запросом и вставка одним INSERT."""
+        await self.session.inventory.lock_rooms(rooms.keys(), settings.BOOKING_LOCK_TIMEOUT_MS)
+
+        booked_units = await self.session.inventory.get_booked_units(bookings)
+        conflicts = []
+        for index, booking in enumerate(bookings):
+            keys = [(booking.room_id, day) for day in stay_days(booking.date_from, booking.date_to)]
+            if any(booked_units.get(key, 0) >= rooms[booking.room_id].quantity for key in keys):
+                conflicts.append(
+                    BookingConflictSchema(
+                        index=index,
+                        room_id=booking.room_id,
+                        reason=BookingConflictReason.no_free_units,
+                    )
+                )
+                continue
+            # Учитываем брони из этого же запроса на тот же номер
+            for key in keys:
+                booked_units[key] = booked_units.get(key, 0) + 1
+        if conflicts:
+            raise BookingConflictsException(conflicts)
+
+        created_bookings = await self.session.booking.add_bulk(
+            [
+                {
+                    "user_id": current_user.id,
+                    **booking.model_dump(),
+                    "price": price,
+                }
+                for booking, price in zip(bookings, prices, strict=True)
+            ]
+        )
+        await self.session.inventory.reserve(bookings)
+        await self.session.commit()
+        return created_bookings
+
+    async def _admit_booking(self, booking, room_data, price: float, current_user):
+        """Проверка занятости и вставка брони под advisory-локом номера."""
+        await self.session.inventory.lock_rooms([booking.room_id], settings.BOOKING_LOCK_TIMEOUT_MS)
+
+        booked_units = await self.session.inventory.get_max_booked_units(
+            booking.room_id, booking.date_from, booking.date_to
+        )
+        if booked_units >= room_data.quantity:
+            raise ObjectIsAlreadyExistsException
+
+        new_booking = {
+            "user_id": current_user.id,
+            **booking.model_dump(),
+            "price": price,
+        }
+
+        created_booking = await self.session.booking.add(new_booking)
+        await self.session.inventory.reserve([booking])
+        await self.session.commit()
+        return created_booking
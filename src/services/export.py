@@ -0,0 +1,70 @@
+from datetime import date
+
+from src.enums import ExportFormat
+from src.models.bookings import BookingOrm
+from src.models.users import UsersOrm
+from src.utils.db_manager import DbManager
+from src.utils.export import encode_rows
+from src.utils.replicas import replica_set
+
+BOOKING_EXPORT_COLUMNS = (
+    BookingOrm.id,
+    BookingOrm.user_id,
+    BookingOrm.room_id,
+    BookingOrm.date_from,
+    BookingOrm.date_to,
+    BookingOrm.price,
+)
+USER_EXPORT_COLUMNS = (
+    UsersOrm.id,
+    UsersOrm.email,
+    UsersOrm.role,
+    UsersOrm.is_active,
+    UsersOrm.created_at,
+)
+
+
+class ExportService:
+    """Выгрузки для админов.
+
+    Сессия открывается внутри генератора: ответ стримится уже после выхода
+    из зависимостей запроса, поэтому общий DbManager тут не подходит.
+    """
+
+    def __init__(self, session_factory):
+        self.session_factory = session_factory
+
+    def _db(self) -> DbManager:
+        # Выгрузки — длинные чтения, им место на реплике
+        return DbManager(session_factory=self.session_factory, read_only=True, replicas=replica_set)
+
+    async def stream_bookings(
+        self,
+        fmt: ExportFormat,
+        user_id: int | None = None,
+        room_id: int | None = None,
+        date_from: date | None = None,
+        date_to: date | None = None,
+    ):
+        where_clauses = []
+        if user_id is not None:
+            where_clauses.append(BookingOrm.user_id == user_id)
+        if room_id is not None:
+            where_clauses.append(BookingOrm.room_id == room_id)
+        if date_from is not None:
+            where_clauses.append(BookingOrm.date_from >= date_from)
+        if date_to is not None:
+            where_clauses.append(BookingOrm.date_to <= date_to)
+
+        async with self._db() as db:
+            partitions = db.booking.stream(BOOKING_EXPORT_COLUMNS, *where_clauses)
+            fieldnames = [column.key for column in BOOKING_EXPORT_COLUMNS]
+            async for chunk in encode_rows(partitions, fieldnames, fmt):
+                yield chunk
+
+    async def stream_users(self, fmt: ExportFormat):
+        async with self._db() as db:
+            partitions = db.users.stream(USER_EXPORT_COLUMNS)
+            fieldnames = [column.key for column in USER_EXPORT_COLUMNS]
+            async for chunk in encode_rows(partitions, fieldnames, fmt):
+                yield chunk
@@ -1,14 +1,18 @@
+from src.cache import cached, invalidate_tags
 from src.exceptions import ObjectNotFoundException
-from src.schemas.facilities import FatilitiesAddSchema
+from src.schemas.facilities import FacilitiesReadSchema, FatilitiesAddSchema
 
 
 class FacilitiesService:
     def __init__(self, db):
         self.db = db
 
+    # В предметах лежат списки номеров, поэтому они зависят и от тега rooms
+    @cached(list[FacilitiesReadSchema], tags=("facilities", "rooms"))
     async def get_all(self):
         return await self.db.facilities.get_all()
 
+    @cached(FacilitiesReadSchema, tags=("facility:{facility_id}", "rooms"))
     async def get_by_id(self, facility_id: int):
         facility = await self.db.facilities.get_one_or_none(id=facility_id)
         if facility is None:
@@ -18,4 +22,9 @@ class FacilitiesService:
     async def add(self, facility: FatilitiesAddSchema):
         result = await self.db.facilities.add(facility)
         await self.db.commit()
+        await invalidate_tags("facilities")
         return result
+
+    @staticmethod
+    async def invalidate_cache(facility_id: int):
+        await invalidate_tags("facilities", f"facility:{facility_id}")
@@ -1,26 +1,54 @@
-import json
+from pydantic import TypeAdapter
 
+from src import cache
+from src.cache import (
+    BinaryTwoTierCache,
+    CachedResponse,
+    CacheNamespace,
+    EntityCache,
+    invalidate_tags,
+)
 from src.exceptions import ObjectNotFoundException
+from src.schemas.hotels import HotelsReadSchema
+from src.utils.pagination import pagination_headers
+
+hotel_entities = EntityCache("hotels", HotelsReadSchema)
+hotels_list_adapter = TypeAdapter(list[HotelsReadSchema])
+# Не hotels:list: под теми ключами ещё лежат JSON-конверты прежнего формата
+HOTEL_PAGES = "hotels:pages"
 
 
 class HotelsService:
-    def __init__(self, db, redis):
+    def __init__(self, db, redis, redis_binary):
         self.db = db
         self.redis = redis
+        self.cache = BinaryTwoTierCache(redis_binary)
+        self.list_cache = CacheNamespace(redis, HOTEL_PAGES)
+
+    async def get_all(self, pagination, after_id: int | None = None) -> CachedResponse:
+        """Страница отелей в виде готового JSON-тела и заголовков пагинации."""
+        if after_id is not None:
+            suffix = f"after={after_id}:per_page={pagination.per_page}"
+        else:
+            suffix = f"page={pagination.page}:per_page={pagination.per_page}"
+        cache_key = await self.list_cache.key(suffix)
 
-    async def get_all(self, pagination):
-        cache_key = f"hotels:list:page={pagination.page}:per_page={pagination.per_page}"
+        async def load_page():
+            hotels = await self.db.hotels.get_all(
+                limit=pagination.per_page, offset=pagination.offset, after_id=after_id
+            )
+            return CachedResponse(
+                hotels_list_adapter.dump_json(hotels),
+                pagination_headers(hotels, pagination.per_page),
+            )
 
-        cached = await self.redis.get(cache_key)
-        if cached:
-            return json.loads(cached)
+        return await self.cache.get_or_compute(cache_key, load_page, ex=300)
 
-        hotels = await self.db.hotels.get_all(limit=pagination.per_page, offset=pagination.offset)
-        await self.redis.set(cache_key, json.dumps([h.model_dump() for h in hotels]), ex=300)
-        return hotels
+    async def estimate_count(self) -> int:
+        return await self.db.hotels.estimate_count()
 
     async def get_by_id(self, hotel_id: int):
-        hotel = await self.db.hotels.get_one_or_none(id=hotel_id)
+        hotel = await hotel_entities.get(hotel_id, lambda ids: self.db.hotels.get_by_ids(ids))
         if hotel is None:
             raise ObjectNotFoundException
         return hotel
@@ -29,21 +57,25 @@ class HotelsService:
         result = await self.db.hotels.add(hotel)
         await self.db.commit()
 
-        await self._invalidate_cache()
+        # Сбрасываем и возможный негативный кэш для нового id
+        await self.invalidate_cache(result.id)
         return result
 
     async def update(self, hotel_id: int, new_hotel):
         updated = await self.db.hotels.edit(new_hotel, id=hotel_id)
         await self.db.commit()
-        await self._invalidate_cache()
+        await self.invalidate_cache(hotel_id)
         return updated
 
     async def delete(self, hotel_id: int):
         await self.db.hotels.delete(id=hotel_id)
         await self.db.commit()
-        await self._invalidate_cache()
+        await self.invalidate_cache(hotel_id)
 
-    async def _invalidate_cache(self):
-        keys = await self.redis.keys("hotels:list:*")
-        if keys:
-            await self.redis.delete(*keys)
+    @staticmethod
+    async def invalidate_cache(hotel_id: int):
+        """Сбрасывает кэши отеля и поднимает версии, из которых строятся ETag."""
+        if cache.redis_client is not None:
+            await CacheNamespace(cache.redis_client, HOTEL_PAGES).invalidate()
+        await hotel_entities.invalidate(hotel_id)
+        await invalidate_tags("hotels", f"hotel:{hotel_id}")
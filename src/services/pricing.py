@@ -0,0 +1,41 @@
+from datetime import date
+
+from src.exceptions import ObjectNotFoundException
+from src.schemas.pricing import PriceRuleAddSchema, RoomQuoteSchema
+from src.utils.pricing import pricing_engine
+
+
+class PricingService:
+    def __init__(self, db):
+        self.db = db
+
+    async def get_rules(self, room_id: int):
+        return await self.db.price_rules.get_for_rooms([room_id])
+
+    async def add_rule(self, room_id: int, rule: PriceRuleAddSchema):
+        if await self.db.rooms.get_one_or_none(id=room_id) is None:
+            raise ObjectNotFoundException
+        created = await self.db.price_rules.add({"room_id": room_id, **rule.model_dump()})
+        await self.db.commit()
+        await pricing_engine.invalidate(room_id)
+        return created
+
+    async def delete_rule(self, rule_id: int):
+        rule = await self.db.price_rules.get_one_or_none(id=rule_id)
+        if rule is None:
+            raise ObjectNotFoundException
+        await self.db.price_rules.delete(id=rule_id)
+        await self.db.commit()
+        await pricing_engine.invalidate(rule.room_id)
+
+    async def quote(self, room_ids: list[int], date_from: date, date_to: date):
+        """Цены проживания сразу для нескольких номеров."""
+        rooms = await self.db.rooms.get_by_ids(room_ids)
+        prices = await pricing_engine.price_stays(
+            self.db, [(room, date_from, date_to) for room in rooms]
+        )
+        nights = (date_to - date_from).days
+        return [
+            RoomQuoteSchema(room_id=room.id, nights=nights, price=price)
+            for room, price in zip(rooms, prices, strict=True)
+        ]
@@ -1,16 +1,34 @@
+from datetime import date
+
+from src.cache import EntityCache, cached, invalidate_tags
 from src.exceptions import ObjectNotFoundException
-from src.schemas.rooms import AddRoomSchema, ChangeRoomSchema
+from src.schemas.rooms import AddRoomSchema, ChangeRoomSchema, RoomSchema
+from src.utils.pricing import pricing_engine
+
+room_entities = EntityCache("rooms", RoomSchema)
 
 
 class RoomsService:
     def __init__(self, db):
         self.db = db
 
+    @cached(list[RoomSchema], tags=("rooms",))
     async def get_all(self):
         return await self.db.rooms.get_all()
 
+    async def get_available(
+        self,
+        date_from: date,
+        date_to: date,
+        hotel_id: int | None = None,
+        location: str | None = None,
+    ):
+        return await self.db.rooms.get_available(
+            date_from=date_from, date_to=date_to, hotel_id=hotel_id, location=location
+        )
+
     async def get_by_id(self, room_id: int):
-        room = await self.db.rooms.get_one_or_none(id=room_id)
+        room = await room_entities.get(room_id, lambda ids: self.db.rooms.get_by_ids(ids))
         if room is None:
             raise ObjectNotFoundException
         return room
@@ -18,13 +36,24 @@ class RoomsService:
     async def add(self, new_room: AddRoomSchema):
         room = await self.db.rooms.add(new_room)
         await self.db.commit()
+        await invalidate_tags("rooms")
+        # Сбрасываем возможный негативный кэш для нового id
+        await room_entities.invalidate(room.id)
         return room
 
     async def update(self, room_id: int, new_room: ChangeRoomSchema):
         updated = await self.db.rooms.edit(new_room, id=room_id)
         await self.db.commit()
+        await self.invalidate_cache(room_id)
         return updated
 
     async def delete(self, room_id: int):
         await self.db.rooms.delete(id=room_id)
         await self.db.commit()
+        await self.invalidate_cache(room_id)
+
+    @staticmethod
+    async def invalidate_cache(room_id: int):
+        await pricing_engine.invalidate(room_id)
+        await invalidate_tags("rooms")
+        await room_entities.invalidate(room_id)
@@ -1,20 +1,41 @@
+from src.cache import EntityCache, cached, invalidate_tags
+from src.config import settings
 from src.exceptions import ObjectIsAlreadyExistsException, ObjectNotFoundException
-from src.schemas.users import UserAddSchema, UserCreateSchema, UserPatchProfileSchema
+from src.schemas.users import (
+    UserAddSchema,
+    UserCreateSchema,
+    UserPatchProfileSchema,
+    UserReadSchema,
+)
 from src.services.auth import AuthService
+from src.utils.token_revocation import token_revocation
+
+# Пользователь, под которым выполняется запрос, без хеша пароля
+user_principals = EntityCache("users", UserReadSchema, ttl=settings.PRINCIPAL_CACHE_TTL_SECONDS)
 
 
 class UserService:
     @staticmethod
-    async def get_all(db, limit: int, offset: int):
-        return await db.users.get_all(limit=limit, offset=offset)
+    async def get_all(db, limit: int, offset: int, after_id: int | None = None):
+        return await db.users.get_all(limit=limit, offset=offset, after_id=after_id)
+
+    @staticmethod
+    async def estimate_count(db) -> int:
+        return await db.users.estimate_count()
 
     @staticmethod
+    @cached(UserReadSchema, tags=("user:{user_id}",))
     async def get_by_id(db, user_id: int):
         user = await db.users.get_one_or_none(id=user_id)
         if user is None:
             raise ObjectNotFoundException
         return user
 
+    @staticmethod
+    async def get_principal(db, user_id: int) -> UserReadSchema | None:
+        """Пользователь для проверки доступа: обычно без запроса к Postgres."""
+        return await user_principals.get(user_id, lambda ids: db.users.get_by_ids(ids))
+
     @staticmethod
     async def get_me(db, user_id: int):
         return await db.users.get_one_or_none(id=user_id)
@@ -23,12 +44,15 @@ class UserService:
     async def patch_profile(db, user_id: int, credentials: UserPatchProfileSchema):
         result = await db.users.patch_partial(credentials, id=user_id)
         await db.commit()
+        await UserService.invalidate_cache(user_id)
         return result
 
     @staticmethod
     async def delete(db, user_id: int):
         await db.users.delete(id=user_id)
         await db.commit()
+        await UserService.invalidate_cache(user_id)
+        await token_revocation.revoke_user(user_id)
 
     @staticmethod
     async def create(db, user_in: UserCreateSchema):
@@ -36,7 +60,7 @@ class UserService:
         if existing:
             raise ObjectIsAlreadyExistsException
 
-        hashed_password = AuthService().get_password_hash(user_in.password)
+        hashed_password = await AuthService().get_password_hash(user_in.password)
         user_model_data = UserAddSchema(email=user_in.email, hashed_password=hashed_password)
         new_user = await db.users.add(user_model_data)
         await db.commit()
@@ -44,6 +68,14 @@ class UserService:
 
     @staticmethod
     async def change_password(db, user_id, new_password):
-        new_hashed_password = AuthService().get_password_hash(new_password)
+        new_hashed_password = await AuthService().get_password_hash(new_password)
         await db.users.patch("hashed_password", new_hashed_password, id=user_id)
         await db.commit()
+        await UserService.invalidate_cache(user_id)
+        # Старый пароль мог утечь вместе с токенами — отзываем все сессии
+        await token_revocation.revoke_user(user_id)
+
+    @staticmethod
+    async def invalidate_cache(user_id: int):
+        await invalidate_tags(f"user:{user_id}")
+        await user_principals.invalidate(user_id)
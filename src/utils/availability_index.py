@@ -0,0 +1,189 @@
+import sys
+import time
+from bisect import bisect_left
+from datetime import date, timedelta
+
+from src.config import settings
+
+
+class AvailabilityIndex:
+    """Индекс забронированных интервалов по номерам в памяти процесса.
+
+    Для каждого номера хранится отсортированный по дате заезда массив интервалов.
+    Поиск пересечений — два bisect и просмотр узкого окна, без похода в Postgres.
+    Индекс наполняется из bookings при старте и обновляется событиями Kafka.
+    Закончившиеся брони раз в сутки выбрасываются.
+    """
+
+    def __init__(self, max_lag_seconds: float = 5.0, max_idle_seconds: float = 300.0) -> None:
+        self.max_lag_seconds = max_lag_seconds
+        self.max_idle_seconds = max_idle_seconds
+        self.loaded = False
+        self.loaded_at: float | None = None
+        self.last_event_at: float | None = None
+        self.last_lag_seconds = 0.0
+        self.pruned_on: date | None = None
+        # События, пришедшие между begin_load() и load(); None — загрузка не идёт
+        self._pending: list[tuple] | None = None
+        self._starts: dict[int, list[date]] = {}
+        self._intervals: dict[int, list[tuple[date, date, int]]] = {}
+        self._max_nights: dict[int, int] = {}
+        self._bookings: dict[int, tuple[int, date, date]] = {}
+
+    def begin_load(self) -> None:
+        """Вызывается до подписки на события: они копятся до конца load()."""
+        self._pending = []
+
+    def load(self, bookings) -> None:
+        """Полностью пересобирает индекс по списку (id, room_id, date_from, date_to).
+
+        Накопленные после begin_load() события применяются поверх снимка:
+        add и remove идемпотентны, поэтому события, уже попавшие в снимок, безвредны.
+        """
+        self._starts.clear()
+        self._intervals.clear()
+        self._max_nights.clear()
+        self._bookings.clear()
+        for booking_id, room_id, date_from, date_to in bookings:
+            self.add(booking_id, room_id, date_from, date_to)
+        self.loaded = True
+        self.loaded_at = time.time()
+        self.pruned_on = date.today()
+        pending, self._pending = self._pending or [], None
+        for handler, data in pending:
+            handler(data)
+
+    def add(self, booking_id: int, room_id: int, date_from: date, date_to: date) -> None:
+        if booking_id in self._bookings:
+            return
+        self._bookings[booking_id] = (room_id, date_from, date_to)
+        interval = (date_from, date_to, booking_id)
+        intervals = self._intervals.setdefault(room_id, [])
+        index = bisect_left(intervals, interval)
+        intervals.insert(index, interval)
+        self._starts.setdefault(room_id, []).insert(index, date_from)
+        nights = (date_to - date_from).days
+        if nights > self._max_nights.get(room_id, 0):
+            self._max_nights[room_id] = nights
+
+    def remove(self, booking_id: int) -> None:
+        booking = self._bookings.pop(booking_id, None)
+        if booking is None:
+            return
+        room_id, date_from, date_to = booking
+        intervals = self._intervals[room_id]
+        index = bisect_left(intervals, (date_from, date_to, booking_id))
+        del intervals[index]
+        del self._starts[room_id][index]
+
+    def _defer(self, handler, data: dict) -> bool:
+        """True, если событие сейчас не применяется: идёт загрузка (оно отложено)
+        или индекс не загружен вовсе (оно не нужно)."""
+        if self._pending is not None:
+            self._pending.append((handler, data))
+            return True
+        return not self.loaded
+
+    def on_created(self, data: dict) -> None:
+        """Событие booking.created или booking.batch_created."""
+        if self._defer(self.on_created, data):
+            return
+        for booking in data.get("bookings") or [data]:
+            self.add(
+                booking["booking_id"],
+                booking["room_id"],
+                date.fromisoformat(booking["date_from"]),
+                date.fromisoformat(booking["date_to"]),
+            )
+        self._mark_event(data.get("emitted_at"))
+
+    def on_deleted(self, data: dict) -> None:
+        """Событие booking.delete."""
+        if self._defer(self.on_deleted, data):
+            return
+        self.remove(data["booking_id"])
+        self._mark_event(data.get("emitted_at"))
+
+    def _mark_event(self, emitted_at: float | None) -> None:
+        self.last_event_at = time.time()
+        if emitted_at is not None:
+            self.last_lag_seconds = max(self.last_event_at - emitted_at, 0.0)
+        if self.pruned_on != date.today():
+            self.prune(date.today())
+
+    def prune(self, before: date) -> None:
+        """Выбрасывает брони, закончившиеся не позже before: с ними уже ничего не пересечётся."""
+        for booking_id, (_, _, date_to) in list(self._bookings.items()):
+            if date_to <= before:
+                del self._bookings[booking_id]
+        for room_id, intervals in list(self._intervals.items()):
+            kept = [interval for interval in intervals if interval[1] > before]
+            if kept:
+                self._intervals[room_id] = kept
+                self._starts[room_id] = [start for start, _, _ in kept]
+                self._max_nights[room_id] = max((end - start).days for start, end, _ in kept)
+            else:
+                del self._intervals[room_id], self._starts[room_id], self._max_nights[room_id]
+        self.pruned_on = before
+
+    @property
+    def is_fresh(self) -> bool:
+        if not self.loaded or self.last_lag_seconds > self.max_lag_seconds:
+            return False
+        # Отставание последнего события ничего не говорит, если события перестали приходить
+        last_seen = max(self.last_event_at or 0.0, self.loaded_at or 0.0)
+        return time.time() - last_seen <= self.max_idle_seconds
+
+    def _overlapping(self, room_id: int, date_from: date, date_to: date):
+        starts = self._starts.get(room_id)
+        if not starts:
+            return []
+        # Пересекаются только интервалы, начавшиеся не раньше чем за max_nights до date_from
+        window_start = date_from - timedelta(days=self._max_nights[room_id])
+        lo = bisect_left(starts, window_start)
+        hi = bisect_left(starts, date_to)
+        return [
+            (start, end) for start, end, _ in self._intervals[room_id][lo:hi] if end > date_from
+        ]
+
+    def max_booked_units(self, room_id: int, date_from: date, date_to: date) -> int | None:
+        """Максимум одновременно занятых единиц номера за период; None, если индекс устарел."""
+        if not self.is_fresh:
+            return None
+        events = []
+        for start, end in self._overlapping(room_id, date_from, date_to):
+            events.append((max(start, date_from), 1))
+            events.append((min(end, date_to), -1))
+        # Выезд раньше заезда в тот же день: -1 сортируется перед +1
+        events.sort()
+        current = peak = 0
+        for _, delta in events:
+            current += delta
+            peak = max(peak, current)
+        return peak
+
+    def stats(self) -> dict:
+        footprint = sys.getsizeof(self._bookings) + sum(
+            sys.getsizeof(self._starts[room_id]) + sys.getsizeof(self._intervals[room_id])
+            for room_id in self._intervals
+        )
+        footprint += len(self._bookings) * (
+            sys.getsizeof((0, date.min, date.max)) + 2 * sys.getsizeof(date.min)
+        )
+        return {
+            "loaded": self.loaded,
+            "fresh": self.is_fresh,
+            "rooms": len(self._intervals),
+            "bookings": len(self._bookings),
+            "memory_bytes": footprint,
+            "lag_seconds": self.last_lag_seconds,
+            "last_event_at": self.last_event_at,
+            "loaded_at": self.loaded_at,
+            "pruned_on": self.pruned_on,
+        }
+
+
+availability_index = AvailabilityIndex(
+    max_lag_seconds=settings.AVAILABILITY_INDEX_MAX_LAG_SECONDS,
+    max_idle_seconds=settings.AVAILABILITY_INDEX_MAX_IDLE_SECONDS,
+)
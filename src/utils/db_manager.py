@@ -1,28 +1,104 @@
+from src.cache import filling_cache
 from src.repositories.bookings import BookingsRepository
 from src.repositories.facilities import FacilitiesRepository
 from src.repositories.hotels import HotelsRepository
+from src.repositories.inventory import RoomInventoryRepository
+from src.repositories.pricing import RoomPriceRulesRepository
 from src.repositories.rooms import RoomsRepository
 from src.repositories.users import UsersRepository
 
 
+class _LazyRepository:
+    """Репозиторий создаётся при первом обращении, по одному на каждую сессию менеджера."""
+
+    def __init__(self, repository_cls) -> None:
+        self.repository_cls = repository_cls
+
+    def __set_name__(self, owner, name: str) -> None:
+        self.name = name
+
+    def __get__(self, db, owner=None):
+        if db is None:
+            return self
+        session = db.session
+        repository = db._repositories.get((self.name, session))
+        if repository is None:
+            repository = self.repository_cls(session)
+            db._repositories[self.name, session] = repository
+        return repository
+
+
 class DbManager:
-    def __init__(self, session_factory):
+    """Unit of work над одной сессией.
+
+    Сессия и репозитории создаются при первом обращении, а соединение из пула
+    сессия берёт только на первом запросе. Если до базы дело не дошло (ответ из
+    кэша), выход из контекста ничего не стоит.
+
+    read_only=True — для запросов без записи: session_factory должна быть
+    привязана к движку с postgresql_readonly (транзакция BEGIN READ ONLY),
+    а на выходе сессия просто закрывается без отдельного rollback.
+    С replicas сессия read-only менеджера открывается на здоровой реплике,
+    а если таких нет — через session_factory на primary. Чтения для общего
+    кэша (filling_cache) идут в отдельной сессии session_factory на primary:
+    закэшированное с отстающей реплики осталось бы в кэше и после её догона.
+
+    on_commit вызывается после каждого успешного commit — например, чтобы
+    следующие чтения клиента какое-то время шли на primary.
+    """
+
+    booking = _LazyRepository(BookingsRepository)
+    facilities = _LazyRepository(FacilitiesRepository)
+    hotels = _LazyRepository(HotelsRepository)
+    inventory = _LazyRepository(RoomInventoryRepository)
+    price_rules = _LazyRepository(RoomPriceRulesRepository)
+    rooms = _LazyRepository(RoomsRepository)
+    users = _LazyRepository(UsersRepository)
+
+    def __init__(self, session_factory, read_only: bool = False, replicas=None, on_commit=None):
         self.session_factory = session_factory
+        self.read_only = read_only
+        self.replicas = replicas
+        self.on_commit = on_commit
+        self._session = None
+        self._primary_session = None
+        self._repositories: dict[tuple, object] = {}
 
-    async def __aenter__(self):
-        self.session = self.session_factory()
+    def _primary(self):
+        # Без здоровой реплики обычная сессия и сессия заполнения кэша — одна и та же:
+        # второе соединение из того же пула на запрос грозит исчерпать пул
+        if self._primary_session is None:
+            self._primary_session = self.session_factory()
+        return self._primary_session
 
-        self.booking = BookingsRepository(self.session)
-        self.facilities = FacilitiesRepository(self.session)
-        self.hotels = HotelsRepository(self.session)
-        self.rooms = RoomsRepository(self.session)
-        self.users = UsersRepository(self.session)
+    @property
+    def session(self):
+        if self.read_only and self.replicas is not None and filling_cache.get():
+            return self._primary()
+        if self._session is None:
+            factory = None
+            if self.read_only and self.replicas is not None:
+                factory = self.replicas.pick()
+            self._session = factory() if factory is not None else self._primary()
+        return self._session
 
+    async def __aenter__(self):
         return self
 
     async def __aexit__(self, exc_type, exc_val, exc_tb):
-        await self.session.rollback()
-        await self.session.close()
+        if self._primary_session is not None and self._primary_session is not self._session:
+            await self._primary_session.close()
+        if self._session is None:
+            return
+        # close() сам откатывает незавершённую транзакцию и возвращает соединение в пул
+        if not self.read_only:
+            await self._session.rollback()
+        await self._session.close()
 
     async def commit(self):
         await self.session.commit()
+        if self.on_commit is not None:
+            self.on_commit()
+
+    async def rollback(self):
+        await self.session.rollback()
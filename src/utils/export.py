@@ -0,0 +1,37 @@
+import csv
+import io
+import json
+from collections.abc import AsyncIterator, Sequence
+
+from src.enums import ExportFormat
+
+MEDIA_TYPES = {
+    ExportFormat.ndjson: "application/x-ndjson",
+    ExportFormat.csv: "text/csv",
+}
+
+
+async def to_ndjson(partitions: AsyncIterator) -> AsyncIterator[str]:
+    async for rows in partitions:
+        yield "".join(json.dumps(dict(row), default=str, ensure_ascii=False) + "\n" for row in rows)
+
+
+async def to_csv(partitions: AsyncIterator, fieldnames: Sequence[str]) -> AsyncIterator[str]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(fieldnames)
+    yield buffer.getvalue()
+    async for rows in partitions:
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerows(row.values() for row in rows)
+        yield buffer.getvalue()
+
+
+def encode_rows(
+    partitions: AsyncIterator, fieldnames: Sequence[str], fmt: ExportFormat
+) -> AsyncIterator[str]:
+    """Превращает пачки строк из БД в поток NDJSON или CSV."""
+    if fmt == ExportFormat.csv:
+        return to_csv(partitions, fieldnames)
+    return to_ndjson(partitions)
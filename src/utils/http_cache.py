@@ -0,0 +1,49 @@
+import hashlib
+
+from fastapi import Request, Response, status
+
+from src import cache
+from src.config import settings
+
+
+def cache_control() -> str:
+    return f"public, max-age={settings.HTTP_CACHE_MAX_AGE_SECONDS}, must-revalidate"
+
+
+async def catalog_etag(request: Request, *tags: str) -> str | None:
+    """Сильный ETag из поколений тегов кэша и адреса запроса.
+
+    Поколения меняются в тех же местах записи, что сбрасывают кэш, поэтому
+    проверка If-None-Match не ходит в базу и не сериализует ответ.
+    Версию нужно читать до данных: запись между чтениями даст старый ETag
+    с новыми данными, и клиент просто получит полный ответ ещё раз.
+    """
+    if cache.redis_client is None:
+        return None
+    generations = await cache.tag_generations(cache.redis_client, list(tags))
+    raw = ":".join([request.url.path, request.url.query, *map(str, generations)])
+    return f'"{hashlib.sha1(raw.encode()).hexdigest()}"'
+
+
+def is_not_modified(request: Request, etag: str | None) -> bool:
+    if etag is None:
+        return False
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    candidates = {candidate.strip().removeprefix("W/") for candidate in header.split(",")}
+    return "*" in candidates or etag in candidates
+
+
+def not_modified(etag: str) -> Response:
+    return Response(
+        status_code=status.HTTP_304_NOT_MODIFIED,
+        headers={"ETag": etag, "Cache-Control": cache_control()},
+    )
+
+
+def set_cache_headers(response: Response, etag: str | None) -> None:
+    if etag is None:
+        return
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = cache_control()
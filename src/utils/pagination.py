@@ -0,0 +1,55 @@
+import base64
+import json
+
+from fastapi import Response
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+TOTAL_COUNT_HEADER = "X-Total-Count"
+
+
+def encode_cursor(values: list) -> str:
+    """Непрозрачный курсор: значения ключа сортировки последней строки страницы."""
+    raw = json.dumps(values, default=str, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> list:
+    padded = cursor + "=" * (-len(cursor) % 4)
+    try:
+        values = json.loads(base64.urlsafe_b64decode(padded))
+    except (ValueError, TypeError) as err:
+        raise ValueError("Некорректный курсор") from err
+    if not isinstance(values, list):
+        raise ValueError("Некорректный курсор")
+    return values
+
+
+def _sort_value(item, key: str):
+    return item[key] if isinstance(item, dict) else getattr(item, key)
+
+
+def pagination_headers(
+    items: list,
+    per_page: int,
+    sort_keys: tuple[str, ...] = ("id",),
+    total: int | None = None,
+) -> dict[str, str]:
+    """Курсор следующей страницы и (опционально) общее количество."""
+    headers = {}
+    if items and len(items) == per_page:
+        last = items[-1]
+        headers[NEXT_CURSOR_HEADER] = encode_cursor([_sort_value(last, key) for key in sort_keys])
+    if total is not None:
+        headers[TOTAL_COUNT_HEADER] = str(total)
+    return headers
+
+
+def set_pagination_headers(
+    response: Response,
+    items: list,
+    per_page: int,
+    sort_keys: tuple[str, ...] = ("id",),
+    total: int | None = None,
+) -> None:
+    """Кладёт курсор следующей страницы и (опционально) общее количество в заголовки."""
+    response.headers.update(pagination_headers(items, per_page, sort_keys, total))
@@ -0,0 +1,74 @@
+import asyncio
+import os
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from pwdlib import PasswordHash
+
+from src.config import settings
+from src.utils.stats import percentiles
+
+
+class PasswordHasher:
+    """argon2 вне event loop: в отдельном пуле потоков с ограничением параллельности.
+
+    argon2 отпускает GIL на время хеширования, поэтому потоков достаточно,
+    а воркер uvicorn продолжает обслуживать остальные запросы. Семафор не даёт
+    всплеску логинов занять больше max_concurrency ядер; время ожидания
+    в очереди и время хеширования попадают в метрики.
+    """
+
+    def __init__(self, max_concurrency: int, password_hash: PasswordHash | None = None) -> None:
+        self.password_hash = password_hash or PasswordHash.recommended()
+        self.max_concurrency = max_concurrency
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_concurrency, thread_name_prefix="password-hash"
+        )
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self.waiting = 0
+        self.completed = 0
+        self._queue_seconds: deque[float] = deque(maxlen=1024)
+        self._run_seconds: deque[float] = deque(maxlen=1024)
+
+    async def _run(self, func, *args):
+        queued_at = time.monotonic()
+        self.waiting += 1
+        try:
+            await self._semaphore.acquire()
+        finally:
+            self.waiting -= 1
+
+        try:
+            started = time.monotonic()
+            self._queue_seconds.append(started - queued_at)
+            loop = asyncio.get_running_loop()
+            result = await loop.run_in_executor(self._executor, func, *args)
+            self._run_seconds.append(time.monotonic() - started)
+            self.completed += 1
+            return result
+        finally:
+            self._semaphore.release()
+
+    async def hash(self, password: str) -> str:
+        return await self._run(self.password_hash.hash, password)
+
+    async def verify(self, password: str, hashed_password: str) -> bool:
+        return await self._run(self.password_hash.verify, password, hashed_password)
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def stats(self) -> dict:
+        return {
+            "max_concurrency": self.max_concurrency,
+            "waiting": self.waiting,
+            "completed": self.completed,
+            "queue_seconds": percentiles(self._queue_seconds),
+            "run_seconds": percentiles(self._run_seconds),
+        }
+
+
+password_hasher = PasswordHasher(
+    max_concurrency=settings.PASSWORD_HASH_MAX_CONCURRENCY or min(4, os.cpu_count() or 1)
+)
@@ -0,0 +1,104 @@
+import time
+from collections import deque
+
+from sqlalchemy import event
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+from src.utils.stats import percentiles
+
+
+class PoolMetrics:
+    """Счётчики одного пула соединений, которые собирают события пула SQLAlchemy."""
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.pool = None
+        self.checked_out = 0
+        self.waiting = 0
+        self.checkouts = 0
+        self.connects = 0
+        self.invalidations = 0
+        self.timeouts = 0
+        self.checkout_wait_seconds: deque[float] = deque(maxlen=1024)
+
+    def attach(self, pool) -> None:
+        self.pool = pool
+        pool.metrics = self
+        event.listen(pool, "connect", self._on_connect)
+        event.listen(pool, "checkout", self._on_checkout)
+        event.listen(pool, "checkin", self._on_checkin)
+        event.listen(pool, "invalidate", self._on_invalidate)
+
+    def _on_connect(self, dbapi_connection, connection_record) -> None:
+        self.connects += 1
+
+    def _on_checkout(self, dbapi_connection, connection_record, connection_proxy) -> None:
+        self.checkouts += 1
+        self.checked_out += 1
+
+    def _on_checkin(self, dbapi_connection, connection_record) -> None:
+        # checkin приходит и для соединений, упавших при checkout (pre-ping)
+        self.checked_out = max(self.checked_out - 1, 0)
+
+    def _on_invalidate(self, dbapi_connection, connection_record, exception) -> None:
+        self.invalidations += 1
+
+    def stats(self) -> dict:
+        return {
+            "name": self.name,
+            "size": self.pool.size(),
+            "overflow": self.pool.overflow(),
+            "checked_out": self.checked_out,
+            "waiting": self.waiting,
+            "checkouts": self.checkouts,
+            "connects": self.connects,
+            "invalidations": self.invalidations,
+            "timeouts": self.timeouts,
+            "checkout_wait_seconds": percentiles(self.checkout_wait_seconds),
+        }
+
+
+class InstrumentedQueuePool(AsyncAdaptedQueuePool):
+    """AsyncAdaptedQueuePool, который меряет ожидание свободного соединения.
+
+    У пула нет события «начали ждать», поэтому время и число ожидающих
+    считаются вокруг _do_get; остальное приходит из событий пула.
+    """
+
+    metrics: PoolMetrics | None = None
+
+    def _do_get(self):
+        if self.metrics is None:
+            return super()._do_get()
+        started = time.monotonic()
+        self.metrics.waiting += 1
+        try:
+            return super()._do_get()
+        except PoolTimeoutError:
+            self.metrics.timeouts += 1
+            raise
+        finally:
+            self.metrics.waiting -= 1
+            self.metrics.checkout_wait_seconds.append(time.monotonic() - started)
+
+    def recreate(self):
+        # Слушатели событий новый пул получает вместе с dispatch старого
+        pool = super().recreate()
+        if self.metrics is not None:
+            pool.metrics = self.metrics
+            self.metrics.pool = pool
+        return pool
+
+
+pool_metrics: list[PoolMetrics] = []
+
+
+def instrument_pool(engine, name: str) -> None:
+    metrics = PoolMetrics(name)
+    metrics.attach(engine.sync_engine.pool)
+    pool_metrics.append(metrics)
+
+
+def get_pool_stats() -> list[dict]:
+    return [metrics.stats() for metrics in pool_metrics]
@@ -0,0 +1,180 @@
+import time
+from array import array
+from collections import OrderedDict
+from datetime import date, timedelta
+from itertools import accumulate
+
+from src import cache
+from src.config import settings
+from src.enums import PriceRuleKind
+
+
+class RateTable:
+    """Скомпилированные цены номера по ночам в виде префиксных сумм.
+
+    Цена проживания — разность двух элементов массива, без прохода по дням.
+    """
+
+    def __init__(self, start: date, nightly: array, length_of_stay: list[tuple[int, float]]):
+        self.start = start
+        self.days = len(nightly)
+        self.prefix = array("d", accumulate(nightly, initial=0.0))
+        # (min_nights, multiplier) по убыванию min_nights
+        self.length_of_stay = sorted(length_of_stay, reverse=True)
+
+    def covers(self, date_from: date, date_to: date) -> bool:
+        return self.start <= date_from and (date_to - self.start).days <= self.days
+
+    def price(self, date_from: date, date_to: date) -> float:
+        lo = (date_from - self.start).days
+        hi = (date_to - self.start).days
+        total = self.prefix[hi] - self.prefix[lo]
+        nights = hi - lo
+        for min_nights, multiplier in self.length_of_stay:
+            if nights >= min_nights:
+                total *= multiplier
+                break
+        return round(total, 2)
+
+
+def compile_rate_table(base_price: float, rules: list, start: date, days: int) -> RateTable:
+    """Раскладывает правила номера в массив цен по ночам начиная с start."""
+    nightly = array("d", [base_price]) * days
+    length_of_stay = []
+    for rule in rules:
+        if rule.kind == PriceRuleKind.weekday:
+            first = (rule.weekday - start.weekday()) % 7
+            nightly[first::7] = array("d", (price * rule.multiplier for price in nightly[first::7]))
+        elif rule.kind == PriceRuleKind.season:
+            lo = max((rule.date_from - start).days, 0)
+            hi = min((rule.date_to - start).days, days)
+            if lo < hi:
+                nightly[lo:hi] = array("d", (price * rule.multiplier for price in nightly[lo:hi]))
+        elif rule.kind == PriceRuleKind.length_of_stay:
+            length_of_stay.append((rule.min_nights, rule.multiplier))
+    return RateTable(start, nightly, length_of_stay)
+
+
+class PricingEngine:
+    """Кэш скомпилированных таблиц цен по номерам.
+
+    Таблица строится на окно [сегодня, сегодня + PRICING_HORIZON_DAYS] и живёт
+    PRICING_CACHE_TTL_SECONDS. Проживание за пределами окна считается по разовой
+    таблице на свой период и в кэш не попадает, поэтому размер таблицы не
+    зависит от присланных дат. Число таблиц ограничено: кэш — LRU не больше
+    PRICING_CACHE_MAX_ROOMS номеров, просроченные выбрасываются при добавлении.
+
+    Изменение правил или цены номера увеличивает его версию в Redis. Таблица
+    запоминается с версией, прочитанной до загрузки правил, и используется,
+    только пока версия совпадает: компиляция, начатая до инвалидации, не
+    оживит старые цены ни в одном воркере. Без Redis остаётся только TTL.
+    """
+
+    def __init__(self, horizon_days: int, ttl_seconds: float, max_rooms: int) -> None:
+        self.horizon_days = horizon_days
+        self.ttl_seconds = ttl_seconds
+        self.max_rooms = max_rooms
+        self._tables: OrderedDict[int, tuple[float, int | None, RateTable]] = OrderedDict()
+
+    @staticmethod
+    def version_key(room_id: int) -> str:
+        return f"pricing:version:{room_id}"
+
+    async def _versions(self, room_ids: list[int]) -> list[int | None]:
+        if cache.redis_client is None:
+            return [None] * len(room_ids)
+        values = await cache.redis_client.mget([self.version_key(room_id) for room_id in room_ids])
+        return [int(value or 0) for value in values]
+
+    def _cached(
+        self, room_id: int, version: int | None, date_from: date, date_to: date
+    ) -> RateTable | None:
+        entry = self._tables.get(room_id)
+        if entry is None:
+            return None
+        compiled_at, compiled_version, table = entry
+        if time.monotonic() - compiled_at > self.ttl_seconds:
+            del self._tables[room_id]
+            return None
+        if version is not None and compiled_version != version:
+            return None
+        self._tables.move_to_end(room_id)
+        return table if table.covers(date_from, date_to) else None
+
+    def _store(self, tables: dict[int, tuple[float, int | None, RateTable]]) -> None:
+        """Добавляет таблицы, выбрасывая просроченные и давно не читанные."""
+        now = time.monotonic()
+        expired = [
+            room_id
+            for room_id, (compiled_at, _, _) in self._tables.items()
+            if now - compiled_at > self.ttl_seconds
+        ]
+        for room_id in expired:
+            del self._tables[room_id]
+        for room_id, entry in tables.items():
+            self._tables[room_id] = entry
+            self._tables.move_to_end(room_id)
+        while len(self._tables) > self.max_rooms:
+            self._tables.popitem(last=False)
+
+    async def price_stays(self, db, stays: list[tuple]) -> list[float]:
+        """Цены для списка (room, date_from, date_to); правила дочитываются одним запросом."""
+        room_ids = list({room.id for room, _, _ in stays})
+        versions = dict(zip(room_ids, await self._versions(room_ids), strict=True))
+        tables = [
+            self._cached(room.id, versions[room.id], date_from, date_to)
+            for room, date_from, date_to in stays
+        ]
+        missing = {
+            room.id for (room, _, _), table in zip(stays, tables, strict=True) if table is None
+        }
+        if missing:
+            rules_by_room: dict[int, list] = {room_id: [] for room_id in missing}
+            # Таблица переживёт запрос: правила читаются с primary, а не с реплики
+            filling = cache.filling_cache.set(True)
+            try:
+                rules = await db.price_rules.get_for_rooms(list(missing))
+            finally:
+                cache.filling_cache.reset(filling)
+            for rule in rules:
+                rules_by_room[rule.room_id].append(rule)
+
+            today = date.today()
+            window_end = today + timedelta(days=self.horizon_days)
+            compiled: dict[int, RateTable] = {}
+            for i, (room, date_from, date_to) in enumerate(stays):
+                if tables[i] is not None:
+                    continue
+                rules = rules_by_room[room.id]
+                if not (today <= date_from and date_to <= window_end):
+                    tables[i] = compile_rate_table(
+                        room.price, rules, date_from, (date_to - date_from).days
+                    )
+                    continue
+                if room.id not in compiled:
+                    compiled[room.id] = compile_rate_table(
+                        room.price, rules, today, self.horizon_days
+                    )
+                tables[i] = compiled[room.id]
+            now = time.monotonic()
+            self._store(
+                {room_id: (now, versions[room_id], table) for room_id, table in compiled.items()}
+            )
+
+        return [
+            table.price(date_from, date_to)
+            for table, (_, date_from, date_to) in zip(tables, stays, strict=True)
+        ]
+
+    async def invalidate(self, room_id: int) -> None:
+        """Сбрасывает таблицу номера во всех воркерах."""
+        self._tables.pop(room_id, None)
+        if cache.redis_client is not None:
+            await cache.redis_client.incr(self.version_key(room_id))
+
+
+pricing_engine = PricingEngine(
+    horizon_days=settings.PRICING_HORIZON_DAYS,
+    ttl_seconds=settings.PRICING_CACHE_TTL_SECONDS,
+    max_rooms=settings.PRICING_CACHE_MAX_ROOMS,
+)
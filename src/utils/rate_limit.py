@@ -0,0 +1,160 @@
+import time
+from collections import OrderedDict, deque
+from dataclasses import dataclass
+
+from fastapi import HTTPException, Request, status
+from redis.exceptions import RedisError
+
+from src import cache
+from src.config import config as authx_config, security, settings
+from src.enums import ErrorCode
+from src.utils.stats import percentiles
+
+# Token bucket: пополнение по времени Redis, списание и запись одним атомарным вызовом.
+# Возвращает {разрешено (0/1), через сколько секунд повторить}.
+TOKEN_BUCKET_SCRIPT = """
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local cost = tonumber(ARGV[3])
+local time = redis.call("TIME")
+local now = tonumber(time[1]) + tonumber(time[2]) / 1000000
+local bucket = redis.call("HMGET", KEYS[1], "tokens", "ts")
+local tokens = tonumber(bucket[1]) or capacity
+local ts = tonumber(bucket[2]) or now
+tokens = math.min(capacity, tokens + math.max(now - ts, 0) * rate)
+local allowed = 0
+local retry_after = 0
+if tokens >= cost then
+    tokens = tokens - cost
+    allowed = 1
+else
+    retry_after = (cost - tokens) / rate
+end
+redis.call("HSET", KEYS[1], "tokens", tostring(tokens), "ts", tostring(now))
+redis.call("PEXPIRE", KEYS[1], math.ceil(capacity / rate * 1000))
+return {allowed, tostring(retry_after)}
+"""
+
+
+@dataclass(frozen=True, slots=True)
+class RateLimit:
+    """Корзина на capacity запросов, пополняемая со скоростью per_second в секунду."""
+
+    capacity: int
+    per_second: float
+
+
+class LocalTokenBuckets:
+    """Те же корзины в памяти процесса — на время недоступности Redis.
+
+    Лимит при этом действует на каждый воркер отдельно, то есть мягче.
+    """
+
+    def __init__(self, max_entries: int = 10000) -> None:
+        self.max_entries = max_entries
+        self._buckets: OrderedDict[str, tuple[float, float]] = OrderedDict()
+
+    def hit(self, key: str, limit: RateLimit, cost: int = 1) -> tuple[bool, float]:
+        now = time.monotonic()
+        tokens, ts = self._buckets.get(key, (limit.capacity, now))
+        tokens = min(limit.capacity, tokens + (now - ts) * limit.per_second)
+        allowed = tokens >= cost
+        retry_after = 0.0
+        if allowed:
+            tokens -= cost
+        else:
+            retry_after = (cost - tokens) / limit.per_second
+        self._buckets[key] = (tokens, now)
+        self._buckets.move_to_end(key)
+        while len(self._buckets) > self.max_entries:
+            self._buckets.popitem(last=False)
+        return allowed, retry_after
+
+
+class RateLimiter:
+    def __init__(self) -> None:
+        self.local = LocalTokenBuckets()
+        self._script = None
+        self._script_client = None
+        self.allowed = 0
+        self.rejected = 0
+        self.fallbacks = 0
+        self._overhead_seconds: deque[float] = deque(maxlen=1024)
+
+    def _get_script(self):
+        # Скрипт привязан к клиенту; Script сам делает EVALSHA и при NOSCRIPT — EVAL
+        if self._script_client is not cache.redis_client:
+            self._script = cache.redis_client.register_script(TOKEN_BUCKET_SCRIPT)
+            self._script_client = cache.redis_client
+        return self._script
+
+    async def hit(self, key: str, limit: RateLimit, cost: int = 1) -> tuple[bool, float]:
+        started = time.monotonic()
+        try:
+            if cache.redis_client is None:
+                raise RedisError("Redis не инициализирован")
+            allowed, retry_after = await self._get_script()(
+                keys=[f"ratelimit:{key}"], args=[limit.capacity, limit.per_second, cost]
+            )
+            allowed, retry_after = bool(int(allowed)), float(retry_after)
+        except RedisError:
+            self.fallbacks += 1
+            allowed, retry_after = self.local.hit(key, limit, cost)
+        self._overhead_seconds.append(time.monotonic() - started)
+        if allowed:
+            self.allowed += 1
+        else:
+            self.rejected += 1
+        return allowed, retry_after
+
+    def stats(self) -> dict:
+        return {
+            "allowed": self.allowed,
+            "rejected": self.rejected,
+            "fallbacks": self.fallbacks,
+            "overhead_seconds": percentiles(self._overhead_seconds),
+        }
+
+
+rate_limiter = RateLimiter()
+
+
+def by_ip(request: Request) -> str:
+    return f"ip:{request.client.host if request.client else 'unknown'}"
+
+
+def by_route(request: Request) -> str:
+    return "route"
+
+
+def by_user(request: Request) -> str:
+    """Пользователь из access-токена; без валидного токена — IP."""
+    token = request.cookies.get(authx_config.JWT_ACCESS_COOKIE_NAME)
+    if token:
+        try:
+            return f"user:{security._decode_token(token).sub}"
+        except Exception:
+            pass
+    return by_ip(request)
+
+
+async def enforce_rate_limit(bucket: str, limit: RateLimit) -> None:
+    """429 с Retry-After, если корзина bucket пуста."""
+    if not settings.RATE_LIMIT_ENABLED:
+        return
+    allowed, retry_after = await rate_limiter.hit(bucket, limit)
+    if not allowed:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail={"code": ErrorCode.TOO_MANY_REQUESTS},
+            headers={"Retry-After": str(max(int(retry_after + 0.999), 1))},
+        )
+
+
+def rate_limit(name: str, limit: RateLimit, key=by_ip):
+    """Dependency: 429 с Retry-After, если корзина name для ключа key(request) пуста."""
+
+    async def dependency(request: Request) -> None:
+        await enforce_rate_limit(f"{name}:{key(request)}", limit)
+
+    return dependency
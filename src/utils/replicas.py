@@ -0,0 +1,108 @@
+import asyncio
+import itertools
+
+from sqlalchemy import text
+
+from src.config import settings
+from src.database import replica_engines, replica_session_makers
+
+# streaming — подключён ли WAL receiver к primary: без него receive_lsn замирает,
+# и «всё полученное применено» ничего не говорит о свежести. Без pg_read_all_stats
+# строка receiver видна, но status в ней NULL.
+# lag — отставание в секундах; 0, если всё полученное уже применено
+# (иначе на простаивающем primary время последней транзакции росло бы бесконечно).
+# На primary lag — NULL
+REPLICA_LAG_QUERY = text(
+    """
+    SELECT
+        EXISTS (
+            SELECT 1 FROM pg_stat_wal_receiver WHERE status = 'streaming' OR status IS NULL
+        ) AS streaming,
+        CASE
+            WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+            ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp())
+        END AS lag
+    """
+)
+
+
+class Replica:
+    def __init__(self, engine, session_maker) -> None:
+        self.engine = engine
+        self.session_maker = session_maker
+        self.healthy = False
+        self.streaming = False
+        self.lag_seconds: float | None = None
+
+
+class ReplicaSet:
+    """Реплики для чтения с контролем отставания.
+
+    Фоновая задача раз в DB_REPLICA_CHECK_SECONDS меряет отставание каждой
+    реплики; отстающие больше DB_REPLICA_MAX_LAG_SECONDS, потерявшие
+    соединение с primary и недоступные исключаются. До первой проверки и когда
+    здоровых реплик нет, pick() возвращает None — чтение уходит на primary.
+    """
+
+    def __init__(self, replicas: list[Replica], max_lag_seconds: float) -> None:
+        self.replicas = replicas
+        self.max_lag_seconds = max_lag_seconds
+        self._round_robin = itertools.cycle(replicas) if replicas else None
+        self._check_task: asyncio.Task | None = None
+
+    def pick(self):
+        """Фабрика сессий здоровой реплики по кругу или None."""
+        for _ in range(len(self.replicas)):
+            replica = next(self._round_robin)
+            if replica.healthy:
+                return replica.session_maker
+        return None
+
+    async def _check(self, replica: Replica) -> None:
+        try:
+            async with replica.engine.connect() as conn:
+                streaming, lag = (await conn.execute(REPLICA_LAG_QUERY)).one()
+        except Exception as err:
+            print("replica check error:", repr(err))
+            replica.healthy, replica.streaming, replica.lag_seconds = False, False, None
+            return
+        # NULL: сервер не в режиме восстановления, то есть это не реплика
+        replica.streaming = streaming
+        replica.lag_seconds = None if lag is None else float(lag)
+        replica.healthy = streaming and lag is not None and float(lag) <= self.max_lag_seconds
+
+    async def check(self) -> None:
+        await asyncio.gather(*(self._check(replica) for replica in self.replicas))
+
+    async def _check_forever(self) -> None:
+        while True:
+            await self.check()
+            await asyncio.sleep(settings.DB_REPLICA_CHECK_SECONDS)
+
+    def start(self) -> None:
+        if self.replicas:
+            self._check_task = asyncio.create_task(self._check_forever())
+
+    def stop(self) -> None:
+        if self._check_task:
+            self._check_task.cancel()
+
+    def stats(self) -> list[dict]:
+        return [
+            {
+                "url": replica.engine.url.render_as_string(hide_password=True),
+                "healthy": replica.healthy,
+                "streaming": replica.streaming,
+                "lag_seconds": replica.lag_seconds,
+            }
+            for replica in self.replicas
+        ]
+
+
+replica_set = ReplicaSet(
+    [
+        Replica(engine, session_maker)
+        for engine, session_maker in zip(replica_engines, replica_session_makers, strict=True)
+    ],
+    max_lag_seconds=settings.DB_REPLICA_MAX_LAG_SECONDS,
+)
@@ -0,0 +1,199 @@
+import asyncio
+import hashlib
+import math
+import time
+from datetime import datetime
+
+from redis.exceptions import RedisError
+
+from src import cache
+from src.config import config as authx_config, settings
+
+# Все отзывы с временем, после которого они не нужны: jti:<jti> и user:<id>
+REVOCATIONS_KEY = "auth:revocations"
+# Те же отзывы со временем добавления — для инкрементальной синхронизации
+ADDED_KEY = "auth:revocations:added"
+# Запас на расхождение часов воркеров при чтении новых отзывов
+SYNC_OVERLAP_SECONDS = 30.0
+
+
+def token_timestamp(value) -> float | None:
+    if value is None:
+        return None
+    return value.timestamp() if isinstance(value, datetime) else float(value)
+
+
+class BloomFilter:
+    """Фильтр Блума: «точно нет» без ложных ответов, «возможно да» с долей ошибок."""
+
+    def __init__(self, capacity: int, error_rate: float) -> None:
+        self.size = max(int(-capacity * math.log(error_rate) / math.log(2) ** 2), 8)
+        self.hashes = max(round(self.size / capacity * math.log(2)), 1)
+        self.bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, item: str):
+        digest = hashlib.blake2b(item.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return ((h1 + i * h2) % self.size for i in range(self.hashes))
+
+    def add(self, item: str) -> None:
+        for position in self._positions(item):
+            self.bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, item: str) -> bool:
+        return all(
+            self.bits[position >> 3] & (1 << (position & 7)) for position in self._positions(item)
+        )
+
+
+class TokenRevocation:
+    """Отзыв JWT по jti и по «эпохе» сессий пользователя.
+
+    Источник правды — Redis: auth:revoked:<jti> и auth:epoch:<user_id>
+    (токены, выпущенные раньше эпохи, недействительны). Эпоха и iat сравниваются
+    в целых секундах: токен, выпущенный в ту же секунду, что и отзыв, остаётся
+    действительным — иначе отклонялся бы и вход сразу после смены пароля.
+
+    Каждый воркер держит фильтр Блума по всем действующим отзывам. Раз в
+    AUTH_REVOCATION_SYNC_SECONDS он дочитывает из ADDED_KEY только отзывы,
+    добавленные с прошлой синхронизации, а раз в AUTH_REVOCATION_REBUILD_SECONDS
+    пересобирает фильтр целиком из REVOCATIONS_KEY, чтобы выбросить истёкшие.
+    Если фильтр говорит «нет» — токен принимается без похода в Redis;
+    «возможно» перепроверяется в Redis. Отзыв в другом воркере становится
+    виден здесь не позже следующей синхронизации.
+    """
+
+    def __init__(self) -> None:
+        self.bloom = self._new_bloom()
+        self.synced = False
+        self.redis_checks = 0
+        self.local_checks = 0
+        self.full_syncs = 0
+        self.incremental_syncs = 0
+        self._rebuilt_at = 0.0
+        self._synced_at = 0.0
+        self._sync_task: asyncio.Task | None = None
+        # Отзывы этого воркера, сделанные во время идущей синхронизации
+        self._local_adds: list[str] = []
+
+    @staticmethod
+    def _new_bloom() -> BloomFilter:
+        return BloomFilter(
+            settings.AUTH_REVOCATION_BLOOM_CAPACITY, settings.AUTH_REVOCATION_BLOOM_ERROR_RATE
+        )
+
+    async def revoke_token(self, jti: str, expires_at: float) -> None:
+        """Отзывает один токен до момента его истечения."""
+        now = time.time()
+        ttl = int(expires_at - now) + 1
+        if ttl <= 0:
+            return
+        async with cache.redis_client.pipeline(transaction=False) as pipe:
+            pipe.set(f"auth:revoked:{jti}", 1, ex=ttl)
+            pipe.zadd(REVOCATIONS_KEY, {f"jti:{jti}": expires_at})
+            pipe.zadd(ADDED_KEY, {f"jti:{jti}": now})
+            await pipe.execute()
+        self._add_local(f"jti:{jti}")
+
+    async def revoke_user(self, user_id: int) -> None:
+        """Отзывает все уже выданные токены пользователя."""
+        # Дольше refresh-токена ни один старый токен не проживёт
+        ttl = int(authx_config.JWT_REFRESH_TOKEN_EXPIRES.total_seconds())
+        now = int(time.time())
+        async with cache.redis_client.pipeline(transaction=False) as pipe:
+            pipe.set(f"auth:epoch:{user_id}", now, ex=ttl)
+            pipe.zadd(REVOCATIONS_KEY, {f"user:{user_id}": now + ttl})
+            pipe.zadd(ADDED_KEY, {f"user:{user_id}": now})
+            await pipe.execute()
+        self._add_local(f"user:{user_id}")
+
+    def _add_local(self, item: str) -> None:
+        self.bloom.add(item)
+        self._local_adds.append(item)
+
+    async def is_revoked(self, payload) -> bool:
+        jti, user_id = payload.jti, payload.sub
+        if self.synced and f"jti:{jti}" not in self.bloom and f"user:{user_id}" not in self.bloom:
+            self.local_checks += 1
+            return False
+
+        self.redis_checks += 1
+        try:
+            revoked, epoch = await cache.redis_client.mget(
+                f"auth:revoked:{jti}", f"auth:epoch:{user_id}"
+            )
+        except (RedisError, AttributeError) as err:
+            # Redis недоступен: доверяем фильтру, «возможно» считаем отзывом
+            print("token revocation check error:", repr(err))
+            return self.synced and (f"jti:{jti}" in self.bloom or f"user:{user_id}" in self.bloom)
+        if revoked is not None:
+            return True
+        issued_at = token_timestamp(payload.iat)
+        if epoch is None or issued_at is None:
+            return False
+        return int(issued_at) < int(float(epoch))
+
+    async def sync(self) -> None:
+        now = time.time()
+        rebuild_seconds = settings.AUTH_REVOCATION_REBUILD_SECONDS
+        if (
+            self.synced
+            and now - self._rebuilt_at < rebuild_seconds
+            and now - self._synced_at < rebuild_seconds
+        ):
+            members = await cache.redis_client.zrangebyscore(
+                ADDED_KEY, self._synced_at - SYNC_OVERLAP_SECONDS, "+inf"
+            )
+            for member in members:
+                self.bloom.add(member)
+            self._synced_at = now
+            self.incremental_syncs += 1
+            return
+
+        self._local_adds = []
+        async with cache.redis_client.pipeline(transaction=False) as pipe:
+            pipe.zremrangebyscore(REVOCATIONS_KEY, "-inf", now)
+            # Инкрементально читают не дальше rebuild_seconds назад, остальное не нужно
+            pipe.zremrangebyscore(ADDED_KEY, "-inf", now - 2 * rebuild_seconds)
+            pipe.zrange(REVOCATIONS_KEY, 0, -1)
+            _, _, members = await pipe.execute()
+        bloom = self._new_bloom()
+        for member in [*members, *self._local_adds]:
+            bloom.add(member)
+        self.bloom = bloom
+        self.synced = True
+        self._rebuilt_at = self._synced_at = now
+        self.full_syncs += 1
+
+    async def _sync_forever(self) -> None:
+        while True:
+            try:
+                await self.sync()
+            except asyncio.CancelledError:
+                raise
+            except Exception as err:
+                print("token revocation sync error:", repr(err))
+                self.synced = False
+            await asyncio.sleep(settings.AUTH_REVOCATION_SYNC_SECONDS)
+
+    def start(self) -> None:
+        self._sync_task = asyncio.create_task(self._sync_forever())
+
+    def stop(self) -> None:
+        if self._sync_task:
+            self._sync_task.cancel()
+
+    def stats(self) -> dict:
+        return {
+            "synced": self.synced,
+            "bloom_bits": self.bloom.size,
+            "bloom_hashes": self.bloom.hashes,
+            "local_checks": self.local_checks,
+            "redis_checks": self.redis_checks,
+            "full_syncs": self.full_syncs,
+            "incremental_syncs": self.incremental_syncs,
+        }
+
+
+token_revocation = TokenRevocation()
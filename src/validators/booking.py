@@ -1,15 +1,16 @@
-from sqlalchemy import and_
-
-from src.models.bookings import BookingOrm
 from src.schemas.booking import BookingCreateSchema
+from src.utils.availability_index import availability_index
 
 
 class BookingValidator:
     @staticmethod
-    async def has_overlapping_booking(booking: BookingCreateSchema, db) -> bool:
-        overlap_condition = and_(
-            BookingOrm.room_id == booking.room_id,
-            BookingOrm.date_from < booking.date_to,
-            BookingOrm.date_to > booking.date_from,
+    async def get_max_booked_units(booking: BookingCreateSchema, db) -> int:
+        """Пиковая занятость номера за период: из индекса в памяти, иначе из календаря."""
+        cached = availability_index.max_booked_units(
+            booking.room_id, booking.date_from, booking.date_to
+        )
+        if cached is not None:
+            return cached
+        return await db.inventory.get_max_booked_units(
+            booking.room_id, booking.date_from, booking.date_to
         )
-        return await db.booking.exists(overlap_condition)
@@ -0,0 +1,164 @@
+import asyncio
+import os
+from pathlib import Path
+
+import pytest
+
+# Настройки читаются при импорте src.config, поэтому подставляем их до импорта приложения.
+# По умолчанию — Postgres из docker-compose.test.yml, но отдельная база, а не app_db
+os.environ.setdefault("DB_HOST", "localhost")
+os.environ.setdefault("DB_PORT", "5433")
+os.environ.setdefault("DB_USER", "app_user")
+os.environ.setdefault("DB_PASS", "app_password")
+os.environ["DB_NAME"] = os.environ.get("TEST_DB_NAME", "app_test")
+os.environ.setdefault("JWT_SECRET_KEY", "test-secret")
+
+TEST_REDIS_URL = os.environ.get("TEST_REDIS_URL", "redis://localhost:6379/15")
+ROOT = Path(__file__).resolve().parent.parent
+
+
+@pytest.fixture(scope="session")
+def loop():
+    """Один цикл событий на все тесты: пулы соединений привязаны к циклу."""
+    loop = asyncio.new_event_loop()
+    yield loop
+    loop.close()
+
+
+@pytest.fixture(scope="session")
+def run(loop):
+    return loop.run_until_complete
+
+
+async def _create_database() -> None:
+    import asyncpg
+
+    from src.config import settings
+
+    conn = await asyncpg.connect(
+        host=settings.DB_HOST,
+        port=settings.DB_PORT,
+        user=settings.DB_USER,
+        password=settings.DB_PASS,
+        database="postgres",
+        timeout=3,
+    )
+    try:
+        exists = await conn.fetchval(
+            "SELECT 1 FROM pg_database WHERE datname = $1", settings.DB_NAME
+        )
+        if not exists:
+            await conn.execute(f'CREATE DATABASE "{settings.DB_NAME}"')
+    finally:
+        await conn.close()
+
+
+@pytest.fixture(scope="session")
+def database(run):
+    """Тестовая база со схемой по миграциям. Без Postgres тесты пропускаются."""
+    try:
+        run(_create_database())
+    except (OSError, TimeoutError) as err:
+        pytest.skip(f"Postgres недоступен: {err!r}")
+
+    from alembic import command
+    from alembic.config import Config
+
+    from src.database import engine
+
+    command.upgrade(Config(str(ROOT / "alembic.ini")), "head")
+    yield engine
+    run(engine.dispose())
+
+
+@pytest.fixture
+def db(database, run):
+    """Пустые таблицы перед тестом."""
+    from sqlalchemy import text
+
+    async def truncate():
+        async with database.begin() as conn:
+            await conn.execute(
+                text(
+                    "TRUNCATE bookings, room_inventory, room_price_rules, room_facilities, "
+                    "facilities, rooms, hotels, users RESTART IDENTITY CASCADE"
+                )
+            )
+
+    run(truncate())
+    return database
+
+
+@pytest.fixture
+def redis(run):
+    """Redis из TEST_REDIS_URL с пустой базой. Без Redis тесты пропускаются."""
+    from redis.exceptions import RedisError
+
+    from src import cache
+
+    run(cache.init_redis(TEST_REDIS_URL))
+    try:
+        run(cache.redis_client.flushdb())
+    except (OSError, RedisError) as err:
+        run(cache.close_redis())
+        pytest.skip(f"Redis недоступен: {err!r}")
+    cache.local_cache.clear()
+    yield cache.redis_client
+    run(cache.close_redis())
+    cache.redis_client = cache.redis_binary_client = None
+
+
+@pytest.fixture
+def make_room(db):
+    """Корутина, создающая отель с одним номером; возвращает id номера."""
+    from src.database import async_session_maker
+    from src.utils.db_manager import DbManager
+
+    async def make(quantity: int = 1, price: float = 100.0) -> int:
+        async with DbManager(async_session_maker) as manager:
+            hotel = await manager.hotels.add({"title": "Тестовый отель", "location": "Тест"})
+            [room] = await manager.rooms.add_bulk(
+                [
+                    {
+                        "title": "Номер",
+                        "description": None,
+                        "price": price,
+                        "quantity": quantity,
+                        "hotel_id": hotel.id,
+                    }
+                ]
+            )
+            await manager.commit()
+            return room.id
+
+    return make
+
+
+@pytest.fixture
+def make_user(db):
+    """Корутина, создающая пользователя; возвращает его id."""
+    from src.database import async_session_maker
+    from src.utils.db_manager import DbManager
+
+    async def make(email: str = "user@example.com", role: str = "User") -> int:
+        async with DbManager(async_session_maker) as manager:
+            user = await manager.users.add({"email": email, "hashed_password": "-", "role": role})
+            await manager.commit()
+            return user.id
+
+    return make
+
+
+@pytest.fixture
+def sql_log(database):
+    """(statement, parameters) всех запросов к primary, выполненных во время теста."""
+    from sqlalchemy import event
+
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append((statement, parameters))
+
+    event.listen(database.sync_engine, "before_cursor_execute", record)
+    yield statements
+    event.remove(database.sync_engine, "before_cursor_execute", record)
@@ -0,0 +1,171 @@
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import update
+
+from src.enums import UserRoles
+
+
+async def principal(user_id: int):
+    from src.database import async_session_maker
+    from src.repositories.users import UsersRepository
+    from src.services.users import user_principals
+
+    async with async_session_maker() as session:
+        return await user_principals.get(user_id, UsersRepository(session).get_by_ids)
+
+
+def test_admin_user_edits_reset_principal_cache(make_user, redis, run):
+    from src.admin import UsersAdmin
+    from src.database import async_session_maker
+    from src.models.users import UsersOrm
+
+    admin = UsersAdmin()
+
+    async def scenario():
+        user_id = await make_user(role=UserRoles.admin)
+        assert (await principal(user_id)).role == UserRoles.admin
+
+        # sqladmin пишет в базу сам, сервис об этом не знает
+        async with async_session_maker() as session:
+            await session.execute(
+                update(UsersOrm).where(UsersOrm.id == user_id).values(role=UserRoles.user)
+            )
+            await session.commit()
+        await admin.after_model_change({}, SimpleNamespace(id=user_id), False, None)
+        demoted = await principal(user_id)
+
+        await admin.after_model_delete(SimpleNamespace(id=user_id), None)
+        epoch = await redis.get(f"auth:epoch:{user_id}")
+        return demoted.role, epoch
+
+    role, epoch = run(scenario())
+    assert role == UserRoles.user
+    assert epoch is not None
+
+
+@pytest.mark.parametrize(
+    "term, expected",
+    [
+        # id первого пользователя и email, начинающийся с цифры
+        ("1", {"admin@example.com", "1st@example.com"}),
+        # За пределами int4: только префикс email
+        ("99999999999", {"99999999999@example.com"}),
+        # isdigit() верен и для не-ASCII цифр: «²» роняла int(), «١» находила id 1
+        ("²", set()),
+        ("١", set()),
+        ("ADMIN", {"admin@example.com"}),
+    ],
+)
+def test_admin_search_by_digits_and_prefix(make_user, run, term, expected):
+    from sqlalchemy import select
+
+    from src.admin import UsersAdmin
+    from src.database import async_session_maker
+    from src.models.users import UsersOrm
+
+    async def scenario():
+        for email in ("admin@example.com", "1st@example.com", "99999999999@example.com"):
+            await make_user(email=email)
+        async with async_session_maker() as session:
+            stmt = UsersAdmin().search_query(select(UsersOrm), term)
+            return {user.email for user in (await session.execute(stmt)).scalars()}
+
+    assert run(scenario()) == expected
+
+
+def catalog_app():
+    from fastapi import FastAPI
+
+    from src.admin import setup_admin
+    from src.api.routers import facilities, hotels, rooms
+
+    app = FastAPI()
+    for module in (hotels, rooms, facilities):
+        app.include_router(module.router)
+    return app, setup_admin(app)
+
+
+@pytest.mark.parametrize(
+    "identity, url, changes",
+    [
+        ("hotels-orm", "/hotels", {"title": "Переименован"}),
+        ("hotels-orm", "/hotels/{hotel_id}", {"title": "Переименован"}),
+        ("rooms-orm", "/rooms", {"price": 999}),
+        ("facilities-orm", "/facilities", {"title": "Сейф"}),
+    ],
+)
+def test_admin_catalog_edits_change_etag(make_room, redis, run, identity, url, changes):
+    import httpx
+    from sqlalchemy import insert, select
+
+    from src.database import async_session_maker
+    from src.models.facilities import FacilitiesOrm
+    from src.models.rooms import RoomsOrm
+
+    app, admin = catalog_app()
+    [view] = [view for view in admin._views if view.identity == identity]
+
+    async def scenario():
+        room_id = await make_room()
+        async with async_session_maker() as session:
+            hotel_id = await session.scalar(select(RoomsOrm.hotel_id).where(RoomsOrm.id == room_id))
+            facility_id = await session.scalar(
+                insert(FacilitiesOrm).values(title="Wi-Fi").returning(FacilitiesOrm.id)
+            )
+            await session.commit()
+        pk = {"hotels-orm": hotel_id, "rooms-orm": room_id, "facilities-orm": facility_id}
+        path = url.format(hotel_id=hotel_id, facility_id=facility_id)
+
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            first = await client.get(path)
+            etag = first.headers["ETag"]
+            assert (await client.get(path, headers={"If-None-Match": etag})).status_code == 304
+
+            # Запись идёт через sqladmin, мимо сервисов каталога
+            await view.update_model(None, str(pk[identity]), changes)
+            after = await client.get(path, headers={"If-None-Match": etag})
+        return first.json(), after.status_code, after.headers["ETag"] != etag, after.json()
+
+    before, status, etag_changed, body = run(scenario())
+    assert status == 200
+    assert etag_changed
+    assert body != before
+
+
+def test_admin_filtered_list_counts_exactly(make_user, run, monkeypatch):
+    from sqladmin.filters import BooleanFilter
+    from sqlalchemy import text
+    from starlette.requests import Request
+
+    from src.admin import UsersAdmin
+    from src.config import settings
+    from src.database import async_session_maker
+    from src.models.users import UsersOrm
+
+    monkeypatch.setattr(settings, "ADMIN_EXACT_COUNT_MAX_ROWS", 0)
+    monkeypatch.setattr(UsersAdmin, "column_filters", [BooleanFilter(UsersOrm.is_active)])
+    admin = UsersAdmin()
+    admin.session_maker, admin.is_async = async_session_maker, True
+
+    async def count(query: bytes) -> int:
+        request = Request({"type": "http", "query_string": query, "headers": []})
+        return (await admin.list(request)).count
+
+    async def scenario():
+        for i in range(3):
+            await make_user(email=f"user{i}@example.com")
+        async with async_session_maker() as session:
+            await session.execute(
+                update(UsersOrm)
+                .where(UsersOrm.email == "user0@example.com")
+                .values(is_active=False)
+            )
+            await session.commit()
+            # Статистика для pg_class.reltuples
+            await session.execute(text("ANALYZE users"))
+        return await count(b""), await count(b"is_active=false")
+
+    # Без фильтра — оценка по всей таблице, с фильтром — точный COUNT(*)
+    assert run(scenario()) == (3, 1)
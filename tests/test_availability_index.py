@@ -0,0 +1,72 @@
+import time
+from datetime import date, timedelta
+
+from src.utils.availability_index import AvailabilityIndex
+
+TODAY = date.today()
+
+
+def created(booking_id: int, room_id: int, date_from: date, date_to: date) -> dict:
+    return {
+        "booking_id": booking_id,
+        "room_id": room_id,
+        "date_from": date_from.isoformat(),
+        "date_to": date_to.isoformat(),
+        "emitted_at": time.time(),
+    }
+
+
+def test_events_are_ignored_until_index_is_loaded():
+    index = AvailabilityIndex()
+    index.on_created(created(1, 1, TODAY, TODAY + timedelta(days=2)))
+    assert index.stats()["bookings"] == 0
+
+
+def test_events_during_load_are_applied_after_snapshot():
+    index = AvailabilityIndex()
+    index.begin_load()
+    # Бронь 1 уже есть в снимке, бронь 2 создана после него, бронь 3 — удалена после него
+    index.on_created(created(1, 1, TODAY, TODAY + timedelta(days=2)))
+    index.on_created(created(2, 1, TODAY + timedelta(days=1), TODAY + timedelta(days=3)))
+    index.on_deleted({"booking_id": 3, "emitted_at": time.time()})
+    index.load(
+        [
+            (1, 1, TODAY, TODAY + timedelta(days=2)),
+            (3, 1, TODAY + timedelta(days=5), TODAY + timedelta(days=6)),
+        ]
+    )
+
+    assert index.stats()["bookings"] == 2
+    assert index.max_booked_units(1, TODAY, TODAY + timedelta(days=3)) == 2
+    assert index.max_booked_units(1, TODAY + timedelta(days=5), TODAY + timedelta(days=6)) == 0
+
+
+def test_index_goes_stale_when_events_stop():
+    index = AvailabilityIndex(max_idle_seconds=60)
+    index.load([])
+    assert index.is_fresh
+
+    index.loaded_at -= 120
+    assert not index.is_fresh
+    assert index.max_booked_units(1, TODAY, TODAY + timedelta(days=1)) is None
+
+    index.on_deleted({"booking_id": 1, "emitted_at": time.time()})
+    assert index.is_fresh
+
+
+def test_finished_bookings_are_pruned():
+    index = AvailabilityIndex()
+    index.load(
+        [
+            (1, 1, TODAY - timedelta(days=30), TODAY - timedelta(days=1)),
+            (2, 1, TODAY - timedelta(days=2), TODAY + timedelta(days=2)),
+            (3, 2, TODAY - timedelta(days=5), TODAY),
+        ]
+    )
+    index.prune(TODAY)
+
+    assert index.stats()["bookings"] == 1
+    assert index.stats()["rooms"] == 1
+    assert index.max_booked_units(1, TODAY, TODAY + timedelta(days=1)) == 1
+    # Удаление уже выброшенной брони ничего не ломает
+    index.remove(1)
@@ -0,0 +1,119 @@
+"""Нагрузочная проверка приёма броней под advisory-локами номеров."""
+
+import asyncio
+from collections import Counter
+from datetime import date, timedelta
+
+import httpx
+import pytest
+from fastapi import FastAPI
+
+CONTENDERS = 300
+# Даты внутри окна таблиц цен: цена берётся из кэша движка, а не из разовой таблицы
+START = date.today() + timedelta(days=30)
+
+
+@pytest.fixture
+def published(monkeypatch):
+    """События броней вместо Kafka: брокер в тестах не запущен."""
+    from src.services import booking
+
+    events = []
+
+    class Publisher:
+        async def publish(self, message):
+            events.append(message)
+
+    monkeypatch.setattr(booking, "booking_created_publisher", Publisher())
+    monkeypatch.setattr(booking, "booking_batch_created_publisher", Publisher())
+    return events
+
+
+def booking_app() -> FastAPI:
+    from src.api.routers.bookings import router
+
+    app = FastAPI()
+    app.include_router(router)
+    return app
+
+
+async def post_concurrently(user_id: int, requests: list[tuple[str, dict]]) -> Counter:
+    """Шлёт все POST одновременно через ASGI-приложение; возвращает счётчик статусов."""
+    from src.config import config as authx_config
+    from src.services.auth import AuthService
+
+    transport = httpx.ASGITransport(app=booking_app())
+    cookies = {authx_config.JWT_ACCESS_COOKIE_NAME: AuthService.create_access_token(user_id)}
+    async with httpx.AsyncClient(
+        transport=transport, base_url="http://test", cookies=cookies
+    ) as client:
+        responses = await asyncio.gather(
+            *(client.post(url, json=payload) for url, payload in requests)
+        )
+    return Counter(response.status_code for response in responses)
+
+
+def stay(room_id: int, date_from: date, date_to: date) -> dict:
+    return {"room_id": room_id, "date_from": str(date_from), "date_to": str(date_to)}
+
+
+async def check_inventory(room_ids: list[int]) -> list[int]:
+    """Пиковая занятость номеров и отсутствие расхождений календаря с bookings."""
+    from src.database import async_session_maker
+    from src.utils.db_manager import DbManager
+
+    async with DbManager(async_session_maker) as db:
+        assert await db.inventory.find_mismatches() == []
+        return [
+            await db.inventory.get_max_booked_units(room_id, START, START + timedelta(days=31))
+            for room_id in room_ids
+        ]
+
+
+def test_concurrent_single_bookings_never_overbook(make_room, make_user, published, run):
+    quantity = 3
+
+    async def scenario():
+        room_id = await make_room(quantity=quantity)
+        user_id = await make_user()
+        # Пересекающиеся периоды: на десятый день претендуют все
+        requests = [
+            (
+                "/bookings",
+                stay(room_id, START + timedelta(days=i % 9), START + timedelta(days=10 + i % 5)),
+            )
+            for i in range(CONTENDERS)
+        ]
+        statuses = await post_concurrently(user_id, requests)
+        return statuses, await check_inventory([room_id])
+
+    statuses, peaks = run(scenario())
+    assert statuses == {200: quantity, 409: CONTENDERS - quantity}
+    assert len(published) == quantity
+    assert peaks == [quantity]
+
+
+def test_concurrent_batches_in_opposite_room_order_do_not_deadlock(
+    make_room, make_user, published, run
+):
+    quantity = 2
+
+    async def scenario():
+        first, second = await make_room(quantity=quantity), await make_room(quantity=quantity)
+        user_id = await make_user()
+        requests = []
+        for i in range(CONTENDERS):
+            order = (first, second) if i % 2 else (second, first)
+            bookings = [
+                stay(room_id, START + timedelta(days=4), START + timedelta(days=7))
+                for room_id in order
+            ]
+            requests.append(("/bookings/batch", {"bookings": bookings}))
+        statuses = await post_concurrently(user_id, requests)
+        return statuses, await check_inventory([first, second])
+
+    statuses, peaks = run(scenario())
+    # Локи берутся по возрастанию id, поэтому дедлоков (и 500) нет, а лимит не превышен
+    assert statuses == {200: quantity, 409: CONTENDERS - quantity}
+    assert len(published) == quantity
+    assert peaks == [quantity, quantity]
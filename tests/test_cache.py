@@ -0,0 +1,120 @@
+from src.cache import CacheNamespace, LocalCache, tag_generations
+
+
+class RacingRedis:
+    """Redis, в котором инвалидация приходит, пока ответ ещё в пути."""
+
+    def __init__(self, local: LocalCache, generation: int):
+        self.local = local
+        self.generation = generation
+
+    async def _invalidate_in_flight(self, prefix: str):
+        stale = self.generation
+        self.generation += 1
+        self.local.delete_prefix(prefix)
+        return stale
+
+    async def get(self, key):
+        return await self._invalidate_in_flight(key.removesuffix(":generation"))
+
+    async def mget(self, keys):
+        return [await self._invalidate_in_flight(key) for key in keys]
+
+
+def test_local_set_is_dropped_after_invalidation():
+    local = LocalCache(max_entries=10, ttl_seconds=60)
+    since = local.invalidations
+    local.delete_prefix("other")
+    local.set("key", "value", since=since)
+    assert local.get("key") is None
+    local.set("key", "value", since=local.invalidations)
+    assert local.get("key") == "value"
+
+
+def test_namespace_does_not_keep_generation_read_before_invalidation(run):
+    local = LocalCache(max_entries=10, ttl_seconds=60)
+    namespace = CacheNamespace(RacingRedis(local, generation=1), "hotels:list", local=local)
+    assert run(namespace.key("page")) == "hotels:list:g1:page"
+    # Устаревшее поколение не закрепилось локально: следующий ключ перечитает Redis
+    assert run(namespace.key("page")) == "hotels:list:g2:page"
+
+
+def test_tag_generations_do_not_keep_value_read_before_invalidation(run, monkeypatch):
+    from src import cache
+
+    local = LocalCache(max_entries=10, ttl_seconds=60)
+    monkeypatch.setattr(cache, "local_cache", local)
+    redis = RacingRedis(local, generation=1)
+    assert run(tag_generations(redis, ["rooms"])) == [1]
+    assert run(tag_generations(redis, ["rooms"])) == [2]
+
+
+def test_entity_fill_racing_with_invalidation_is_not_cached(redis, run):
+    from pydantic import BaseModel
+
+    from src.cache import EntityCache
+
+    class Item(BaseModel):
+        id: int
+        title: str
+
+    entities = EntityCache("items", Item)
+    rows = {1: Item(id=1, title="old")}
+
+    async def racing_loader(ids):
+        # Читатель успел загрузить строку до коммита, а инвалидация пришла раньше записи
+        loaded = [rows[i] for i in ids if i in rows]
+        rows[1] = Item(id=1, title="new")
+        await entities.invalidate(1)
+        return loaded
+
+    async def loader(ids):
+        return [rows[i] for i in ids if i in rows]
+
+    assert run(entities.get(1, racing_loader)).title == "old"
+    assert run(entities.get(1, loader)).title == "new"
+
+
+def test_coalesced_waiters_survive_cancelled_initiator(
+    database, make_user, redis, run, monkeypatch
+):
+    """Пересчёт отменяется вместе с начавшим его запросом, ждавшие пересчитывают сами."""
+    import asyncio
+
+    from sqlalchemy import text
+
+    from src.database import async_session_maker_read_only
+    from src.repositories.users import UsersRepository
+    from src.services.users import UserService
+    from src.utils.db_manager import DbManager
+
+    load_user = UsersRepository.get_one_or_none
+    started = asyncio.Event()
+
+    async def slow_load(self, **filter_by):
+        started.set()
+        await self.session.execute(text("SELECT pg_sleep(0.5)"))
+        return await load_user(self, **filter_by)
+
+    monkeypatch.setattr(UsersRepository, "get_one_or_none", slow_load)
+
+    async def request(user_id: int):
+        async with DbManager(async_session_maker_read_only, read_only=True) as db:
+            return await UserService.get_by_id(db, user_id)
+
+    metrics = database.pool.metrics
+
+    async def scenario():
+        user_id = await make_user()
+        initiator = asyncio.create_task(request(user_id))
+        await started.wait()
+        waiter = asyncio.create_task(request(user_id))
+        await asyncio.sleep(0.2)
+        initiator.cancel()
+        user = await waiter
+        # Сессию отменённого запроса не закрыли посреди чужого запроса: соединения вернулись
+        return user_id, user, metrics.checked_out
+
+    user_id, user, checked_out = run(scenario())
+    assert user.id == user_id
+    assert checked_out == 0
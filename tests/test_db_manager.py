@@ -0,0 +1,90 @@
+"""Во что обходится DbManager запросу, который до базы не дошёл (ответ из кэша)."""
+
+import time
+
+import pytest
+from sqlalchemy import text
+
+from src.repositories.bookings import BookingsRepository
+from src.repositories.facilities import FacilitiesRepository
+from src.repositories.hotels import HotelsRepository
+from src.repositories.inventory import RoomInventoryRepository
+from src.repositories.pricing import RoomPriceRulesRepository
+from src.repositories.rooms import RoomsRepository
+from src.repositories.users import UsersRepository
+
+ITERATIONS = 2000
+
+
+class EagerDbManager:
+    """Прежний DbManager: сессия и все репозитории создаются на входе в контекст."""
+
+    def __init__(self, session_factory):
+        self.session_factory = session_factory
+
+    async def __aenter__(self):
+        self.session = self.session_factory()
+        self.booking = BookingsRepository(self.session)
+        self.facilities = FacilitiesRepository(self.session)
+        self.hotels = HotelsRepository(self.session)
+        self.inventory = RoomInventoryRepository(self.session)
+        self.price_rules = RoomPriceRulesRepository(self.session)
+        self.rooms = RoomsRepository(self.session)
+        self.users = UsersRepository(self.session)
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.session.rollback()
+        await self.session.close()
+
+
+async def per_request_seconds(make_manager, use_db: bool) -> float:
+    started = time.perf_counter()
+    for _ in range(ITERATIONS):
+        async with make_manager() as db:
+            if use_db:
+                await db.session.execute(text("SELECT 1"))
+    return (time.perf_counter() - started) / ITERATIONS
+
+
+def test_lazy_manager_skips_session_for_cached_requests(database, sql_log, run):
+    from src.database import async_session_maker
+    from src.utils.db_manager import DbManager
+
+    metrics = database.pool.metrics
+
+    async def scenario():
+        checkouts = metrics.checkouts
+        async with DbManager(async_session_maker) as db:
+            pass
+        untouched = (db._session, db._repositories, metrics.checkouts - checkouts, len(sql_log))
+
+        async with DbManager(async_session_maker) as db:
+            hotels = db.hotels
+            assert db.hotels is hotels
+            built = set(db._repositories)
+        return untouched, built, db._session
+
+    untouched, built, session = run(scenario())
+    assert untouched == (None, {}, 0, 0)
+    # Обращение к одному репозиторию не создаёт остальные
+    assert built == {("hotels", session)}
+
+
+@pytest.mark.benchmark
+def test_lazy_manager_is_cheaper_than_eager(database, run):
+    from src.database import async_session_maker
+    from src.utils.db_manager import DbManager
+
+    async def scenario():
+        eager = await per_request_seconds(lambda: EagerDbManager(async_session_maker), False)
+        lazy = await per_request_seconds(lambda: DbManager(async_session_maker), False)
+        with_db = await per_request_seconds(lambda: DbManager(async_session_maker), True)
+        return eager, lazy, with_db
+
+    eager, lazy, with_db = run(scenario())
+    print(
+        f"\nDbManager per request without DB: eager {eager * 1e6:.1f} us, "
+        f"lazy {lazy * 1e6:.1f} us; with one SELECT: {with_db * 1e6:.1f} us"
+    )
+    assert lazy * 3 < eager
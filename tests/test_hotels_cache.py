@@ -0,0 +1,119 @@
+import json
+import time
+
+import pytest
+
+from src.cache import BinaryTwoTierCache, CachedResponse, LocalCache, TwoTierCache
+from src.schemas.hotels import HotelsReadSchema
+from src.services.hotels import hotels_list_adapter
+
+PAGE = [
+    HotelsReadSchema(id=i, title=f"Отель {i}", location=f"Город {i % 10}, улица {i}")
+    for i in range(1, 101)
+]
+
+
+class MemoryRedis:
+    """Хранилище с интерфейсом get/set Redis: в замер попадает только разбор ответа."""
+
+    def __init__(self):
+        self.data = {}
+
+    async def get(self, key):
+        return self.data.get(key)
+
+    async def set(self, key, value, ex=None):
+        self.data[key] = value
+
+
+async def fail_compute():
+    raise AssertionError("ожидалось попадание")
+
+
+def test_unreadable_binary_entry_is_a_miss(run, monkeypatch):
+    from src import cache
+
+    redis = MemoryRedis()
+    binary = BinaryTwoTierCache(redis)
+
+    # JSON-конверт прежнего формата под тем же ключом
+    redis.data["page"] = json.dumps({"v": [], "exp": time.time() + 60, "delta": 0.0}).encode()
+    assert run(binary._get_envelope("page")) is None
+
+    # Сжато воркером с zstd, а в этом процессе zstd нет
+    monkeypatch.setattr(cache, "zstd_decompress", None)
+    header = BinaryTwoTierCache.HEADER.pack(time.time() + 60, 0.0, BinaryTwoTierCache.FLAG_ZSTD, 2)
+    redis.data["zstd"] = header + b"{}" + b"\x28\xb5\x2f\xfd"
+    assert run(binary._get_envelope("zstd")) is None
+
+
+def test_binary_page_hit_skips_parsing_and_validation(run, monkeypatch):
+    """Попадание отдаёт сохранённые байты: тело не разбирается и не валидируется."""
+    from pydantic import TypeAdapter
+
+    from src import cache
+
+    redis = MemoryRedis()
+    local = LocalCache(max_entries=10, ttl_seconds=60)
+    binary = BinaryTwoTierCache(redis, local=local)
+    body = hotels_list_adapter.dump_json(PAGE)
+    run(binary.set_json("page", CachedResponse(body, {"X-Total": "100"}), ex=60))
+
+    parsed = []
+    loads = cache.json.loads
+
+    def recording_loads(value, *args, **kwargs):
+        parsed.append(value)
+        return loads(value, *args, **kwargs)
+
+    def no_validation(*args, **kwargs):
+        raise AssertionError("валидация при попадании")
+
+    monkeypatch.setattr(cache.json, "loads", recording_loads)
+    for method in ("validate_python", "validate_json", "dump_python", "dump_json"):
+        monkeypatch.setattr(TypeAdapter, method, no_validation)
+
+    local.clear()
+    from_redis = run(binary.get_or_compute("page", fail_compute, ex=60))
+    from_local = run(binary.get_or_compute("page", fail_compute, ex=60))
+    assert from_redis.body == body
+    assert from_local is from_redis
+    # Разбирается только JSON с заголовками ответа
+    assert parsed == [b'{"X-Total": "100"}']
+
+
+@pytest.mark.benchmark
+def test_binary_page_hit_is_cheaper_than_json_round_trip(run):
+    """Попадание в бинарный кэш против прежнего пути: json.loads, валидация и сериализация."""
+    iterations = 300
+    redis = MemoryRedis()
+    local = LocalCache(max_entries=10, ttl_seconds=60)
+    binary = BinaryTwoTierCache(redis, local=local)
+    plain = TwoTierCache(redis, local=local)
+    body = hotels_list_adapter.dump_json(PAGE)
+    run(binary.set_json("bytes", CachedResponse(body, {"X-Total": "100"}), ex=60))
+    run(plain.set_json("json", hotels_list_adapter.dump_python(PAGE, mode="json"), ex=60))
+
+    async def json_path():
+        started = time.perf_counter()
+        for _ in range(iterations):
+            local.clear()
+            value = await plain.get_json("json")
+            result = hotels_list_adapter.dump_json(hotels_list_adapter.validate_python(value))
+        return time.perf_counter() - started, result
+
+    async def bytes_path():
+        started = time.perf_counter()
+        for _ in range(iterations):
+            local.clear()
+            result = (await binary.get_or_compute("bytes", fail_compute, ex=60)).body
+        return time.perf_counter() - started, result
+
+    json_seconds, json_body = run(json_path())
+    bytes_seconds, bytes_body = run(bytes_path())
+    print(
+        f"\nhotels page hit: json {json_seconds / iterations * 1e6:.1f} us, "
+        f"bytes {bytes_seconds / iterations * 1e6:.1f} us"
+    )
+    assert bytes_body == json_body
+    assert bytes_seconds * 3 < json_seconds
@@ -0,0 +1,92 @@
+from datetime import date, timedelta
+from types import SimpleNamespace
+
+import pytest
+from pydantic import ValidationError
+
+from src.config import settings
+from src.schemas.booking import BOOKING_BATCH_MAX_SIZE, BookingCreateSchema
+
+
+def test_booking_schema_limits_stay_length():
+    date_from = date.today() + timedelta(days=1)
+    BookingCreateSchema(
+        room_id=1,
+        date_from=date_from,
+        date_to=date_from + timedelta(days=settings.BOOKING_MAX_NIGHTS),
+    )
+    with pytest.raises(ValidationError):
+        BookingCreateSchema(
+            room_id=1,
+            date_from=date_from,
+            date_to=date_from + timedelta(days=settings.BOOKING_MAX_NIGHTS + 1),
+        )
+
+
+def test_reserve_does_not_grow_bind_parameters_with_stay_length(make_room, run):
+    """12 000 ночей по 3 параметра в VALUES не влезли бы в лимит asyncpg."""
+    from src.database import async_session_maker
+    from src.utils.db_manager import DbManager
+
+    async def scenario():
+        room_id = await make_room()
+        stay = SimpleNamespace(
+            room_id=room_id, date_from=date(2000, 1, 1), date_to=date(2000, 1, 1) + timedelta(12000)
+        )
+        async with DbManager(async_session_maker) as manager:
+            await manager.inventory.reserve([stay, stay])
+            await manager.commit()
+            return await manager.inventory.get_max_booked_units(
+                room_id, stay.date_from, stay.date_to
+            )
+
+    assert run(scenario()) == 2
+
+
+def test_room_delete_after_bookings_are_released(make_room, run):
+    from src.database import async_session_maker
+    from src.utils.db_manager import DbManager
+
+    async def scenario():
+        room_id = await make_room()
+        stay = SimpleNamespace(
+            room_id=room_id, date_from=date(2030, 1, 1), date_to=date(2030, 1, 5)
+        )
+        async with DbManager(async_session_maker) as manager:
+            await manager.inventory.reserve([stay])
+            await manager.inventory.release(room_id, stay.date_from, stay.date_to)
+            await manager.commit()
+        async with DbManager(async_session_maker) as manager:
+            await manager.rooms.delete(id=room_id)
+            await manager.commit()
+            return await manager.inventory.count(room_id=room_id)
+
+    assert run(scenario()) == 0
+
+
+def test_get_booked_units_for_full_batch_of_long_stays(make_room, run):
+    """Максимальная группа из максимальных броней: ключей больше, чем лимит параметров."""
+    from src.database import async_session_maker
+    from src.utils.db_manager import DbManager
+
+    batch_size = BOOKING_BATCH_MAX_SIZE
+    nights = settings.BOOKING_MAX_NIGHTS
+
+    async def scenario():
+        room_id = await make_room()
+        start = date(2000, 1, 1)
+        stays = [
+            SimpleNamespace(
+                room_id=room_id,
+                date_from=start + timedelta(days=nights * i),
+                date_to=start + timedelta(days=nights * (i + 1)),
+            )
+            for i in range(batch_size)
+        ]
+        async with DbManager(async_session_maker) as manager:
+            await manager.inventory.reserve(stays)
+            return await manager.inventory.get_booked_units(stays)
+
+    booked = run(scenario())
+    assert len(booked) == batch_size * settings.BOOKING_MAX_NIGHTS
+    assert set(booked.values()) == {1}
@@ -0,0 +1,121 @@
+"""p99 обычного эндпоинта во время потока логинов: argon2 в event loop и в пуле."""
+
+import asyncio
+import threading
+import time
+from types import SimpleNamespace
+
+import httpx
+import pytest
+from fastapi import FastAPI
+from pwdlib import PasswordHash
+from pwdlib.hashers.argon2 import Argon2Hasher
+
+from src.utils.password_hasher import PasswordHasher
+from src.utils.stats import percentiles
+
+# Облегчённые параметры argon2 (~50 мс), чтобы замер шёл секунды, а не минуты
+FAST_ARGON2 = PasswordHash((Argon2Hasher(time_cost=2, memory_cost=16384),))
+LOGIN_CLIENTS = 8
+PING_INTERVAL_SECONDS = 0.01
+DURATION_SECONDS = 2.0
+
+
+def make_app(hasher: PasswordHasher, hashed: str, offload: bool) -> FastAPI:
+    app = FastAPI()
+
+    @app.post("/login")
+    async def login():
+        if offload:
+            return await hasher.verify("secret", hashed)
+        # Прежнее поведение: argon2 прямо в обработчике
+        return hasher.password_hash.verify("secret", hashed)
+
+    @app.get("/ping")
+    async def ping():
+        return "pong"
+
+    return app
+
+
+async def ping_p99_during_flood(app: FastAPI) -> float:
+    """p99 /ping, пока LOGIN_CLIENTS клиентов без пауз шлют логины."""
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        done = asyncio.Event()
+
+        async def flood():
+            while not done.is_set():
+                await client.post("/login")
+                # Через ASGITransport запрос может ни разу не уступить циклу
+                await asyncio.sleep(0)
+
+        async def pings() -> list[float]:
+            # Задержка считается от запланированного прихода запроса, а не от момента,
+            # когда цикл событий освободился и смог его отправить
+            latencies = []
+            started = time.perf_counter()
+            arrival = started
+            while time.perf_counter() < started + DURATION_SECONDS:
+                await asyncio.sleep(max(arrival - time.perf_counter(), 0))
+                await client.get("/ping")
+                latencies.append(time.perf_counter() - arrival)
+                arrival += PING_INTERVAL_SECONDS
+            return latencies
+
+        clients = [asyncio.ensure_future(flood()) for _ in range(LOGIN_CLIENTS)]
+        try:
+            latencies = await pings()
+        finally:
+            done.set()
+            await asyncio.gather(*clients)
+    return percentiles(latencies)["p99"]
+
+
+def test_verify_runs_while_event_loop_keeps_ticking(run):
+    """Проверка пароля не блокирует цикл событий: пока она идёт, цикл успевает тикать.
+
+    Хешер ждёт, пока тикнет цикл событий. Если бы verify шёл в самом цикле,
+    тиков не было бы и ожидание закончилось бы по таймауту.
+    """
+    ticks = threading.Event()
+    verify_threads = []
+
+    def verify(password, hashed):
+        verify_threads.append(threading.get_ident())
+        return ticks.wait(timeout=2)
+
+    hasher = PasswordHasher(max_concurrency=2, password_hash=SimpleNamespace(verify=verify))
+
+    async def heartbeat():
+        for _ in range(3):
+            await asyncio.sleep(0.01)
+        ticks.set()
+
+    async def scenario():
+        beat = asyncio.ensure_future(heartbeat())
+        verified = await hasher.verify("secret", "hash")
+        await beat
+        return verified
+
+    try:
+        assert run(scenario())
+    finally:
+        hasher.shutdown()
+    assert verify_threads and threading.get_ident() not in verify_threads
+
+
+@pytest.mark.benchmark
+def test_login_flood_does_not_stall_other_endpoints(run):
+    hasher = PasswordHasher(max_concurrency=2, password_hash=FAST_ARGON2)
+    try:
+        hashed = FAST_ARGON2.hash("secret")
+        inline = run(ping_p99_during_flood(make_app(hasher, hashed, offload=False)))
+        offloaded = run(ping_p99_during_flood(make_app(hasher, hashed, offload=True)))
+    finally:
+        hasher.shutdown()
+    print(
+        f"\n/ping p99 under {LOGIN_CLIENTS} login clients: "
+        f"inline {inline * 1e3:.1f} ms, pool {offloaded * 1e3:.1f} ms"
+    )
+    assert offloaded * 2 < inline
@@ -0,0 +1,92 @@
+"""Метрики пула под нагрузкой и параметры движка за PgBouncer."""
+
+import asyncio
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+
+from src.config import settings
+
+
+@pytest.fixture
+def make_engine(database, run):
+    """Движок из create_engine на тестовую базу; метрики убираются из общего списка."""
+    from src.database import create_engine
+    from src.utils.pool_metrics import pool_metrics
+
+    url = database.url.render_as_string(hide_password=False)
+    engines = []
+
+    def make(name: str):
+        engine = create_engine(url, name)
+        engines.append(engine)
+        return engine
+
+    yield make
+    for engine in engines:
+        pool_metrics.remove(engine.pool.metrics)
+        run(engine.dispose())
+
+
+def test_saturated_pool_counts_waits_overflow_and_timeouts(make_engine, run, monkeypatch):
+    monkeypatch.setattr(settings, "DB_POOL_SIZE", 1)
+    monkeypatch.setattr(settings, "DB_MAX_OVERFLOW", 1)
+    monkeypatch.setattr(settings, "DB_POOL_TIMEOUT", 0.3)
+    engine = make_engine("saturation-test")
+    metrics = engine.pool.metrics
+
+    async def scenario():
+        first = await engine.connect()
+        second = await engine.connect()
+        saturated = metrics.stats()
+
+        # Третий ждёт, пока не вернут одно из двух соединений
+        waiter = asyncio.create_task(engine.connect().start())
+        await asyncio.sleep(0.1)
+        waiting = metrics.waiting
+        await first.close()
+        third = await waiter
+        waited = metrics.checkout_wait_seconds[-1]
+
+        # Свободных нет, и никто не вернёт соединение за pool_timeout
+        with pytest.raises(PoolTimeoutError):
+            await engine.connect()
+        timed_out = metrics.stats()
+
+        await second.close()
+        await third.close()
+        return saturated, waiting, waited, timed_out, metrics.stats()
+
+    saturated, waiting, waited, timed_out, released = run(scenario())
+    assert (saturated["size"], saturated["overflow"], saturated["checked_out"]) == (1, 1, 2)
+    assert saturated["waiting"] == 0
+    assert waiting == 1
+    assert waited >= 0.1
+    assert timed_out["timeouts"] == 1
+    assert timed_out["checkout_wait_seconds"]["max"] >= settings.DB_POOL_TIMEOUT
+    assert (released["checked_out"], released["waiting"]) == (0, 0)
+    assert released["connects"] == 2
+
+
+def test_pgbouncer_mode_disables_statement_caches(make_engine, run, monkeypatch):
+    monkeypatch.setattr(settings, "DB_PGBOUNCER", True)
+    engine = make_engine("pgbouncer-test")
+
+    async def scenario():
+        async with engine.connect() as conn:
+            assert await conn.scalar(text("SELECT 1")) == 1
+            adapted = (await conn.get_raw_connection()).dbapi_connection
+            name_func = adapted._prepared_statement_name_func
+            return (
+                adapted._prepared_statement_cache,
+                adapted.driver_connection._stmt_cache.get_max_size(),
+                [name_func() for _ in range(100)],
+            )
+
+    adapter_cache, driver_cache_size, names = run(scenario())
+    # Кэш SQLAlchemy и кэш asyncpg: через пул транзакций statement переживут соединение
+    assert adapter_cache is None
+    assert driver_cache_size == 0
+    assert len(set(names)) == len(names)
+    assert all(name.startswith("__asyncpg_") for name in names)
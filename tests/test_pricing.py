@@ -0,0 +1,149 @@
+from datetime import date, timedelta
+from types import SimpleNamespace
+
+import pytest
+
+from src.config import settings
+from src.enums import PriceRuleKind
+from src.schemas.booking import BookingCreateSchema
+from src.schemas.pricing import check_quote_dates
+from src.utils.pricing import PricingEngine
+
+TODAY = date.today()
+
+
+class FakeRules:
+    """db.price_rules с подменяемыми правилами и хуком на время чтения."""
+
+    def __init__(self, rules=()):
+        self.rules = list(rules)
+        self.on_read = None
+        self.reads = 0
+
+    async def get_for_rooms(self, room_ids):
+        self.reads += 1
+        rules = [rule for rule in self.rules if rule.room_id in room_ids]
+        if self.on_read is not None:
+            await self.on_read()
+        return rules
+
+
+def season(room_id: int, multiplier: float):
+    return SimpleNamespace(
+        room_id=room_id,
+        kind=PriceRuleKind.season,
+        multiplier=multiplier,
+        date_from=TODAY,
+        date_to=TODAY + timedelta(days=settings.PRICING_HORIZON_DAYS),
+    )
+
+
+OUTSIDE_HORIZON = [
+    (TODAY - timedelta(days=1), TODAY + timedelta(days=2)),
+    (
+        TODAY + timedelta(days=settings.PRICING_HORIZON_DAYS - 1),
+        TODAY + timedelta(days=settings.PRICING_HORIZON_DAYS + 1),
+    ),
+]
+
+
+@pytest.mark.parametrize("date_from, date_to", OUTSIDE_HORIZON)
+def test_quote_rejects_dates_outside_horizon(date_from, date_to):
+    with pytest.raises(ValueError):
+        check_quote_dates(date_from, date_to)
+
+
+@pytest.mark.parametrize("date_from, date_to", OUTSIDE_HORIZON)
+def test_booking_schema_does_not_depend_on_pricing_horizon(date_from, date_to):
+    booking = BookingCreateSchema(room_id=1, date_from=date_from, date_to=date_to)
+    assert booking.date_to == date_to
+
+
+def test_rate_tables_are_evicted_least_recently_used_first(run):
+    engine = PricingEngine(horizon_days=30, ttl_seconds=60, max_rooms=2)
+    db = SimpleNamespace(price_rules=FakeRules())
+    rooms = [SimpleNamespace(id=room_id, price=100.0) for room_id in (1, 2, 3)]
+
+    def quote(*room_ids):
+        run(
+            engine.price_stays(
+                db, [(rooms[i - 1], TODAY, TODAY + timedelta(days=1)) for i in room_ids]
+            )
+        )
+
+    quote(1, 2)
+    quote(1)
+    quote(3)
+    assert list(engine._tables) == [1, 3]
+
+
+def test_expired_rate_tables_are_dropped_on_insert(run, monkeypatch):
+    from src.utils import pricing
+
+    engine = PricingEngine(horizon_days=30, ttl_seconds=60, max_rooms=100)
+    db = SimpleNamespace(price_rules=FakeRules())
+    now = 1000.0
+    monkeypatch.setattr(pricing.time, "monotonic", lambda: now)
+
+    for room_id in range(1, 51):
+        room = SimpleNamespace(id=room_id, price=100.0)
+        run(engine.price_stays(db, [(room, TODAY, TODAY + timedelta(days=1))]))
+    now += 61
+    room = SimpleNamespace(id=51, price=100.0)
+    run(engine.price_stays(db, [(room, TODAY, TODAY + timedelta(days=1))]))
+    assert list(engine._tables) == [51]
+
+
+def test_stay_outside_window_is_priced_but_not_cached(run):
+    engine = PricingEngine(horizon_days=30, ttl_seconds=60, max_rooms=100)
+    db = SimpleNamespace(price_rules=FakeRules())
+    room = SimpleNamespace(id=1, price=100.0)
+    far = TODAY + timedelta(days=10_000)
+
+    [price] = run(engine.price_stays(db, [(room, far, far + timedelta(days=3))]))
+    assert price == 300.0
+    assert engine._tables == {}
+
+    run(engine.price_stays(db, [(room, TODAY, TODAY + timedelta(days=3))]))
+    [(_, _, table)] = engine._tables.values()
+    assert (table.start, table.days) == (TODAY, 30)
+
+
+def test_invalidate_during_compile_does_not_keep_stale_table(redis, run):
+    """Инвалидация между чтением правил и сохранением таблицы не теряется."""
+    engine = PricingEngine(horizon_days=30, ttl_seconds=60, max_rooms=100)
+    rules = FakeRules([season(1, 2.0)])
+    db = SimpleNamespace(price_rules=rules)
+    room = SimpleNamespace(id=1, price=100.0)
+    stay = (room, TODAY, TODAY + timedelta(days=1))
+
+    async def change_rules():
+        rules.on_read = None
+        rules.rules = [season(1, 3.0)]
+        await engine.invalidate(1)
+
+    rules.on_read = change_rules
+    assert run(engine.price_stays(db, [stay])) == [200.0]
+    # Таблица со старой версией не используется: правила перечитываются
+    assert run(engine.price_stays(db, [stay])) == [300.0]
+    assert run(engine.price_stays(db, [stay])) == [300.0]
+    assert rules.reads == 2
+
+
+def test_room_delete_removes_price_rules(make_room, run):
+    from src.database import async_session_maker
+    from src.utils.db_manager import DbManager
+
+    async def scenario():
+        room_id = await make_room()
+        async with DbManager(async_session_maker) as manager:
+            await manager.price_rules.add(
+                {"room_id": room_id, "kind": PriceRuleKind.weekday, "multiplier": 1.5, "weekday": 5}
+            )
+            await manager.commit()
+        async with DbManager(async_session_maker) as manager:
+            await manager.rooms.delete(id=room_id)
+            await manager.commit()
+            return await manager.price_rules.get_for_rooms([room_id])
+
+    assert run(scenario()) == []
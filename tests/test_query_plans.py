@@ -0,0 +1,153 @@
+"""Регрессия планов: горячие запросы репозиториев должны идти по своим индексам.
+
+Запросы не пишутся вручную: выполняются настоящие методы репозиториев,
+их SQL перехватывается и прогоняется через EXPLAIN на данных такого объёма,
+при котором последовательное чтение уже заметно дороже индекса.
+"""
+
+from datetime import date
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import text
+
+SEED = """
+INSERT INTO hotels (title, location)
+SELECT 'Отель ' || i, 'Город ' || (i % 10) FROM generate_series(1, 100) AS i;
+
+INSERT INTO rooms (title, description, price, quantity, hotel_id)
+SELECT 'Номер ' || i, NULL, 100 + i % 50, 1 + i % 3, 1 + i % 100
+FROM generate_series(1, 50000) AS i;
+
+INSERT INTO facilities (title) SELECT 'Удобство ' || i FROM generate_series(1, 5000) AS i;
+
+INSERT INTO room_facilities (room_id, facilities_id)
+SELECT 1 + i % 50000, 1 + i % 5000 FROM generate_series(1, 200000) AS i;
+
+INSERT INTO users (email, hashed_password, role, is_active, created_at)
+SELECT 'user' || i || '@example.com', '-', 'User', true, '2026-01-01'
+FROM generate_series(1, 2000) AS i;
+
+-- Номера с id > 4000 остаются без броней
+INSERT INTO bookings (user_id, room_id, date_from, date_to, price)
+SELECT 1 + i % 2000, 1 + i % 4000,
+       DATE '2030-01-01' + i % 700, DATE '2030-01-01' + i % 700 + 1 + i % 5, 100
+FROM generate_series(1, 100000) AS i;
+
+INSERT INTO room_inventory (room_id, day, booked_units)
+SELECT room_id, day::date, count(*)
+FROM bookings, generate_series(date_from, date_to - 1, interval '1 day') AS day
+GROUP BY room_id, day::date;
+
+ANALYZE;
+"""
+
+
+@pytest.fixture(scope="module")
+def seeded(database, run):
+    async def seed():
+        async with database.begin() as conn:
+            await conn.execute(
+                text(
+                    "TRUNCATE bookings, room_inventory, room_price_rules, room_facilities, "
+                    "facilities, rooms, hotels, users RESTART IDENTITY CASCADE"
+                )
+            )
+            for statement in SEED.split(";"):
+                if statement.strip():
+                    await conn.execute(text(statement))
+
+    run(seed())
+    return database
+
+
+# Таблицы горячих запросов: последовательное чтение любой из них — регрессия плана
+HOT_TABLES = {"bookings", "room_inventory", "rooms", "room_facilities"}
+
+
+def plan_nodes(plan: dict):
+    yield plan
+    for child in plan.get("Plans", []):
+        yield from plan_nodes(child)
+
+
+def used_indexes(run, engine, statements) -> set[str]:
+    """Индексы из планов всех statements; падает на Seq Scan по горячей таблице."""
+    # Сами EXPLAIN тоже попадут в sql_log, поэтому берём снимок
+    statements = list(statements)
+
+    async def explain():
+        nodes = []
+        async with engine.connect() as conn:
+            for statement, parameters in statements:
+                result = await conn.exec_driver_sql(
+                    f"EXPLAIN (FORMAT JSON) {statement}", parameters
+                )
+                # Диалект asyncpg сам декодирует json-колонку
+                [plan] = result.scalar_one()
+                nodes += [(statement, node) for node in plan_nodes(plan["Plan"])]
+        return nodes
+
+    nodes = run(explain())
+    seq_scans = [
+        (node["Relation Name"], statement)
+        for statement, node in nodes
+        if node["Node Type"] == "Seq Scan" and node["Relation Name"] in HOT_TABLES
+    ]
+    assert not seq_scans, f"Seq Scan по горячим таблицам: {seq_scans}"
+    return {node["Index Name"] for _, node in nodes if "Index Name" in node}
+
+
+def run_repository(run, call):
+    """Выполняет call(db) в транзакции, которая потом откатывается."""
+    from src.database import async_session_maker
+    from src.utils.db_manager import DbManager
+
+    async def scenario():
+        async with DbManager(async_session_maker) as db:
+            return await call(db)
+
+    return run(scenario())
+
+
+@pytest.mark.parametrize("after", [None, (date(2030, 6, 1), 50000)])
+def test_user_bookings_use_user_date_index(seeded, sql_log, run, after):
+    run_repository(run, lambda db: db.booking.get_user_bookings(user_id=7, limit=10, after=after))
+    assert "ix_bookings_user_id_date_from" in used_indexes(run, seeded, sql_log)
+
+
+def test_available_rooms_of_hotel_use_hotel_index(seeded, sql_log, run):
+    run_repository(
+        run,
+        lambda db: db.rooms.get_available(
+            date_from=date(2030, 3, 1), date_to=date(2030, 3, 4), hotel_id=17
+        ),
+    )
+    assert "ix_rooms_hotel_id" in used_indexes(run, seeded, sql_log)
+
+
+def test_room_calendar_uses_primary_key(seeded, sql_log, run):
+    run_repository(
+        run,
+        lambda db: db.inventory.get_max_booked_units(42, date(2030, 3, 1), date(2030, 3, 4)),
+    )
+    assert "room_inventory_pkey" in used_indexes(run, seeded, sql_log)
+
+
+def test_batch_calendar_lookup_uses_primary_key(seeded, sql_log, run):
+    stays = [
+        SimpleNamespace(room_id=room_id, date_from=date(2030, 3, 1), date_to=date(2030, 3, 4))
+        for room_id in (42, 43, 44)
+    ]
+    run_repository(run, lambda db: db.inventory.get_booked_units(stays))
+    assert "room_inventory_pkey" in used_indexes(run, seeded, sql_log)
+
+
+def test_facility_rooms_use_facility_index(seeded, sql_log, run):
+    run_repository(run, lambda db: db.facilities.get_one_or_none(id=3))
+    assert "ix_room_facilities_facilities_id" in used_indexes(run, seeded, sql_log)
+
+
+def test_room_delete_uses_room_facilities_index(seeded, sql_log, run):
+    run_repository(run, lambda db: db.rooms.delete(id=4500))
+    assert "ix_room_facilities_room_id" in used_indexes(run, seeded, sql_log)
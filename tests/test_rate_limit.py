@@ -0,0 +1,87 @@
+import httpx
+from fastapi import FastAPI, HTTPException
+
+from src.config import settings
+
+WRONG = "wrong-password"
+
+
+def login_app() -> FastAPI:
+    from src.api.routers.users import router
+
+    app = FastAPI()
+    app.include_router(router)
+    return app
+
+
+async def login(app: FastAPI, ip: str, email: str, password: str = WRONG) -> int:
+    transport = httpx.ASGITransport(app=app, client=(ip, 40000))
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        response = await client.post("/users/login", json={"email": email, "password": password})
+        return response.status_code
+
+
+def test_login_flood_from_many_ips_does_not_lock_out_others(run, monkeypatch):
+    """Пропускать ли вход, решают только корзины IP и аккаунта, а не общая корзина маршрута."""
+    from starlette.requests import Request
+
+    from src import cache
+    from src.api.routers.users import login_limits
+
+    # Корзины в памяти процесса: тот же алгоритм, но поток успевает за доли секунды
+    monkeypatch.setattr(cache, "redis_client", None)
+
+    def request_from(ip: str) -> Request:
+        return Request({"type": "http", "method": "POST", "headers": [], "client": (ip, 40000)})
+
+    async def passes(ip: str) -> bool:
+        try:
+            for limit in login_limits:
+                await limit.dependency(request_from(ip))
+        except HTTPException:
+            return False
+        return True
+
+    async def scenario():
+        flood = [await passes(f"10.0.{i // 250}.{i % 250}") for i in range(1000)]
+        return flood, await passes("192.0.2.1")
+
+    flood, bystander = run(scenario())
+    assert all(flood)
+    assert bystander
+
+
+def test_login_flood_on_account_does_not_lock_out_owner(make_user, redis, run, monkeypatch):
+    """Корзина аккаунта общая только для одного IP: чужой подбор не закрывает вход владельцу."""
+    from sqlalchemy import update
+
+    from src.api.routers import users
+    from src.database import async_session_maker
+    from src.models.users import UsersOrm
+    from src.services.auth import AuthService
+    from src.utils.rate_limit import RateLimit
+
+    # Меньше корзины IP, чтобы упираться именно в корзину аккаунта
+    capacity = settings.RATE_LIMIT_LOGIN_CAPACITY - 2
+    monkeypatch.setattr(users, "login_account_limit", RateLimit(capacity, capacity / 600))
+    app = login_app()
+
+    async def scenario():
+        user_id = await make_user(email="victim@example.com")
+        async with async_session_maker() as session:
+            await session.execute(
+                update(UsersOrm)
+                .where(UsersOrm.id == user_id)
+                .values(hashed_password=await AuthService().get_password_hash("right-password"))
+            )
+            await session.commit()
+        flood = [
+            await login(app, "10.1.0.1", "Victim@example.com" if i % 2 else "victim@example.com")
+            for i in range(capacity + 1)
+        ]
+        owner = await login(app, "192.0.2.1", "victim@example.com", password="right-password")
+        return flood, owner
+
+    flood, owner = run(scenario())
+    assert flood == [401] * capacity + [429]
+    assert owner == 200
@@ -0,0 +1,172 @@
+"""Две базы: primary и её потоковая реплика из TEST_REPLICA_DB_URL.
+
+Без TEST_REPLICA_DB_URL тесты, которым нужна реплика, пропускаются. Реплику
+тестового Postgres можно поднять через pg_basebackup -R; пользователю реплики
+нужны ALTER SYSTEM и pg_wal_replay_pause(), то есть права суперпользователя.
+"""
+
+import asyncio
+import os
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import NullPool
+
+from src.exceptions import ObjectNotFoundException
+from src.utils.replicas import Replica, ReplicaSet
+
+REPLICA_URL = os.environ.get("TEST_REPLICA_DB_URL")
+
+
+async def wait_until(check, seconds: float = 30.0) -> None:
+    deadline = asyncio.get_running_loop().time() + seconds
+    while not await check():
+        assert asyncio.get_running_loop().time() < deadline, "реплика не дошла до ожидаемого"
+        await asyncio.sleep(0.2)
+
+
+@pytest.fixture
+def replica(database, run):
+    if not REPLICA_URL:
+        pytest.skip("TEST_REPLICA_DB_URL не задан")
+    from sqlalchemy.ext.asyncio import async_sessionmaker
+
+    from src.database import create_engine
+
+    engine = create_engine(REPLICA_URL, "replica-test").execution_options(postgresql_readonly=True)
+    yield Replica(engine, async_sessionmaker(bind=engine, expire_on_commit=False))
+    run(engine.dispose())
+
+
+@pytest.fixture
+def replica_admin(replica, run):
+    """Выполняет SQL на реплике вне транзакции (ALTER SYSTEM, пауза воспроизведения)."""
+    engine = create_async_engine(REPLICA_URL, isolation_level="AUTOCOMMIT", poolclass=NullPool)
+
+    async def execute(sql: str):
+        async with engine.connect() as conn:
+            result = await conn.execute(text(sql))
+            return result.scalar() if result.returns_rows else None
+
+    yield execute
+    run(engine.dispose())
+
+
+async def wait_for_replay(database, replica_admin) -> None:
+    """Ждёт, пока реплика применит всё, что уже записано на primary."""
+    async with database.connect() as conn:
+        lsn = await conn.scalar(text("SELECT pg_current_wal_lsn()::text"))
+
+    async def replayed():
+        return await replica_admin(f"SELECT pg_last_wal_replay_lsn() >= '{lsn}'::pg_lsn")
+
+    await wait_until(replayed)
+
+
+def test_primary_is_not_a_healthy_replica(database, run):
+    replicas = ReplicaSet([Replica(database, None)], max_lag_seconds=5)
+    run(replicas.check())
+    [stats] = replicas.stats()
+    assert stats["healthy"] is False
+    assert stats["lag_seconds"] is None
+
+
+def test_cache_fill_without_healthy_replica_reuses_request_session(database, redis, run):
+    from src import cache
+    from src.database import async_session_maker_read_only
+    from src.services.hotels import HotelsService
+    from src.utils.db_manager import DbManager
+
+    metrics = database.pool.metrics
+    replicas = ReplicaSet([], max_lag_seconds=5)
+
+    async def scenario():
+        checkouts = metrics.checkouts
+        async with DbManager(
+            async_session_maker_read_only, read_only=True, replicas=replicas
+        ) as manager:
+            await manager.hotels.get_all()
+            service = HotelsService(manager, cache.redis_client, cache.redis_binary_client)
+            with pytest.raises(ObjectNotFoundException):
+                await service.get_by_id(1)
+        return metrics.checkouts - checkouts
+
+    assert run(scenario()) == 1
+
+
+def test_streaming_replica_is_healthy(replica, run):
+    replicas = ReplicaSet([replica], max_lag_seconds=5)
+    run(replicas.check())
+    assert replica.streaming
+    assert replica.healthy
+
+
+def test_replica_without_wal_receiver_is_unhealthy(replica, replica_admin, run):
+    replicas = ReplicaSet([replica], max_lag_seconds=5)
+
+    async def scenario():
+        conninfo = await replica_admin("SHOW primary_conninfo")
+        await replica_admin("ALTER SYSTEM SET primary_conninfo = ''")
+        await replica_admin("SELECT pg_reload_conf()")
+        try:
+
+            async def disconnected():
+                return not await replica_admin("SELECT count(*) FROM pg_stat_wal_receiver")
+
+            await wait_until(disconnected)
+            await replicas.check()
+            return replica.healthy, replica.streaming, replica.lag_seconds
+        finally:
+            quoted = conninfo.replace("'", "''")
+            await replica_admin(f"ALTER SYSTEM SET primary_conninfo = '{quoted}'")
+            await replica_admin("SELECT pg_reload_conf()")
+
+            async def streaming():
+                await replicas.check()
+                return replica.streaming
+
+            await wait_until(streaming)
+
+    healthy, streaming, lag = run(scenario())
+    # receive_lsn == replay_lsn, и одно отставание сказало бы «0 секунд, всё хорошо»
+    assert lag == 0
+    assert (healthy, streaming) == (False, False)
+
+
+def test_cache_fills_read_primary_while_replica_lags(
+    db, redis, replica, replica_admin, make_user, run
+):
+    from src import cache
+    from src.database import async_session_maker, async_session_maker_read_only
+    from src.services.hotels import HotelsService
+    from src.services.users import UserService
+    from src.utils.db_manager import DbManager
+
+    replicas = ReplicaSet([replica], max_lag_seconds=5)
+
+    async def scenario():
+        await wait_for_replay(db, replica_admin)
+        await replica_admin("SELECT pg_wal_replay_pause()")
+        try:
+            async with DbManager(async_session_maker) as manager:
+                hotel = await manager.hotels.add({"title": "Новый", "location": "Город"})
+                await manager.commit()
+            user_id = await make_user()
+            # Реплика исправна, но ещё не видит новых строк
+            replica.healthy = True
+            async with DbManager(
+                async_session_maker_read_only, read_only=True, replicas=replicas
+            ) as manager:
+                direct = await manager.hotels.get_one_or_none(id=hotel.id)
+                service = HotelsService(manager, cache.redis_client, cache.redis_binary_client)
+                cached_hotel = await service.get_by_id(hotel.id)
+                cached_user = await UserService.get_by_id(manager, user_id)
+            return direct, cached_hotel.id == hotel.id, cached_user.id == user_id
+        finally:
+            await replica_admin("SELECT pg_wal_replay_resume()")
+
+    direct, hotel_found, user_found = run(scenario())
+    assert direct is None
+    assert hotel_found
+    assert user_found
@@ -0,0 +1,155 @@
+"""Изменение и удаление номера одним UPDATE/DELETE ... RETURNING."""
+
+import time
+from datetime import date
+
+import pytest
+from sqlalchemy import func, insert, select
+
+from src.exceptions import ObjectNotFoundException
+from src.models.facilities import FacilitiesOrm, RoomsFacilitiesOrm
+from src.models.inventory import RoomInventoryOrm
+from src.models.pricing import RoomPriceRuleOrm
+from src.repositories.rooms import RoomsRepository
+from src.schemas.rooms import ChangeRoomSchema
+
+ROOMS = 200
+
+
+class OrmRoomsRepository(RoomsRepository):
+    """Прежние edit и delete: строка загружается в сессию, запись уходит при flush."""
+
+    async def _load(self, **filter_by):
+        result = await self.session.execute(select(self.model).filter_by(**filter_by))
+        model = result.scalar_one_or_none()
+        if model is None:
+            raise ObjectNotFoundException
+        return model
+
+    async def edit(self, new_model, **filter_by):
+        model = await self._load(**filter_by)
+        for key, value in new_model.model_dump().items():
+            setattr(model, key, value)
+        return model
+
+    async def delete(self, **filter_by):
+        await self.session.delete(await self._load(**filter_by))
+
+
+def change(room_id: int, hotel_id: int) -> ChangeRoomSchema:
+    return ChangeRoomSchema(
+        title=f"Номер {room_id}", description=None, price=150, quantity=2, hotel_id=hotel_id
+    )
+
+
+async def hotel_of(room_id: int) -> int:
+    from src.database import async_session_maker
+    from src.models.rooms import RoomsOrm
+
+    async with async_session_maker() as session:
+        return await session.scalar(select(RoomsOrm.hotel_id).where(RoomsOrm.id == room_id))
+
+
+async def make_furnished_rooms(make_room, count: int) -> list[int]:
+    """Номера с удобством, днём календаря и правилом цены."""
+    from src.database import async_session_maker
+
+    room_ids = [await make_room() for _ in range(count)]
+    async with async_session_maker() as session:
+        facility_id = await session.scalar(
+            insert(FacilitiesOrm).values(title="Wi-Fi").returning(FacilitiesOrm.id)
+        )
+        await session.execute(
+            insert(RoomsFacilitiesOrm),
+            [{"room_id": room_id, "facilities_id": facility_id} for room_id in room_ids],
+        )
+        await session.execute(
+            insert(RoomInventoryOrm),
+            [{"room_id": room_id, "day": date(2030, 1, 1)} for room_id in room_ids],
+        )
+        await session.execute(
+            insert(RoomPriceRuleOrm),
+            [{"room_id": room_id, "kind": "weekday", "multiplier": 1.2} for room_id in room_ids],
+        )
+        await session.commit()
+    return room_ids
+
+
+async def per_request(repository_cls, action, room_ids, sql_log) -> tuple[int, float]:
+    """Число SQL-запросов на один запрос к API и среднее время."""
+    from src.database import async_session_maker
+
+    statements = len(sql_log)
+    started = time.perf_counter()
+    for room_id in room_ids:
+        async with async_session_maker() as session:
+            await action(repository_cls(session), room_id)
+            await session.commit()
+    elapsed = (time.perf_counter() - started) / len(room_ids)
+    assert (len(sql_log) - statements) % len(room_ids) == 0
+    return (len(sql_log) - statements) // len(room_ids), elapsed
+
+
+def test_edit_with_unknown_hotel_is_not_found(make_room, run):
+    from src.database import async_session_maker
+
+    async def scenario():
+        room_id = await make_room()
+        async with async_session_maker() as session:
+            with pytest.raises(ObjectNotFoundException):
+                await RoomsRepository(session).edit(change(room_id, 10**6), id=room_id)
+
+    run(scenario())
+
+
+def test_delete_removes_room_calendar_rules_and_links(make_room, run):
+    from src.database import async_session_maker
+
+    async def scenario():
+        [room_id] = await make_furnished_rooms(make_room, 1)
+        async with async_session_maker() as session:
+            await RoomsRepository(session).delete(id=room_id)
+            await session.commit()
+            return [
+                await session.scalar(select(func.count()).where(orm.room_id == room_id))
+                for orm in (RoomsFacilitiesOrm, RoomInventoryOrm, RoomPriceRuleOrm)
+            ]
+
+    assert run(scenario()) == [0, 0, 0]
+
+
+def test_statements_per_edit_and_delete(make_room, sql_log, run):
+    async def edit(repository, room_id):
+        await repository.edit(change(room_id, hotel_ids[room_id]), id=room_id)
+
+    async def delete(repository, room_id):
+        await repository.delete(id=room_id)
+
+    hotel_ids = {}
+
+    async def scenario():
+        old_rooms = await make_furnished_rooms(make_room, ROOMS)
+        new_rooms = await make_furnished_rooms(make_room, ROOMS)
+        for room_id in old_rooms + new_rooms:
+            hotel_ids[room_id] = await hotel_of(room_id)
+        return {
+            "edit": (
+                await per_request(OrmRoomsRepository, edit, old_rooms, sql_log),
+                await per_request(RoomsRepository, edit, new_rooms, sql_log),
+            ),
+            "delete": (
+                await per_request(OrmRoomsRepository, delete, old_rooms, sql_log),
+                await per_request(RoomsRepository, delete, new_rooms, sql_log),
+            ),
+        }
+
+    results = run(scenario())
+    for name, ((old_count, old_time), (new_count, new_time)) in results.items():
+        print(
+            f"\n{name}: ORM {old_count} statements, {old_time * 1e3:.2f} ms; "
+            f"RETURNING {new_count} statements, {new_time * 1e3:.2f} ms"
+        )
+    # UPDATE ... RETURNING вместо SELECT + UPDATE при flush
+    assert [counts for counts, _ in results["edit"]] == [2, 1]
+    # Связи с удобствами и сам номер; календарь и правила цены уходят каскадом
+    assert [counts for counts, _ in results["delete"]] == [4, 2]
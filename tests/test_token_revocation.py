@@ -0,0 +1,40 @@
+from types import SimpleNamespace
+
+from src.utils import token_revocation as module
+from src.utils.token_revocation import TokenRevocation
+
+
+def test_user_epoch_is_compared_in_whole_seconds(redis, run, monkeypatch):
+    revocation = TokenRevocation()
+    monkeypatch.setattr(module.time, "time", lambda: 1_000_000.7)
+    run(revocation.revoke_user(7))
+
+    def revoked(iat):
+        return run(revocation.is_revoked(SimpleNamespace(jti="j", sub="7", iat=iat)))
+
+    assert revoked(999_999)
+    # Вход сразу после отзыва: iat в JWT — целые секунды, та же секунда, что и отзыв
+    assert not revoked(1_000_000)
+    assert not revoked(1_000_001)
+
+
+def test_sync_reads_only_new_revocations_between_rebuilds(redis, run):
+    writer, reader = TokenRevocation(), TokenRevocation()
+    run(writer.revoke_user(1))
+    run(reader.sync())
+    assert "user:1" in reader.bloom
+
+    run(writer.revoke_token("abc", expires_at=module.time.time() + 60))
+    run(writer.revoke_user(2))
+    run(reader.sync())
+    assert "jti:abc" in reader.bloom
+    assert "user:2" in reader.bloom
+    assert (reader.full_syncs, reader.incremental_syncs) == (1, 1)
+
+
+def test_sync_rebuilds_after_rebuild_interval(redis, run, monkeypatch):
+    reader = TokenRevocation()
+    run(reader.sync())
+    monkeypatch.setattr(module.settings, "AUTH_REVOCATION_REBUILD_SECONDS", 0.0)
+    run(reader.sync())
+    assert (reader.full_syncs, reader.incremental_syncs) == (2, 0)